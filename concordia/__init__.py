@@ -11,9 +11,12 @@ but Concordia itself does not depend on medical context.
 __all__ = [
     "SessionCapsule",
     "SessionEvent",
+    "diff",
+    "verify_many",
 ]
 
-from .capsule import SessionCapsule, SessionEvent
+from .batch import verify_many
+from .capsule import SessionCapsule, SessionEvent, diff
 
 __version__ = "0.1.0"
 
@@ -1,10 +1,11 @@
-"""Merkle chain utilities."""
+"""Merkle chain and Merkle tree utilities."""
 from __future__ import annotations
 
 import hashlib
-import json
 from dataclasses import dataclass
-from typing import Any, Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ... import canonical
 
 
 @dataclass
@@ -23,13 +24,196 @@ class MerkleNode:
 
 def canonical_bytes(data: Mapping[str, Any]) -> bytes:
     """Serialize data with deterministic ordering for hashing."""
-    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return canonical.canonical_bytes(data)
 
 
 def compute_chain_hash(payload: Mapping[str, Any], prev_hash_hex: Optional[str]) -> str:
-    """Return the new chain hash from payload + previous hash."""
+    """Return the new chain hash from payload + previous hash.
+
+    Legacy (v1) link, still used to verify rows without a ``content_hash``.
+    """
     node = MerkleNode(
         value=canonical_bytes(payload),
         prev_hash=bytes.fromhex(prev_hash_hex) if prev_hash_hex else None,
     )
     return node.hash.hex()
+
+
+def event_envelope(event: Any) -> Dict[str, Any]:
+    """Hashed fields of a ledger event (ORM object or row); signature excluded."""
+    return {
+        "session_id": event.session_id,
+        "actor_id": event.actor_id,
+        "actor_type": event.actor_type,
+        "act_type": event.act_type,
+        "payload": event.payload,
+        "artifact_hash": event.artifact_hash,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def signature_envelope(event: Any) -> Dict[str, Any]:
+    """Fields an actor signs: the event as submitted (no ``created_at``)."""
+    return {
+        "session_id": event.session_id,
+        "actor_id": event.actor_id,
+        "actor_type": getattr(event.actor_type, "value", event.actor_type),
+        "act_type": getattr(event.act_type, "value", event.act_type),
+        "payload": event.payload,
+        "artifact_hash": event.artifact_hash,
+    }
+
+
+def compute_content_hash(envelope: Mapping[str, Any]) -> str:
+    """SHA-256 of the canonical envelope, stored per event as ``content_hash``."""
+    return hashlib.sha256(canonical_bytes(envelope)).hexdigest()
+
+
+def link_content_hash(content_hash_hex: str, prev_hash_hex: Optional[str]) -> str:
+    """v2 chain link: ``SHA256(content_hash || prev_hash)`` over fixed-size digests.
+
+    Verifying a chain of these needs no payload serialization; whether each
+    ``content_hash`` still matches its payload is a separate (deep) check.
+    """
+    return MerkleNode(
+        value=bytes.fromhex(content_hash_hex),
+        prev_hash=bytes.fromhex(prev_hash_hex) if prev_hash_hex else None,
+    ).hash.hex()
+
+
+def chain_problems(events: Sequence[Any]) -> List[str]:
+    """Re-hash one session's events (in seq order) and re-link the chain.
+
+    Deep check: every envelope is serialized again. Rows without a
+    ``content_hash`` are checked with the legacy v1 link.
+    """
+    problems: List[str] = []
+    prev_hash: Optional[str] = None
+    for expected_seq, event in enumerate(events, start=1):
+        if event.seq != expected_seq:
+            problems.append(f"event {event.id}: seq {event.seq} != {expected_seq}")
+        if event.prev_hash != prev_hash:
+            problems.append(f"event {event.id}: prev_hash mismatch")
+        envelope = event_envelope(event)
+        if event.content_hash is None:
+            expected = compute_chain_hash(envelope, event.prev_hash)
+        else:
+            if compute_content_hash(envelope) != event.content_hash:
+                problems.append(f"event {event.id}: content_hash mismatch")
+            expected = link_content_hash(event.content_hash, event.prev_hash)
+        if event.curr_hash != expected:
+            problems.append(f"event {event.id}: curr_hash mismatch")
+        prev_hash = event.curr_hash
+    return problems
+
+
+# --- RFC 6962 Merkle tree over a session's event hashes -------------------
+#
+# The hash chain above proves ordering but an inclusion check needs every
+# earlier event. The tree below is built over the chain's ``curr_hash``
+# values (leaf i = event with seq i + 1) so a single event can be proven with
+# an audit path of ~log2(n) hashes.
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _tree_levels(leaves: Sequence[bytes]) -> List[List[bytes]]:
+    """All levels bottom-up; an unpaired last node is carried up unchanged,
+    which yields the same tree as RFC 6962's largest-power-of-two split."""
+    levels = [[leaf_hash(leaf) for leaf in leaves]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    """RFC 6962 Merkle Tree Hash (MTH) of ``leaves``."""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    return _tree_levels(leaves)[-1][0]
+
+
+def inclusion_proof(leaves: Sequence[bytes], index: int) -> Tuple[bytes, List[bytes]]:
+    """Return ``(root, audit_path)`` proving ``leaves[index]`` is in the tree."""
+    if not 0 <= index < len(leaves):
+        raise IndexError(f"leaf index {index} out of range for tree of size {len(leaves)}")
+    levels = _tree_levels(leaves)
+    path: List[bytes] = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(level[sibling])
+        index //= 2
+    return levels[-1][0], path
+
+
+def inclusion_proofs(leaves: Sequence[bytes]) -> Tuple[bytes, List[List[bytes]]]:
+    """Return ``(root, audit_paths)`` for every leaf, building the tree once."""
+    if not leaves:
+        raise IndexError("no leaves to prove")
+    levels = _tree_levels(leaves)
+    paths: List[List[bytes]] = []
+    for index in range(len(leaves)):
+        path: List[bytes] = []
+        for level in levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(level[sibling])
+            index //= 2
+        paths.append(path)
+    return levels[-1][0], paths
+
+
+def verify_inclusion(
+    leaf: bytes,
+    index: int,
+    tree_size: int,
+    audit_path: Sequence[bytes],
+    root: bytes,
+) -> bool:
+    """Check an audit path offline (RFC 9162, section 2.1.3.2)."""
+    if not 0 <= index < tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    r = leaf_hash(leaf)
+    for p in audit_path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_inclusion_proof(proof: Mapping[str, Any]) -> bool:
+    """Verify the JSON document returned by ``GET /sessions/{id}/proof/{event_id}``."""
+    try:
+        return verify_inclusion(
+            bytes.fromhex(proof["leaf"]),
+            int(proof["leaf_index"]),
+            int(proof["tree_size"]),
+            [bytes.fromhex(node) for node in proof["audit_path"]],
+            bytes.fromhex(proof["root"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return False
@@ -7,7 +7,7 @@ from typing import Any, Dict, Optional
 from uuid import uuid4
 
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import JSON, Enum as SQLAlchemyEnum
+from sqlalchemy import JSON, Enum as SQLAlchemyEnum, Index
 from sqlalchemy.types import TypeDecorator, String
 from sqlmodel import Column, Field as SQLField, SQLModel
 
@@ -90,9 +90,20 @@ class UnderstandingEvent(SQLModel, table=True):
     """Immutable understanding-event row stored in PostgreSQL."""
 
     __tablename__ = "understanding_events"
+    __table_args__ = (
+        # Per-session chain tip lookup: WHERE session_id = ? ORDER BY seq DESC LIMIT 1
+        Index("ix_understanding_events_session_seq", "session_id", "seq", unique=True),
+        # Telemetry counts: WHERE session_id = ? GROUP BY act_type (index-only)
+        Index("ix_understanding_events_session_act_type", "session_id", "act_type"),
+        # Legacy global chain tip and read-back order
+        Index("ix_understanding_events_global_seq", "global_seq"),
+    )
 
     id: str = SQLField(default_factory=lambda: str(uuid4()), primary_key=True, index=True)
     session_id: str = SQLField(index=True)
+    seq: Optional[int] = SQLField(default=None)  # 1-based position within the session
+    # 1-based position in the legacy global chain; NULL under per-session chains
+    global_seq: Optional[int] = SQLField(default=None)
     actor_id: str = SQLField(index=True)
     actor_type: ActorType
     act_type: ActType
@@ -102,6 +113,8 @@ class UnderstandingEvent(SQLModel, table=True):
     artifact_hash: Optional[str] = SQLField(default=None, index=True)
     prev_hash: Optional[str] = SQLField(default=None)
     curr_hash: Optional[str] = SQLField(default=None, index=True)
+    # SHA-256 of the canonical envelope; NULL on rows chained before it existed
+    content_hash: Optional[str] = SQLField(default=None)
     signature: Optional[str] = SQLField(default=None)
     created_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False, index=True)
 
@@ -119,6 +132,7 @@ class UnderstandingEventCreate(BaseModel):
 class UnderstandingEventRead(BaseModel):
     id: str
     session_id: str
+    seq: Optional[int] = None
     actor_id: str
     actor_type: ActorType
     act_type: ActType
@@ -126,6 +140,7 @@ class UnderstandingEventRead(BaseModel):
     artifact_hash: Optional[str]
     prev_hash: Optional[str]
     curr_hash: Optional[str]
+    content_hash: Optional[str] = None
     signature: Optional[str]
     created_at: datetime
 
@@ -194,6 +209,8 @@ class ActorKey(SQLModel, table=True):
     actor_id: str = SQLField(primary_key=True)
     public_key_hex: str
     created_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False)
+    # bumped by KeyRegistry.register; workers compare it to revalidate cached keys
+    updated_at: Optional[datetime] = SQLField(default_factory=datetime.utcnow)
 
 
 class ActorKeyRead(BaseModel):
@@ -214,6 +231,11 @@ class SignatureRecord(SQLModel, table=True):
     actor_id: str = SQLField(index=True)
     signature_hex: str
     tsa_token: Dict[str, Any] = SQLField(sa_column=Column(JSON, nullable=False, server_default="{}"))
+    # "pending" until the batcher anchors it ("anchored"); "stamped" = own token;
+    # "claimed" while one batcher has it out at the TSA
+    tsa_status: Optional[str] = SQLField(default=None, index=True)
+    tsa_claim: Optional[str] = SQLField(default=None, index=True)
+    tsa_claimed_at: Optional[datetime] = SQLField(default=None, nullable=True)
     created_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False)
 
 
@@ -223,11 +245,39 @@ class SignatureRecordRead(BaseModel):
     actor_id: str
     signature_hex: str
     tsa_token: Dict[str, Any]
+    tsa_status: Optional[str] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class TimestampAnchor(SQLModel, table=True):
+    """One TSA token over the Merkle root of a batch of signature digests."""
+
+    __tablename__ = "timestamp_anchors"
+
+    id: str = SQLField(default_factory=lambda: str(uuid4()), primary_key=True, index=True)
+    root: str  # RFC 6962 tree hash over the records' event curr_hash values
+    tree_size: int
+    tsa_token: Dict[str, Any] = SQLField(sa_column=Column(JSON, nullable=False, server_default="{}"))
+    created_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False, index=True)
+
+
+class LedgerCheckpoint(SQLModel, table=True):
+    """Server-signed record of a chain position that has been fully verified."""
+
+    __tablename__ = "ledger_checkpoints"
+
+    id: str = SQLField(default_factory=lambda: str(uuid4()), primary_key=True, index=True)
+    session_id: str = SQLField(index=True)
+    seq: int  # last verified seq; verification resumes after it
+    curr_hash: str
+    count: int  # events verified up to and including seq
+    verified_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False, index=True)
+    public_key_hex: str
+    signature_hex: str
+
+
 class SessionRecord(SQLModel, table=True):
     __tablename__ = "sessions"
 
@@ -237,6 +287,38 @@ class SessionRecord(SQLModel, table=True):
     artifact_hash: str
     created_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False)
     status: str = SQLField(default="active", index=True)
+    # created_at of the session's first event, if it was chained after this
+    # row existed; lower bound for partition pruning (see LedgerService)
+    first_event_at: Optional[datetime] = SQLField(default=None, nullable=True)
+
+
+class SessionArchive(SQLModel, table=True):
+    """Stub left in the hot DB for a session whose events moved to cold storage."""
+
+    __tablename__ = "session_archives"
+
+    session_id: str = SQLField(primary_key=True)
+    blob_name: str  # infra.storage blob holding the gzip JSON-lines export
+    sha256: str  # of the compressed blob
+    events_count: int
+    last_curr_hash: Optional[str] = SQLField(default=None)
+    archived_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False)
+
+
+class SegmentOutboxRecord(SQLModel, table=True):
+    """Segment-ledger event committed in SQL whose record may not be on disk yet.
+
+    Written in the event's SQL transaction and deleted once the record is
+    fsync-ed; the next writer of the session replays whatever is left.
+    """
+
+    __tablename__ = "segment_outbox"
+
+    event_id: str = SQLField(primary_key=True)
+    session_id: str = SQLField(index=True)
+    seq: int
+    record: str  # infra.segments.encode_event body
+    created_at: datetime = SQLField(default_factory=datetime.utcnow, nullable=False)
 
 
 class SessionRecordRead(BaseModel):
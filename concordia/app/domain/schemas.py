@@ -1,6 +1,6 @@
 """API I/O schemas."""
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -32,9 +32,14 @@ class UnderstandingEventIn(BaseModel):
     signature: Optional[str] = None
 
 
+class UnderstandingEventBatchIn(BaseModel):
+    events: List[UnderstandingEventIn] = Field(..., min_length=1, max_length=1000)
+
+
 class UnderstandingEventOut(BaseModel):
     id: str
     session_id: str
+    seq: Optional[int] = None
     actor_id: str
     actor_type: ActorType
     act_type: ActType
@@ -42,12 +47,25 @@ class UnderstandingEventOut(BaseModel):
     artifact_hash: Optional[str]
     prev_hash: Optional[str]
     curr_hash: Optional[str]
+    content_hash: Optional[str] = None
     signature: Optional[str]
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class InclusionProofOut(BaseModel):
+    """RFC 6962 audit path for one event of a session's Merkle tree."""
+
+    session_id: str
+    event_id: str
+    leaf_index: int
+    tree_size: int
+    leaf: str  # event curr_hash (hex)
+    root: str
+    audit_path: List[str]
+
+
 class MetricsSnapshotOut(MetricsSnapshotRead):
     zone_label: str | None = None
     zone_message: str | None = None
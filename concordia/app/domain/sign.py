@@ -1,5 +1,6 @@
 """Ed25519 signing helper."""
-from typing import Tuple
+import base64
+from typing import Tuple, Union
 
 from cryptography.hazmat.primitives.asymmetric.ed25519 import (
     Ed25519PrivateKey,
@@ -22,11 +23,34 @@ def generate_keypair() -> Tuple[bytes, bytes]:
     )
 
 
+def public_key_from_private(private_bytes: bytes) -> bytes:
+    private_key = Ed25519PrivateKey.from_private_bytes(private_bytes)
+    return private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+
 def sign_message(private_bytes: bytes, message: bytes) -> bytes:
     private_key = Ed25519PrivateKey.from_private_bytes(private_bytes)
     return private_key.sign(message)
 
 
-def verify_signature(public_bytes: bytes, message: bytes, signature: bytes) -> None:
-    public_key = Ed25519PublicKey.from_public_bytes(public_bytes)
+def load_public_key(public_bytes: bytes) -> Ed25519PublicKey:
+    """Parse a raw 32-byte public key once, for reuse across verifications."""
+    return Ed25519PublicKey.from_public_bytes(public_bytes)
+
+
+def verify_signature(
+    public_key: Union[bytes, Ed25519PublicKey], message: bytes, signature: bytes
+) -> None:
+    if isinstance(public_key, bytes):
+        public_key = load_public_key(public_key)
     public_key.verify(signature, message)
+
+
+def decode_signature(signature: str) -> bytes:
+    """Base64 signature bytes exactly as ``POST /events`` accepts them.
+
+    Ingestion and the bulk audit both decode through here, so a stored
+    signature never fails the audit on encoding alone. Raises
+    ``ValueError`` (``binascii.Error``) if it is not base64.
+    """
+    return base64.b64decode(signature)
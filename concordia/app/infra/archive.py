@@ -0,0 +1,156 @@
+"""Cold-storage format for archived sessions.
+
+An archived session is one gzip-compressed JSON-lines blob in
+``infra.storage``: a header line (format, session row, event count, chain
+tip and time range, i.e. the ``seal_session.py`` capsule) followed by one
+line per event in ``seq`` order, encoded exactly like segment records.
+Output is deterministic (canonical JSON, gzip ``mtime=0``), so the SHA-256
+recorded in the ``SessionArchive`` stub pins the blob.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from ...canonical import canonical_bytes
+from ..domain.models import SessionRecord, UnderstandingEvent
+from .segments import decode_event, encode_event
+from .storage import read_blob
+
+ARCHIVE_FORMAT = "concordia.session-archive/1"
+ARCHIVE_PREFIX = "archive/sessions"
+# decoded events kept across all cached archives; larger archives are not cached
+ARCHIVE_CACHE_EVENTS = int(os.getenv("CONCORDIA_ARCHIVE_CACHE_EVENTS", "50000"))
+
+
+class ArchiveCorruptError(RuntimeError):
+    """An archive blob does not match its stub or cannot be decoded."""
+
+
+def archive_blob_name(session_id: str) -> str:
+    return f"{ARCHIVE_PREFIX}/{quote(session_id, safe='')}.jsonl.gz"
+
+
+def encode_archive(record: SessionRecord, events: Sequence[UnderstandingEvent]) -> bytes:
+    header = {
+        "format": ARCHIVE_FORMAT,
+        "session": {
+            "id": record.id,
+            "doctor_id": record.doctor_id,
+            "title": record.title,
+            "artifact_hash": record.artifact_hash,
+            "created_at": record.created_at.isoformat(),
+            "status": record.status,
+        },
+        "events_count": len(events),
+        "first_event_at": events[0].created_at.isoformat() if events else None,
+        "last_event_at": events[-1].created_at.isoformat() if events else None,
+        "last_curr_hash": events[-1].curr_hash if events else None,
+    }
+    lines = [canonical_bytes(header, ensure_ascii=False)]
+    lines.extend(encode_event(event) for event in events)
+    return gzip.compress(b"\n".join(lines) + b"\n", mtime=0)
+
+
+def decode_archive(data: bytes) -> Tuple[Dict[str, Any], List[UnderstandingEvent]]:
+    try:
+        header_line, *event_lines = gzip.decompress(data).splitlines()
+        header = decode_header(header_line)
+        events = [decode_event(line) for line in event_lines]
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as exc:
+        raise ArchiveCorruptError(f"cannot decode archive: {exc}") from exc
+    if len(events) != header["events_count"]:
+        raise ArchiveCorruptError(
+            f"archive holds {len(events)} events, header says {header['events_count']}"
+        )
+    return header, events
+
+
+def decode_header(line: bytes) -> Dict[str, Any]:
+    header = json.loads(line)
+    if header.get("format") != ARCHIVE_FORMAT:
+        raise ValueError(f"unknown archive format {header.get('format')!r}")
+    return header
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+ArchiveContents = Tuple[Dict[str, Any], Tuple[UnderstandingEvent, ...]]
+
+
+class _ArchiveCache:
+    """LRU of decoded archives bounded by their total event count."""
+
+    def __init__(self, max_events: int) -> None:
+        self.max_events = max_events
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], ArchiveContents]" = OrderedDict()
+        self._events = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, Optional[str]]) -> Optional[ArchiveContents]:
+        with self._lock:
+            contents = self._entries.get(key)
+            if contents is not None:
+                self._entries.move_to_end(key)
+            return contents
+
+    def put(self, key: Tuple[str, Optional[str]], contents: ArchiveContents) -> None:
+        size = len(contents[1])
+        with self._lock:
+            if key in self._entries or size > self.max_events:
+                return
+            self._entries[key] = contents
+            self._events += size
+            while self._events > self.max_events:
+                _, evicted = self._entries.popitem(last=False)
+                self._events -= len(evicted[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._events = 0
+
+
+_cache = _ArchiveCache(ARCHIVE_CACHE_EVENTS)
+
+
+def load_archive(
+    blob_name: str, sha256: Optional[str] = None, cache: bool = True
+) -> ArchiveContents:
+    """Read, check and decode an archive blob.
+
+    Results are cached per ``(name, sha256)`` up to ``ARCHIVE_CACHE_EVENTS``
+    events in total; bulk scans pass ``cache=False`` so they neither evict
+    the hot sessions nor pin what they walk. Returned events are shared
+    between callers and must not be mutated.
+    """
+    key = (blob_name, sha256)
+    contents = _cache.get(key) if cache else None
+    if contents is None:
+        contents = _read_archive(blob_name, sha256)
+        if cache:
+            _cache.put(key, contents)
+    return contents
+
+
+def _read_archive(blob_name: str, sha256: Optional[str]) -> ArchiveContents:
+    try:
+        data = read_blob(blob_name)
+    except FileNotFoundError as exc:
+        raise ArchiveCorruptError(f"archive blob {blob_name} is missing") from exc
+    if sha256 is not None and blob_digest(data) != sha256:
+        raise ArchiveCorruptError(f"archive blob {blob_name} does not match its SHA-256")
+    header, events = decode_archive(data)
+    return header, tuple(events)
+
+
+def clear_archive_cache() -> None:
+    _cache.clear()
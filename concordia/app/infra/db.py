@@ -3,12 +3,19 @@ from contextlib import contextmanager
 import os
 from typing import Iterator, List, Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel, Session
 
-from ..domain.models import ActType
+from ..domain.models import (
+    ActorKey,
+    ActType,
+    SessionRecord,
+    SignatureRecord,
+    UnderstandingEvent,
+)
+from .partitions import create_partitioned_events_table, ensure_event_partitions
 import time
 
 # Read DATABASE_URL from environment; fall back to local SQLite for no‑Docker demo
@@ -61,6 +68,119 @@ def ensure_acttype_enum_values(bind_engine: Optional[Engine] = None) -> None:
             )
 
 
+# Columns added to understanding_events after the first release. All are
+# nullable: legacy rows keep NULL (content_hash, global_seq) or are
+# backfilled (seq).
+LEDGER_ADDED_COLUMNS = {
+    "seq": "INTEGER",
+    "content_hash": "VARCHAR",
+    "global_seq": "INTEGER",
+}
+
+# Columns added to actor_keys; legacy rows keep NULL until re-registered.
+ACTOR_KEY_ADDED_COLUMNS = {
+    "updated_at": "TIMESTAMP",
+}
+
+# Columns added to sessions; legacy rows keep NULL (no partition floor).
+SESSION_ADDED_COLUMNS = {
+    "first_event_at": "TIMESTAMP",
+}
+
+# Columns added to signature_records; legacy rows (inline stub tokens) keep NULL.
+SIGNATURE_ADDED_COLUMNS = {
+    "tsa_status": "VARCHAR",
+    "tsa_claim": "VARCHAR",
+    "tsa_claimed_at": "TIMESTAMP",
+}
+
+
+def _add_missing_columns(target_engine: Engine, table, added_columns: dict) -> bool:
+    """``ALTER TABLE ... ADD COLUMN`` for each missing column; False if no table."""
+    inspector = inspect(target_engine)
+    if not inspector.has_table(table.name):
+        return False
+    columns = {column["name"] for column in inspector.get_columns(table.name)}
+    with target_engine.begin() as conn:
+        for name, sql_type in added_columns.items():
+            if name not in columns:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {sql_type}"))
+    return True
+
+
+def ensure_ledger_schema(bind_engine: Optional[Engine] = None) -> None:
+    """Add later ledger columns (``seq``, ``content_hash``, ``global_seq``) and indexes.
+
+    ``create_all`` never alters existing tables, so databases created before
+    per-session chaining get the columns here and their rows are numbered
+    per session in ``created_at`` order.
+    """
+    target_engine = bind_engine or engine
+    table = UnderstandingEvent.__table__
+    if not _add_missing_columns(target_engine, table, LEDGER_ADDED_COLUMNS):
+        return
+    with target_engine.begin() as conn:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    backfill_session_seq(target_engine)
+
+
+def ensure_actor_key_schema(bind_engine: Optional[Engine] = None) -> None:
+    """Add ``actor_keys.updated_at`` (key cache revalidation) to existing tables."""
+    _add_missing_columns(bind_engine or engine, ActorKey.__table__, ACTOR_KEY_ADDED_COLUMNS)
+
+
+def ensure_session_schema(bind_engine: Optional[Engine] = None) -> None:
+    """Add ``sessions.first_event_at`` (partition floor) to existing tables."""
+    _add_missing_columns(bind_engine or engine, SessionRecord.__table__, SESSION_ADDED_COLUMNS)
+
+
+def ensure_signature_schema(bind_engine: Optional[Engine] = None) -> None:
+    """Add the ``signature_records`` batched-timestamping columns and their indexes."""
+    target_engine = bind_engine or engine
+    table = SignatureRecord.__table__
+    if not _add_missing_columns(target_engine, table, SIGNATURE_ADDED_COLUMNS):
+        return
+    with target_engine.begin() as conn:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def backfill_session_seq(bind_engine: Optional[Engine] = None) -> int:
+    """Number rows with ``seq IS NULL`` after the existing session tips.
+
+    Returns the number of rows updated.
+    """
+    target_engine = bind_engine or engine
+    table = UnderstandingEvent.__table__
+    with target_engine.begin() as conn:
+        pending = conn.execute(
+            text(f"SELECT 1 FROM {table.name} WHERE seq IS NULL LIMIT 1")
+        ).first()
+        if not pending:
+            return 0
+        tips = dict(
+            conn.execute(
+                text(
+                    f"SELECT session_id, MAX(seq) FROM {table.name} "
+                    "WHERE seq IS NOT NULL GROUP BY session_id"
+                )
+            ).fetchall()
+        )
+        rows = conn.execute(
+            text(
+                f"SELECT id, session_id FROM {table.name} WHERE seq IS NULL "
+                "ORDER BY session_id, created_at, id"
+            )
+        ).fetchall()
+        updates = []
+        for event_id, session_id in rows:
+            tips[session_id] = (tips.get(session_id) or 0) + 1
+            updates.append({"id": event_id, "seq": tips[session_id]})
+        conn.execute(text(f"UPDATE {table.name} SET seq = :seq WHERE id = :id"), updates)
+    return len(updates)
+
+
 def init_db() -> None:
     """Create tables if they do not exist and keep enums in sync.
 
@@ -70,8 +190,15 @@ def init_db() -> None:
     last_err: Exception | None = None
     while attempts < 30:
         try:
+            # partitioned parent first (opt-in, PostgreSQL); create_all skips it
+            create_partitioned_events_table(engine)
             SQLModel.metadata.create_all(engine)
             ensure_acttype_enum_values(engine)
+            ensure_ledger_schema(engine)
+            ensure_actor_key_schema(engine)
+            ensure_session_schema(engine)
+            ensure_signature_schema(engine)
+            ensure_event_partitions(engine)
             return
         except Exception as exc:  # pragma: no cover
             last_err = exc
@@ -0,0 +1,161 @@
+"""Monthly range partitioning of ``understanding_events`` on PostgreSQL.
+
+Opt-in with ``CONCORDIA_PARTITION_EVENTS=1``. ``init_db`` then creates the
+events table as ``PARTITION BY RANGE (created_at)`` (only when the table does
+not exist yet; an existing heap table is left alone) and keeps monthly
+partitions ``understanding_events_pYYYY_MM`` created ``months_ahead`` months
+into the future, plus a default partition that catches anything outside
+them.
+
+PostgreSQL requires every unique constraint on a partitioned table to
+include the partition key, so the primary key becomes ``(id, created_at)``
+and the per-session index ``(session_id, seq, created_at)``. Uniqueness of
+``(session_id, seq)`` is then guaranteed by the per-session chain lock in
+``LedgerService`` rather than by the index, and ``verify_chain.py`` reports
+any duplicate or gap.
+
+Other dialects ignore all of this.
+"""
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from ..domain.models import UnderstandingEvent
+
+PARTITIONED_EVENTS = os.getenv("CONCORDIA_PARTITION_EVENTS", "0").lower() not in ("0", "false", "")
+PARTITION_MONTHS_AHEAD = int(os.getenv("CONCORDIA_PARTITION_MONTHS_AHEAD", "3"))
+
+EVENTS_TABLE = UnderstandingEvent.__table__.name
+DEFAULT_PARTITION = f"{EVENTS_TABLE}_default"
+PARTITION_KEY = "created_at"
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{EVENTS_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def partitioned_events_table(metadata: Optional[MetaData] = None) -> Table:
+    """``understanding_events`` as a range-partitioned table.
+
+    Same columns and index names as the model, with the partition key added
+    to the primary key and to unique indexes.
+    """
+    source = UnderstandingEvent.__table__
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            nullable=column.nullable and column.name != PARTITION_KEY,
+            primary_key=column.primary_key or column.name == PARTITION_KEY,
+            server_default=column.server_default.arg if column.server_default else None,
+        )
+        for column in source.columns
+    ]
+    table = Table(
+        source.name,
+        metadata if metadata is not None else MetaData(),
+        *columns,
+        postgresql_partition_by=f"RANGE ({PARTITION_KEY})",
+    )
+    for index in source.indexes:
+        names = [column.name for column in index.columns]
+        if index.unique and PARTITION_KEY not in names:
+            names.append(PARTITION_KEY)
+        Index(index.name, *(table.c[name] for name in names), unique=index.unique)
+    return table
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+            ),
+            {"name": EVENTS_TABLE},
+        ).first()
+    )
+
+
+def create_partitioned_events_table(engine: Engine) -> bool:
+    """Create the partitioned parent if partitioning is on and the table is new."""
+    if not PARTITIONED_EVENTS or engine.dialect.name != "postgresql":
+        return False
+    if inspect(engine).has_table(EVENTS_TABLE):
+        return False
+    with engine.begin() as conn:
+        partitioned_events_table().create(conn, checkfirst=True)
+    return True
+
+
+def ensure_event_partitions(
+    engine: Engine,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> List[str]:
+    """Create missing monthly partitions through ``months_ahead``; returns new names."""
+    if engine.dialect.name != "postgresql":
+        return []
+    created = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return []
+        existing = {name for name, _, _ in list_event_partitions(conn)}
+        first = month_start(today or datetime.utcnow())
+        for offset in range(months_ahead + 1):
+            month = add_months(first, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {EVENTS_TABLE} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') "
+                    f"TO ('{add_months(month, 1).isoformat()}')"
+                )
+            )
+            created.append(name)
+        if DEFAULT_PARTITION not in existing:
+            conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {EVENTS_TABLE} DEFAULT"))
+            created.append(DEFAULT_PARTITION)
+    return created
+
+
+def list_event_partitions(conn: Connection) -> List[Tuple[str, Optional[date], Optional[date]]]:
+    """Attached partitions as ``(name, lower, upper)``; bounds are None for DEFAULT."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name ORDER BY c.relname"
+        ),
+        {"name": EVENTS_TABLE},
+    ).fetchall()
+    partitions = []
+    for name, bound in rows:
+        lower = upper = None
+        if bound and bound.startswith("FOR VALUES FROM"):
+            # FOR VALUES FROM ('2026-10-01 00:00:00') TO ('2026-11-01 00:00:00')
+            values = bound.split("'")
+            lower = datetime.fromisoformat(values[1]).date()
+            upper = datetime.fromisoformat(values[3]).date()
+        partitions.append((name, lower, upper))
+    return partitions
@@ -0,0 +1,628 @@
+"""Append-only segment-file storage for ledger events.
+
+An alternative to the ``understanding_events`` table for high-volume sites
+(``CONCORDIA_LEDGER_BACKEND=segment``). Sessions are hashed onto shards; each
+shard is a directory of numbered segments::
+
+    shard-007/
+        LOCK            flock target serializing writers across processes
+        00000001.seg    records: [u32 length][u32 crc32][JSON event]...
+        00000001.idx    one fixed-size entry per record:
+                        [u64 offset][u32 length][u64 session key][u32 seq]
+
+The ``.idx`` sidecar is the commit point: a record counts once its index
+entry is complete, so a torn write leaves at most unreferenced bytes at the
+end of a segment. Each process keeps an in-memory map ``session_id -> record
+locators`` built from the index files and catches up on entries written by
+other processes before every read and append. Records are read through
+``mmap``, so fetching the event at ``(session_id, seq)`` is O(1).
+
+Writes are flushed to the OS on every append and ``fsync``-ed in batches
+(every ``fsync_every`` records or ``fsync_interval`` seconds, whichever comes
+first); ``sync()`` forces one.
+
+Events are chained inside a ``SegmentTransaction``: the sessions it
+touches stay locked (a byte-range lock per session on the shard's ``LOCK``
+file, so other sessions of the shard proceed) while its events are only
+held in memory, and the records are written on ``commit()``, taking the
+shard lock just for the write. ``LedgerService`` commits it after the SQL
+transaction commits, so a request that rolls back leaves nothing behind
+in the append-only files; the events are journaled in the SQL
+``segment_outbox`` table until their records are on disk.
+"""
+from __future__ import annotations
+
+import errno
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...canonical import canonical_bytes
+from ..domain.models import ActorType, ActType, UnderstandingEvent, UnderstandingEventCreate
+from .storage import STORAGE_ROOT
+
+SEGMENT_ROOT = Path(os.getenv("CONCORDIA_SEGMENT_ROOT", str(STORAGE_ROOT / "ledger")))
+SEGMENT_SHARDS = int(os.getenv("CONCORDIA_SEGMENT_SHARDS", "16"))
+SEGMENT_MAX_BYTES = int(os.getenv("CONCORDIA_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+SEGMENT_FSYNC_EVERY = int(os.getenv("CONCORDIA_SEGMENT_FSYNC_EVERY", "64"))
+SEGMENT_FSYNC_MS = float(os.getenv("CONCORDIA_SEGMENT_FSYNC_MS", "10"))
+
+RECORD_HEADER = struct.Struct(">II")
+INDEX_ENTRY = struct.Struct(">QIQI")
+_LOCATOR_BITS = 32  # locator = segment position << 32 | entry number
+
+EventBuilder = Callable[
+    [UnderstandingEventCreate, int, Optional[str], datetime], UnderstandingEvent
+]
+
+
+class SegmentCorruptError(RuntimeError):
+    """A record failed its CRC or does not match its index entry."""
+
+
+class SegmentLockError(RuntimeError):
+    """A transaction would wait for a session out of lock order (possible deadlock)."""
+
+
+def session_key(session_id: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+# one thread lock per (shard directory, session) being written, shared by
+# every store of the process: POSIX record locks do not exclude threads
+_session_locks: Dict[Tuple[str, str], List] = {}  # -> [lock, users]
+_session_locks_guard = threading.Lock()
+
+
+def _session_thread_lock(directory: Path, session_id: str) -> threading.Lock:
+    with _session_locks_guard:
+        entry = _session_locks.setdefault((str(directory), session_id), [threading.Lock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+
+def _drop_session_thread_lock(directory: Path, session_id: str) -> None:
+    with _session_locks_guard:
+        entry = _session_locks[(str(directory), session_id)]
+        entry[1] -= 1
+        if not entry[1]:
+            del _session_locks[(str(directory), session_id)]
+
+
+def encode_event(event: UnderstandingEvent) -> bytes:
+    return canonical_bytes(
+        {
+            "id": event.id,
+            "session_id": event.session_id,
+            "seq": event.seq,
+            "actor_id": event.actor_id,
+            "actor_type": event.actor_type.value,
+            "act_type": event.act_type.value,
+            "payload": event.payload,
+            "artifact_hash": event.artifact_hash,
+            "prev_hash": event.prev_hash,
+            "curr_hash": event.curr_hash,
+            "content_hash": event.content_hash,
+            "signature": event.signature,
+            "created_at": event.created_at.isoformat(),
+        },
+        ensure_ascii=False,
+    )
+
+
+def decode_event(body: bytes) -> UnderstandingEvent:
+    data = json.loads(body)
+    data["actor_type"] = ActorType(data["actor_type"])
+    data["act_type"] = ActType(data["act_type"])
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return UnderstandingEvent(**data)
+
+
+class _Segment:
+    """One ``.seg``/``.idx`` pair with lazily (re)mapped read views."""
+
+    def __init__(self, directory: Path, number: int) -> None:
+        self.number = number
+        self.seg_path = directory / f"{number:08d}.seg"
+        self.idx_path = directory / f"{number:08d}.idx"
+        self.entries = 0  # complete index entries loaded into the shard map
+        self._seg_map: Optional[mmap.mmap] = None
+        self._idx_map: Optional[mmap.mmap] = None
+
+    def _view(self, path: Path, current: Optional[mmap.mmap], needed: int) -> mmap.mmap:
+        if current is not None and len(current) >= needed:
+            return current
+        if current is not None:
+            current.close()
+        with open(path, "rb") as fh:
+            return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def entry(self, entry_no: int) -> Tuple[int, int, int, int]:
+        end = (entry_no + 1) * INDEX_ENTRY.size
+        self._idx_map = self._view(self.idx_path, self._idx_map, end)
+        return INDEX_ENTRY.unpack_from(self._idx_map, end - INDEX_ENTRY.size)
+
+    def read(self, entry_no: int) -> bytes:
+        offset, length, _, _ = self.entry(entry_no)
+        end = offset + RECORD_HEADER.size + length
+        self._seg_map = self._view(self.seg_path, self._seg_map, end)
+        stored_length, crc = RECORD_HEADER.unpack_from(self._seg_map, offset)
+        body = self._seg_map[offset + RECORD_HEADER.size : end]
+        if stored_length != length or zlib.crc32(body) != crc:
+            raise SegmentCorruptError(
+                f"record {entry_no} of {self.seg_path} failed its length/CRC check"
+            )
+        return body
+
+    def close(self) -> None:
+        for view in (self._seg_map, self._idx_map):
+            if view is not None:
+                view.close()
+        self._seg_map = self._idx_map = None
+
+
+class _Shard:
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int,
+        fsync_every: int,
+        fsync_interval: float,
+    ) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.segments: List[_Segment] = []
+        self.sessions: Dict[str, array] = {}
+        self._keys: Dict[int, str] = {}
+        self._open_from = 0  # segments before this one are final and fully loaded
+        self._thread_lock = threading.RLock()
+        # may be released on another thread than the one that took it
+        self._writer_lock = threading.Lock()
+        self._lock_fd = os.open(self.directory / "LOCK", os.O_RDWR | os.O_CREAT, 0o644)
+        self._seg_fh = None
+        self._idx_fh = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Exclusive writer access (threads and processes), index caught up.
+
+        Returns False if ``blocking`` is off and another writer holds it.
+        """
+        if not self._writer_lock.acquire(blocking):
+            return False
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._writer_lock.release()
+            return False
+        except BaseException:
+            self._writer_lock.release()
+            raise
+        try:
+            self.refresh()
+        except BaseException:
+            self.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self._writer_lock.release()
+
+    def lock_session(self, session_id: str, blocking: bool = True) -> bool:
+        """Exclusive right to chain onto ``session_id``, index caught up.
+
+        A byte-range lock on ``LOCK`` (plus a thread lock) that leaves the
+        shard's other sessions free; writing the records still needs
+        ``acquire()``. Returns False if ``blocking`` is off and another
+        writer holds the session.
+        """
+        lock = _session_thread_lock(self.directory, session_id)
+        if not lock.acquire(blocking):
+            _drop_session_thread_lock(self.directory, session_id)
+            return False
+        try:
+            fcntl.lockf(
+                self._lock_fd,
+                fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB,
+                1,
+                1 + session_key(session_id) % (1 << 62),
+            )
+        except OSError as exc:
+            lock.release()
+            _drop_session_thread_lock(self.directory, session_id)
+            if not blocking and exc.errno in (errno.EACCES, errno.EAGAIN):
+                return False
+            raise
+        except BaseException:
+            lock.release()
+            _drop_session_thread_lock(self.directory, session_id)
+            raise
+        try:
+            self.refresh()
+        except BaseException:
+            self.unlock_session(session_id)
+            raise
+        return True
+
+    def unlock_session(self, session_id: str) -> None:
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, 1 + session_key(session_id) % (1 << 62))
+        with _session_locks_guard:
+            lock = _session_locks[(str(self.directory), session_id)][0]
+        lock.release()
+        _drop_session_thread_lock(self.directory, session_id)
+
+    @contextmanager
+    def locked(self) -> Iterator["_Shard"]:
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def refresh(self) -> None:
+        """Load index entries appended since the last call (by any process).
+
+        Only the newest segment can still grow: writers roll over after their
+        last record, so the cost is a couple of ``stat`` calls, not a scan.
+        """
+        with self._thread_lock:
+            if not self.segments:
+                for number in sorted(int(path.stem) for path in self.directory.glob("*.idx")):
+                    self.segments.append(_Segment(self.directory, number))
+            else:
+                while True:
+                    following = _Segment(self.directory, self.segments[-1].number + 1)
+                    if not following.idx_path.exists():
+                        break
+                    self.segments.append(following)
+            for position in range(self._open_from, len(self.segments)):
+                self._load_entries(position, self.segments[position])
+            self._open_from = max(len(self.segments) - 1, 0)
+
+    def _load_entries(self, position: int, segment: _Segment) -> None:
+        complete = segment.idx_path.stat().st_size // INDEX_ENTRY.size
+        if complete <= segment.entries:
+            return
+        with open(segment.idx_path, "rb") as fh:
+            fh.seek(segment.entries * INDEX_ENTRY.size)
+            data = fh.read((complete - segment.entries) * INDEX_ENTRY.size)
+        for entry_no, (_, _, key, seq) in enumerate(
+            INDEX_ENTRY.iter_unpack(data), start=segment.entries
+        ):
+            session_id = self._keys.get(key)
+            if session_id is None:
+                # first record of a session: learn its name from the body
+                session_id = json.loads(segment.read(entry_no))["session_id"]
+                self._keys[key] = session_id
+            locators = self.sessions.setdefault(session_id, array("Q"))
+            if seq != len(locators) + 1:
+                raise SegmentCorruptError(
+                    f"{segment.idx_path}: session {session_id} seq {seq} "
+                    f"follows {len(locators)}"
+                )
+            locators.append(position << _LOCATOR_BITS | entry_no)
+        segment.entries = complete
+
+    def read(self, locator: int) -> bytes:
+        with self._thread_lock:  # a refresh may remap the views
+            segment = self.segments[locator >> _LOCATOR_BITS]
+            return segment.read(locator & ((1 << _LOCATOR_BITS) - 1))
+
+    def append(self, events: Sequence[UnderstandingEvent]) -> None:
+        """Write events (caller holds ``acquire()`` and their sessions' locks)."""
+        with self._thread_lock:  # readers in this process see whole records only
+            self._append(events)
+
+    def tail(self, count: int) -> List[bytes]:
+        """Bodies of the last ``count`` records, newest first."""
+        bodies: List[bytes] = []
+        with self._thread_lock:
+            for segment in reversed(self.segments):
+                for entry_no in range(segment.entries - 1, -1, -1):
+                    if len(bodies) >= count:
+                        return bodies
+                    bodies.append(segment.read(entry_no))
+        return bodies
+
+    def _append(self, events: Sequence[UnderstandingEvent]) -> None:
+        self._open_writer()
+        for event in events:
+            body = encode_event(event)
+            offset = self._seg_fh.seek(0, os.SEEK_END)
+            if offset and offset + RECORD_HEADER.size + len(body) > self.max_segment_bytes:
+                self._roll_segment()
+                offset = 0
+            self._seg_fh.write(RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body)
+            # record bytes reach the OS before the index entry that commits them
+            self._seg_fh.flush()
+            key = session_key(event.session_id)
+            self._idx_fh.write(INDEX_ENTRY.pack(offset, len(body), key, event.seq))
+            self._idx_fh.flush()
+            segment = self.segments[-1]
+            self._keys.setdefault(key, event.session_id)
+            self.sessions.setdefault(event.session_id, array("Q")).append(
+                (len(self.segments) - 1) << _LOCATOR_BITS | segment.entries
+            )
+            segment.entries += 1
+        self._unsynced += len(events)
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        with self._thread_lock:
+            if self._unsynced and self._seg_fh is not None:
+                os.fsync(self._seg_fh.fileno())
+                os.fsync(self._idx_fh.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _open_writer(self) -> None:
+        if not self.segments:
+            self.segments.append(_Segment(self.directory, 1))
+        active = self.segments[-1]
+        if self._seg_fh is None or self._seg_fh.name != str(active.seg_path):
+            self._close_writer()
+            self._seg_fh = open(active.seg_path, "ab")
+            self._idx_fh = open(active.idx_path, "ab")
+        committed = active.entries * INDEX_ENTRY.size
+        if self._idx_fh.seek(0, os.SEEK_END) != committed:
+            # drop a torn trailing index entry left by a crashed writer
+            self._idx_fh.truncate(committed)
+
+    def _roll_segment(self) -> None:
+        self.sync()
+        self.segments.append(_Segment(self.directory, self.segments[-1].number + 1))
+        self._open_from = len(self.segments) - 1
+        self._open_writer()
+
+    def _close_writer(self) -> None:
+        for fh in (self._seg_fh, self._idx_fh):
+            if fh is not None:
+                fh.close()
+        self._seg_fh = self._idx_fh = None
+
+    def close(self) -> None:
+        with self._thread_lock:
+            self.sync()
+            self._close_writer()
+            for segment in self.segments:
+                segment.close()
+            os.close(self._lock_fd)
+
+
+class SegmentLedgerStore:
+    """Per-session hash chains stored in sharded append-only segment files."""
+
+    def __init__(
+        self,
+        root: Path | str = SEGMENT_ROOT,
+        shards: int = SEGMENT_SHARDS,
+        max_segment_bytes: int = SEGMENT_MAX_BYTES,
+        fsync_every: int = SEGMENT_FSYNC_EVERY,
+        fsync_interval: float = SEGMENT_FSYNC_MS / 1000,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # the shard count decides where a session lives; the first writer pins it
+        meta = self.root / "store.json"
+        if meta.exists():
+            shards = json.loads(meta.read_text())["shards"]
+        else:
+            meta.write_text(json.dumps({"shards": shards}))
+        self.shard_count = shards
+        self._shards = [
+            _Shard(self.root / f"shard-{number:03d}", max_segment_bytes, fsync_every, fsync_interval)
+            for number in range(shards)
+        ]
+
+    def shard_number(self, session_id: str) -> int:
+        return session_key(session_id) % self.shard_count
+
+    def shard_for(self, session_id: str) -> _Shard:
+        return self._shards[self.shard_number(session_id)]
+
+    def transaction(
+        self, recover: Optional[Callable[[str], None]] = None
+    ) -> "SegmentTransaction":
+        return SegmentTransaction(self, recover)
+
+    def append_many(
+        self,
+        events_in: Sequence[UnderstandingEventCreate],
+        build_event: EventBuilder,
+    ) -> List[UnderstandingEvent]:
+        """Chain and write a batch at once (a transaction of its own)."""
+        transaction = self.transaction()
+        try:
+            events = transaction.append_many(events_in, build_event)
+        except BaseException:
+            transaction.release()
+            raise
+        transaction.commit()
+        return events
+
+    def tip(self, session_id: str) -> Tuple[int, Optional[str]]:
+        shard = self.shard_for(session_id)
+        shard.refresh()
+        return self._tip(shard, session_id)
+
+    @staticmethod
+    def _tip(shard: _Shard, session_id: str) -> Tuple[int, Optional[str]]:
+        locators = shard.sessions.get(session_id)
+        if not locators:
+            return 0, None
+        return len(locators), json.loads(shard.read(locators[-1]))["curr_hash"]
+
+    def recent(self, limit: int) -> List[UnderstandingEvent]:
+        """The newest ``limit`` events across all sessions, newest first.
+
+        A shard's records are written in commit order, so its last ``limit``
+        records are all it can contribute.
+        """
+        events: List[UnderstandingEvent] = []
+        for shard in self._shards:
+            shard.refresh()
+            events.extend(decode_event(body) for body in shard.tail(limit))
+        events.sort(key=lambda event: (event.created_at, event.seq), reverse=True)
+        return events[:limit]
+
+    def get(self, session_id: str, seq: int) -> Optional[UnderstandingEvent]:
+        shard = self.shard_for(session_id)
+        shard.refresh()
+        locators = shard.sessions.get(session_id)
+        if not locators or not 1 <= seq <= len(locators):
+            return None
+        return decode_event(shard.read(locators[seq - 1]))
+
+    def timeline(
+        self, session_id: str, after_seq: int = 0, limit: Optional[int] = None
+    ) -> List[UnderstandingEvent]:
+        return list(self.iter_session(session_id, after_seq, limit))
+
+    def iter_session(
+        self, session_id: str, after_seq: int = 0, limit: Optional[int] = None
+    ) -> Iterator[UnderstandingEvent]:
+        shard = self.shard_for(session_id)
+        shard.refresh()
+        locators = shard.sessions.get(session_id, array("Q"))
+        stop = len(locators) if limit is None else min(len(locators), after_seq + limit)
+        for position in range(max(after_seq, 0), stop):
+            event = decode_event(shard.read(locators[position]))
+            if event.session_id != session_id:
+                raise SegmentCorruptError(f"session key collision reading {session_id}")
+            yield event
+
+    def session_ids(self) -> List[str]:
+        names = []
+        for shard in self._shards:
+            shard.refresh()
+            names.extend(shard.sessions)
+        return sorted(names)
+
+    def sync(self) -> None:
+        for shard in self._shards:
+            shard.sync()
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.close()
+
+
+class SegmentTransaction:
+    """Events chained now and written together on ``commit()``.
+
+    Each session is locked on first use and stays locked until ``commit()``
+    or ``release()``, so the tip its events were chained onto cannot move
+    in between; the shard itself is only locked while ``commit()`` writes.
+    Sessions are taken in ascending order; a later call that needs a lower
+    one only tries it and raises ``SegmentLockError`` if it is busy instead
+    of risking a deadlock. ``recover(session_id)``, if given, runs once a
+    session is locked and before its tip is read.
+    """
+
+    def __init__(
+        self, store: SegmentLedgerStore, recover: Optional[Callable[[str], None]] = None
+    ) -> None:
+        self.store = store
+        self.recover = recover
+        self._locked: Dict[str, _Shard] = {}
+        self._tips: Dict[str, Tuple[int, Optional[str]]] = {}
+        self._pending: Dict[int, List[UnderstandingEvent]] = {}
+
+    def append_many(
+        self,
+        events_in: Sequence[UnderstandingEventCreate],
+        build_event: EventBuilder,
+    ) -> List[UnderstandingEvent]:
+        session_ids = {event_in.session_id for event_in in events_in}
+        for session_id in sorted(session_ids - set(self._locked)):
+            shard = self.store.shard_for(session_id)
+            in_order = not self._locked or session_id > max(self._locked)
+            if not shard.lock_session(session_id, blocking=in_order):
+                raise SegmentLockError(f"session {session_id} is busy; retry the transaction")
+            self._locked[session_id] = shard
+            if self.recover is not None:
+                self.recover(session_id)
+            self._tips[session_id] = SegmentLedgerStore._tip(shard, session_id)
+
+        # stamped under the lock so created_at never decreases along seq
+        timestamp = datetime.utcnow()
+        events = []
+        for event_in in events_in:
+            session_id = event_in.session_id
+            last_seq, prev_hash = self._tips[session_id]
+            event = build_event(event_in, last_seq + 1, prev_hash, timestamp)
+            self._tips[session_id] = (event.seq, event.curr_hash)
+            self._pending.setdefault(self.store.shard_number(session_id), []).append(event)
+            events.append(event)
+        return events
+
+    def pending(self, session_id: str) -> List[UnderstandingEvent]:
+        """This transaction's not yet written events of ``session_id``, in seq order."""
+        number = self.store.shard_number(session_id)
+        return [event for event in self._pending.get(number, ()) if event.session_id == session_id]
+
+    def events(self) -> List[UnderstandingEvent]:
+        """All not yet written events, in the order ``commit()`` writes them."""
+        return [event for number in sorted(self._pending) for event in self._pending[number]]
+
+    def commit(self, sync: bool = False) -> None:
+        """Write the records (``fsync``-ed at once if ``sync``) and unlock."""
+        try:
+            for number in sorted(self._pending):
+                with self.store._shards[number].locked() as shard:
+                    shard.append(self._pending[number])
+                    if sync:
+                        shard.sync()
+        finally:
+            self.release()
+
+    def release(self) -> None:
+        """Drop unwritten events and unlock the sessions."""
+        locked, self._locked = self._locked, {}
+        self._pending.clear()
+        self._tips.clear()
+        for session_id, shard in locked.items():
+            shard.unlock_session(session_id)
+
+
+_store: Optional[SegmentLedgerStore] = None
+_store_lock = threading.Lock()
+
+
+def segment_store() -> SegmentLedgerStore:
+    """Process-wide store rooted at ``CONCORDIA_SEGMENT_ROOT``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SegmentLedgerStore()
+        return _store
+
+
+def shutdown_segment_store() -> None:
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
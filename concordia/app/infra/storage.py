@@ -5,7 +5,11 @@ STORAGE_ROOT = Path("/tmp/concordia-storage")
 
 
 def write_blob(name: str, data: bytes) -> Path:
-    STORAGE_ROOT.mkdir(parents=True, exist_ok=True)
     target = STORAGE_ROOT / name
+    target.parent.mkdir(parents=True, exist_ok=True)
     target.write_bytes(data)
     return target
+
+
+def read_blob(name: str) -> bytes:
+    return (STORAGE_ROOT / name).read_bytes()
@@ -1,7 +1,357 @@
-"""TSA abstraction (RFC3161 placeholder)."""
+"""TSA abstraction (RFC3161 placeholder).
+
+With ``CONCORDIA_TSA_URL`` unset, ``request_timestamp`` returns a local,
+unsigned stub. With it set, the digest is POSTed to that timestamp
+authority, which answers with a signed token (see ``infra/tsa_server.py``
+for the JSON protocol and a local stand-in server)::
+
+    request   {"digest": "<hex>"}
+    response  {"digest", "timestamp", "serial", "tsa", "public_key", "signature"}
+
+``signature`` is the TSA's Ed25519 signature over ``token_message(token)``.
+Tokens are only trusted against the key pinned in
+``CONCORDIA_TSA_PUBLIC_KEY``; the ``public_key`` a token carries is
+informational, since anyone can sign a token with a key of their own.
+
+Remote calls go through ``AsyncTSAClient``: one pooled ``httpx.AsyncClient``
+per TSA URL with keep-alive connections, many requests in flight at once,
+per-request timeouts, bounded retries with backoff and a circuit breaker.
+Synchronous callers (request threads, the batcher) submit to the client's
+event-loop thread and wait at most ``wait`` seconds; a TSA that is down,
+slow or behind an open breaker raises ``TSAError`` quickly, and callers
+defer the record to the batcher (``services/timestamps.py``).
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import concurrent.futures
 from datetime import datetime
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence
+
+import httpx
+
+from ..domain.merkle import canonical_bytes
+from ..domain.sign import verify_signature
+
+TSA_URL = os.getenv("CONCORDIA_TSA_URL")
+# hex Ed25519 key of the TSA; remote tokens are rejected while it is unset
+TSA_PUBLIC_KEY = os.getenv("CONCORDIA_TSA_PUBLIC_KEY")
+TSA_TIMEOUT = float(os.getenv("CONCORDIA_TSA_TIMEOUT", "5"))
+TSA_RETRIES = int(os.getenv("CONCORDIA_TSA_RETRIES", "2"))
+TSA_RETRY_BACKOFF = float(os.getenv("CONCORDIA_TSA_RETRY_BACKOFF", "0.1"))
+TSA_MAX_CONNECTIONS = int(os.getenv("CONCORDIA_TSA_MAX_CONNECTIONS", "16"))
+TSA_BREAKER_THRESHOLD = int(os.getenv("CONCORDIA_TSA_BREAKER_THRESHOLD", "5"))
+TSA_BREAKER_RESET = float(os.getenv("CONCORDIA_TSA_BREAKER_RESET", "30"))
+LATENCY_SAMPLES = 1024
+
+TOKEN_SIGNED_FIELDS = ("digest", "timestamp", "serial", "tsa")
+
+
+class TSAError(RuntimeError):
+    """The timestamp authority failed or returned an unusable token."""
+
+
+class TSAUnavailable(TSAError):
+    """The circuit breaker is open (or the wait ran out); timestamp later."""
+
+
+def token_message(token: Mapping[str, Any]) -> bytes:
+    """Bytes the TSA signs: the token's time-binding fields."""
+    return canonical_bytes({field: token.get(field) for field in TOKEN_SIGNED_FIELDS})
+
+
+def request_timestamp(
+    digest: bytes, url: Optional[str] = None, wait: Optional[float] = None
+) -> dict:
+    """Timestamp ``digest``: a remote token if a TSA is configured, else a stub.
+
+    ``wait`` bounds how long this thread blocks on the remote TSA (default:
+    the full retry budget).
+    """
+    url = url or TSA_URL
+    if not url:
+        return {"digest": digest.hex(), "timestamp": datetime.utcnow().isoformat()}
+    return tsa_client(url).timestamp_sync(digest, wait)
+
+
+def check_token(
+    token: Dict[str, Any], digest: bytes, public_key_hex: Optional[str] = None
+) -> Dict[str, Any]:
+    """Reject a token that does not cover ``digest`` or is not signed by the pinned TSA key."""
+    if not isinstance(token, dict) or token.get("digest") != digest.hex():
+        raise TSAError("timestamp token does not cover the requested digest")
+    if not verify_timestamp_token(token, public_key_hex):
+        raise TSAError("timestamp token signature is invalid")
+    return token
+
+
+def verify_timestamp_token(token: Mapping[str, Any], public_key_hex: Optional[str] = None) -> bool:
+    """Check the TSA signature against ``public_key_hex`` (default ``CONCORDIA_TSA_PUBLIC_KEY``).
+
+    The key embedded in the token is never used; with no key pinned every
+    token fails.
+    """
+    key_hex = public_key_hex or TSA_PUBLIC_KEY
+    if not key_hex:
+        return False
+    try:
+        verify_signature(
+            bytes.fromhex(key_hex), token_message(token), bytes.fromhex(token["signature"])
+        )
+    except Exception:
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failed calls; one trial call is
+    let through ``reset_after`` seconds later (half-open) and closes it again
+    on success."""
+
+    def __init__(self, threshold: int = TSA_BREAKER_THRESHOLD, reset_after: float = TSA_BREAKER_RESET) -> None:
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_after:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self._failures}
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._trial or time.monotonic() - self._opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+
+class LatencyStats:
+    """Counters plus a window of recent request latencies."""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES) -> None:
+        self._latencies: Deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "ok": 0, "failed": 0, "attempts": 0, "retries": 0, "rejected": 0}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self.counters)
+
+        def pick(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)
+
+        return {
+            **counters,
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": pick(0.50),
+                "p95": pick(0.95),
+                "p99": pick(0.99),
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+        }
+
+
+class AsyncTSAClient:
+    """Pooled asyncio client for one TSA URL."""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = TSA_TIMEOUT,
+        retries: int = TSA_RETRIES,
+        backoff: float = TSA_RETRY_BACKOFF,
+        max_connections: int = TSA_MAX_CONNECTIONS,
+        breaker: Optional[CircuitBreaker] = None,
+        public_key_hex: Optional[str] = None,
+    ) -> None:
+        self.url = url
+        self.public_key_hex = public_key_hex  # default: CONCORDIA_TSA_PUBLIC_KEY
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = LatencyStats()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def timestamp(self, digest: bytes) -> Dict[str, Any]:
+        """Token for ``digest``; raises ``TSAUnavailable`` while the breaker is open."""
+        public_key_hex = self.public_key_hex or TSA_PUBLIC_KEY
+        if not public_key_hex:  # misconfigured, not down: no request, no breaker
+            raise TSAError("no TSA public key pinned (CONCORDIA_TSA_PUBLIC_KEY)")
+        self.stats.count("calls")
+        if not self.breaker.allow():
+            self.stats.count("rejected")
+            raise TSAUnavailable(f"TSA {self.url} circuit is open")
+        try:
+            token = await self._attempts(digest, public_key_hex)
+        except asyncio.CancelledError:
+            # abandoned mid-call (a sync caller stopped waiting, or the gather
+            # was cancelled): too slow counts as down, and a half-open trial
+            # must not stay claimed forever
+            self.stats.count("failed")
+            self.breaker.record_failure()
+            raise
+        except TSAError:
+            self.stats.count("failed")
+            self.breaker.record_failure()
+            raise
+        self.stats.count("ok")
+        self.breaker.record_success()
+        return token
+
+    async def _attempts(self, digest: bytes, public_key_hex: str) -> Dict[str, Any]:
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats.count("retries")
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            self.stats.count("attempts")
+            started = time.perf_counter()
+            try:
+                response = await self._client().post(self.url, json={"digest": digest.hex()})
+                self.stats.observe(time.perf_counter() - started)
+                response.raise_for_status()
+                return check_token(response.json(), digest, public_key_hex)
+            except httpx.HTTPStatusError as exc:
+                last_error = exc
+                if exc.response.status_code < 500:
+                    break  # the request itself is wrong; retrying will not help
+            except (httpx.HTTPError, ValueError, TSAError) as exc:
+                last_error = exc
+        raise TSAError(f"timestamp request to {self.url} failed: {last_error}")
+
+    async def timestamp_many(self, digests: Sequence[bytes]) -> List[Any]:
+        """Request all tokens concurrently over the pool; failures are returned as exceptions."""
+        return await asyncio.gather(*(self.timestamp(d) for d in digests), return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"url": self.url, "breaker": self.breaker.snapshot(), **self.stats.snapshot()}
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._http
+
+
+class TSAClientThread:
+    """Runs an ``AsyncTSAClient`` on its own event loop for synchronous callers."""
+
+    def __init__(self, client: AsyncTSAClient) -> None:
+        self.client = client
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="concordia-tsa-client", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, digest: bytes) -> "concurrent.futures.Future[Dict[str, Any]]":
+        return asyncio.run_coroutine_threadsafe(self.client.timestamp(digest), self._loop)
+
+    def timestamp_sync(self, digest: bytes, wait: Optional[float] = None) -> Dict[str, Any]:
+        """Block for at most ``wait`` seconds; a late token is dropped (``TSAUnavailable``).
+
+        The abandoned request is cancelled on the loop, which counts it as a
+        breaker failure.
+        """
+        future = self.submit(digest)
+        try:
+            return future.result(timeout=wait)
+        except concurrent.futures.TimeoutError as exc:
+            future.cancel()
+            raise TSAUnavailable(f"TSA {self.client.url} did not answer within {wait}s") from exc
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.client.snapshot()
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.client.aclose(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+_clients: Dict[str, TSAClientThread] = {}
+_clients_lock = threading.Lock()
+
+
+def tsa_client(url: Optional[str] = None) -> TSAClientThread:
+    """Process-wide client for ``url`` (default ``CONCORDIA_TSA_URL``)."""
+    url = url or TSA_URL
+    if not url:
+        raise TSAError("no TSA configured (CONCORDIA_TSA_URL)")
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = TSAClientThread(AsyncTSAClient(url))
+        return _clients[url]
+
+
+def tsa_stats() -> Dict[str, Any]:
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {"configured_url": TSA_URL, "clients": [client.snapshot() for client in clients]}
 
 
-def request_timestamp(digest: bytes) -> dict:
-    """Stub for RFC3161 client call."""
-    return {"digest": digest.hex(), "timestamp": datetime.utcnow().isoformat()}
+def shutdown_tsa_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1,146 @@
+"""Local stand-in timestamp authority for development and tests.
+
+Speaks the JSON protocol of ``infra/tsa.py``: ``POST /`` with
+``{"digest": "<hex>"}`` returns a token signed with the server's Ed25519
+key. ``delay`` and ``fail_next`` simulate a slow or failing TSA.
+
+Usage:
+    python -m concordia.app.infra.tsa_server --port 3180
+    CONCORDIA_TSA_URL=http://127.0.0.1:3180/ CONCORDIA_TSA_PUBLIC_KEY=<printed key> \
+        uvicorn concordia.app.main:app
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from ..domain.sign import generate_keypair, public_key_from_private, sign_message
+from .tsa import token_message
+
+TSA_NAME = "concordia-local-tsa"
+
+
+class LocalTSAServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        private_key: Optional[bytes] = None,
+        delay: float = 0.0,
+    ) -> None:
+        self.private_key = private_key or generate_keypair()[0]
+        self.public_key_hex = public_key_from_private(self.private_key).hex()
+        self.delay = delay
+        self.fail_next = 0  # answer this many requests with HTTP 503
+        self.digests: List[str] = []  # every digest stamped, in order
+        self._serial = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def stamp(self, digest_hex: str) -> dict:
+        with self._lock:
+            self._serial += 1
+            serial = self._serial
+            self.digests.append(digest_hex)
+        token = {
+            "digest": digest_hex,
+            "timestamp": datetime.utcnow().isoformat(),
+            "serial": serial,
+            "tsa": TSA_NAME,
+            "public_key": self.public_key_hex,
+        }
+        token["signature"] = sign_message(self.private_key, token_message(token)).hex()
+        return token
+
+    def start(self) -> "LocalTSAServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="concordia-local-tsa",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalTSAServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so clients can pool connections
+            wbufsize = 64 * 1024  # headers and body leave in one segment
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if server.delay:
+                    time.sleep(server.delay)
+                with server._lock:
+                    failing = server.fail_next > 0
+                    server.fail_next -= failing
+                if failing:
+                    return self._reply(503, {"error": "unavailable"})
+                try:
+                    digest_hex = json.loads(body)["digest"]
+                    bytes.fromhex(digest_hex)
+                except (ValueError, KeyError, TypeError):
+                    return self._reply(400, {"error": "expected {\"digest\": \"<hex>\"}"})
+                self._reply(200, server.stamp(digest_hex))
+
+            def _reply(self, status: int, body: dict) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:  # keep test output quiet
+                pass
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Local stand-in timestamp authority")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=3180)
+    p.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    args = p.parse_args(argv)
+    server = LocalTSAServer(args.host, args.port, delay=args.delay)
+    print(f"local TSA on {server.url} (public key {server.public_key_hex})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,14 +3,27 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from .infra.db import init_db
+from .infra.db import get_session, init_db
+from .infra.segments import shutdown_segment_store
+from .infra.tsa import shutdown_tsa_clients
 from .routers import audit, auth, debug, events, metrics, sessions, view, lab
+from .services.group_commit import shutdown_group_writer
+from .services.ledger import LEDGER_BACKEND, LedgerService
+from .services.timestamps import shutdown_timestamp_batcher, start_timestamp_batcher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    if LEDGER_BACKEND == "segment":  # events a failed segment write left journaled
+        with get_session() as session:
+            LedgerService(session).replay_segment_outbox()
+    start_timestamp_batcher()
     yield
+    shutdown_timestamp_batcher()
+    shutdown_tsa_clients()
+    shutdown_group_writer()
+    shutdown_segment_store()
 
 
 def create_app() -> FastAPI:
@@ -2,11 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import func
 from sqlmodel import Session, select
 
 from ..deps import db_session
-from ..domain.models import AccessLog, MetricsSnapshot, SignatureRecord
+from ..domain.models import AccessLog, MetricsSnapshot, SignatureRecord, TimestampAnchor
+from ..infra.tsa import tsa_stats
 from ..services.telemetry import TelemetryService
+from ..services.timestamps import TSA_CLAIMED, TSA_PENDING
 
 router = APIRouter()
 
@@ -42,3 +45,30 @@ def debug_overview(request: Request, session: Session = Depends(db_session)):
             "signatures": signatures,
         },
     )
+
+
+@router.get("/tsa")
+def debug_tsa(session: Session = Depends(db_session)):
+    """TSA client latency/breaker state plus the batch backlog."""
+    pending = session.exec(
+        select(func.count())
+        .select_from(SignatureRecord)
+        .where(SignatureRecord.tsa_status.in_((TSA_PENDING, TSA_CLAIMED)))
+    ).one()
+    last_anchor = session.exec(
+        select(TimestampAnchor).order_by(TimestampAnchor.created_at.desc()).limit(1)
+    ).first()
+    return {
+        **tsa_stats(),
+        "pending_records": pending,
+        "last_anchor": (
+            {
+                "id": last_anchor.id,
+                "root": last_anchor.root,
+                "tree_size": last_anchor.tree_size,
+                "created_at": last_anchor.created_at.isoformat(),
+            }
+            if last_anchor
+            else None
+        ),
+    }
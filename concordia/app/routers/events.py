@@ -1,26 +1,30 @@
 """Understanding event routes."""
 from typing import List
 
-import base64
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
 
 from ..deps import db_session
-from ..domain.merkle import canonical_bytes
+from ..domain.merkle import canonical_bytes, signature_envelope
 from ..domain.models import (
     ActType,
     SignatureRecord,
-    UnderstandingEvent,
     UnderstandingEventCreate,
 )
-from ..domain.schemas import UnderstandingEventIn, UnderstandingEventOut
-from ..domain.sign import verify_signature
-from ..infra.tsa import request_timestamp
+from ..domain.schemas import (
+    UnderstandingEventBatchIn,
+    UnderstandingEventIn,
+    UnderstandingEventOut,
+)
+from ..domain.sign import decode_signature, verify_signature
+from ..infra.segments import SegmentLockError
+from ..services.group_commit import group_writer
 from ..services.keys import KeyRegistry
-from ..services.ledger import LedgerService
+from ..services.ledger import ChainConflictError, LedgerService
 from ..services.telemetry import TelemetryService
+from ..services.timestamps import timestamp_fields
 
 router = APIRouter()
 
@@ -37,10 +41,16 @@ SIGNATURE_REQUIRED_ACTS = {
 
 
 @router.get("/", response_model=List[UnderstandingEventOut])
-def list_events(session: Session = Depends(db_session)) -> List[UnderstandingEventOut]:
-    stmt = select(UnderstandingEvent).order_by(UnderstandingEvent.created_at.desc()).limit(50)
-    events = session.exec(stmt).all()
-    return events
+def list_events(
+    session_id: Optional[str] = Query(None, description="page through one session by seq"),
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    session: Session = Depends(db_session),
+) -> List[UnderstandingEventOut]:
+    ledger = LedgerService(session)
+    if session_id:
+        return ledger.timeline(session_id, after_seq=after_seq, limit=limit)
+    return ledger.recent(limit)
 
 
 @router.post(
@@ -56,8 +66,26 @@ def append_event(
     if event_in.act_type in SIGNATURE_REQUIRED_ACTS:
         signature_info = _verify_signature_input(event_in, session)
 
-    ledger = LedgerService(session)
-    event = ledger.append(UnderstandingEventCreate(**event_in.model_dump()))
+    event_create = UnderstandingEventCreate(**event_in.model_dump())
+    writer = None
+    if event_in.act_type not in SIGNATURE_REQUIRED_ACTS | TELEMETRY_TRIGGER_ACTS:
+        # the writer commits in its own transaction, so only acts with nothing
+        # else to record use it; signed acts keep their SignatureRecord and
+        # telemetry in the event's transaction
+        writer = group_writer()
+    try:
+        if writer is not None:
+            event = writer.append(event_create)
+        else:
+            event = LedgerService(session).append(event_create)
+    except ChainConflictError as exc:  # tip moved backwards, or session archived
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except TimeoutError as exc:  # withdrawn from the writer's queue, nothing written
+        raise HTTPException(status_code=503, detail="Ledger writer busy; retry") from exc
+    except SegmentLockError as exc:  # another transaction holds the session; nothing written
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "1"}
+        ) from exc
 
     if event.act_type in TELEMETRY_TRIGGER_ACTS:
         TelemetryService(session).snapshot_for_session(event.session_id)
@@ -67,37 +95,82 @@ def append_event(
                 event_id=event.id,
                 actor_id=event.actor_id,
                 signature_hex=signature_info["signature_hex"],
-                tsa_token=request_timestamp(bytes.fromhex(event.curr_hash or "00")),
+                **timestamp_fields(event.curr_hash),
             )
         )
 
     return event
 
 
+@router.post(
+    "/batch",
+    response_model=List[UnderstandingEventOut],
+    status_code=status.HTTP_201_CREATED,
+)
+def append_events_batch(
+    batch: UnderstandingEventBatchIn,
+    session: Session = Depends(db_session),
+) -> List[UnderstandingEventOut]:
+    """Append an ordered burst of events in one transaction.
+
+    Signatures are checked up front so a bad entry rejects the whole batch
+    before anything is chained.
+    """
+    signature_infos = [
+        _verify_signature_input(event_in, session)
+        if event_in.act_type in SIGNATURE_REQUIRED_ACTS
+        else None
+        for event_in in batch.events
+    ]
+
+    ledger = LedgerService(session)
+    try:
+        events = ledger.append_many(
+            [UnderstandingEventCreate(**event_in.model_dump()) for event_in in batch.events]
+        )
+    except ChainConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except SegmentLockError as exc:  # another transaction holds the session; nothing written
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "1"}
+        ) from exc
+
+    session.add_all(
+        SignatureRecord(
+            event_id=event.id,
+            actor_id=event.actor_id,
+            signature_hex=signature_info["signature_hex"],
+            **timestamp_fields(event.curr_hash),
+        )
+        for event, signature_info in zip(events, signature_infos)
+        if signature_info
+    )
+    for session_id in dict.fromkeys(
+        event.session_id for event in events if event.act_type in TELEMETRY_TRIGGER_ACTS
+    ):
+        TelemetryService(session).snapshot_for_session(session_id)
+
+    return events
+
+
 def _verify_signature_input(event_in: UnderstandingEventIn, session: Session) -> dict:
     if not event_in.signature:
         raise HTTPException(status_code=400, detail="Signature required")
-    key = KeyRegistry(session).get(event_in.actor_id)
-    if not key:
+    try:
+        public_key = KeyRegistry(session).public_key(event_in.actor_id)
+    except ValueError as exc:  # stored key is malformed
+        raise HTTPException(status_code=400, detail="Signature verification failed") from exc
+    if public_key is None:
         raise HTTPException(status_code=400, detail="Actor key not registered")
 
     try:
-        signature_bytes = base64.b64decode(event_in.signature)
-    except Exception as exc:
+        signature_bytes = decode_signature(event_in.signature)
+    except ValueError as exc:
         raise HTTPException(status_code=400, detail="Invalid signature encoding") from exc
 
-    message = canonical_bytes(
-        {
-            "session_id": event_in.session_id,
-            "actor_id": event_in.actor_id,
-            "actor_type": event_in.actor_type.value,
-            "act_type": event_in.act_type.value,
-            "payload": event_in.payload,
-            "artifact_hash": event_in.artifact_hash,
-        }
-    )
+    message = canonical_bytes(signature_envelope(event_in))
     try:
-        verify_signature(bytes.fromhex(key.public_key_hex), message, signature_bytes)
+        verify_signature(public_key, message, signature_bytes)
     except Exception as exc:
         raise HTTPException(status_code=400, detail="Signature verification failed") from exc
 
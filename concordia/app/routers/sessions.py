@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from sqlmodel import Session, select
 
 from ..deps import db_session
+from ..domain.merkle import inclusion_proof
 from ..domain.models import (
     ActType,
     ActorType,
@@ -14,7 +15,9 @@ from ..domain.models import (
     SessionRecordRead,
     UnderstandingEventCreate,
 )
-from ..services.ledger import LedgerService
+from ..domain.schemas import InclusionProofOut
+from ..infra.segments import SegmentLockError
+from ..services.ledger import ChainConflictError, LedgerService
 
 router = APIRouter()
 
@@ -44,16 +47,23 @@ def create_session(payload: SessionCreate, session: Session = Depends(db_session
     session.add(record)
     session.flush()
     session.refresh(record)
-    LedgerService(session).append(
-        UnderstandingEventCreate(
-            session_id=record.id,
-            actor_id=record.doctor_id,
-            actor_type=ActorType.DOCTOR,
-            act_type=ActType.PRESENT,
-            artifact_hash=record.artifact_hash,
-            payload={"title": record.title},
+    try:
+        LedgerService(session).append(
+            UnderstandingEventCreate(
+                session_id=record.id,
+                actor_id=record.doctor_id,
+                actor_type=ActorType.DOCTOR,
+                act_type=ActType.PRESENT,
+                artifact_hash=record.artifact_hash,
+                payload={"title": record.title},
+            )
         )
-    )
+    except ChainConflictError as exc:  # events already chained under this id
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except SegmentLockError as exc:  # another transaction holds the session; nothing written
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "1"}
+        ) from exc
     return record
 
 
@@ -85,3 +95,26 @@ def update_status(
     session.flush()
     session.refresh(record)
     return record
+
+
+@router.get("/{session_id}/proof/{event_id}", response_model=InclusionProofOut)
+def get_inclusion_proof(session_id: str, event_id: str, session: Session = Depends(db_session)):
+    """Prove one event belongs to the session's Merkle tree with ~log2(n) hashes.
+
+    Verify offline with ``concordia.app.domain.merkle.verify_inclusion_proof``.
+    """
+    rows = LedgerService(session).chain_hashes(session_id)
+    index = next((i for i, row in enumerate(rows) if row[0] == event_id), None)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Event not found in session")
+    leaves = [bytes.fromhex(row[1]) for row in rows]
+    root, path = inclusion_proof(leaves, index)
+    return InclusionProofOut(
+        session_id=session_id,
+        event_id=event_id,
+        leaf_index=index,
+        tree_size=len(leaves),
+        leaf=rows[index][1],
+        root=root.hex(),
+        audit_path=[node.hex() for node in path],
+    )
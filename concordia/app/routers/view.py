@@ -1,17 +1,16 @@
 """Patient/physician view routes."""
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select
+from sqlmodel import Session
 
 from ..deps import db_session
 from ..domain.models import (
     ActType,
     ActorType,
     SessionRecord,
-    UnderstandingEvent,
     UnderstandingEventCreate,
 )
 from ..domain.schemas import (
@@ -43,6 +42,8 @@ def session_timeline(
     session_id: str,
     viewer_id: str,
     viewer_role: ActorType,
+    after_seq: int = Query(0, ge=0, description="return events after this seq"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     session: Session = Depends(db_session),
 ):
     AccessEvaluator(session).enforce(
@@ -50,12 +51,7 @@ def session_timeline(
         action="view_timeline",
         resource=session_id,
     )
-    stmt = (
-        select(UnderstandingEvent)
-        .where(UnderstandingEvent.session_id == session_id)
-        .order_by(UnderstandingEvent.created_at.asc())
-    )
-    return session.exec(stmt).all()
+    return LedgerService(session).timeline(session_id, after_seq=after_seq, limit=limit)
 
 
 @router.get(
@@ -73,6 +69,8 @@ def session_timeline_html(
         session_id=session_id,
         viewer_id=viewer_id,
         viewer_role=ActorType.PATIENT,
+        after_seq=0,
+        limit=None,
         session=session,
     )
     metrics = (
@@ -0,0 +1,138 @@
+"""Cold archive tier: move finished sessions out of the hot ledger tables."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from ..domain.merkle import chain_problems
+from ..domain.models import SessionArchive, SessionRecord, UnderstandingEvent
+from ..infra.archive import (
+    ArchiveCorruptError,
+    archive_blob_name,
+    blob_digest,
+    decode_archive,
+    encode_archive,
+    load_archive,
+)
+from ..infra.segments import encode_event
+from ..infra.storage import read_blob, write_blob
+from .ledger import LedgerService
+
+ARCHIVABLE_STATUSES = ("sealed", "closed")
+ARCHIVED_STATUS = "archived"
+
+
+class ArchiveError(RuntimeError):
+    """A session cannot be archived (wrong state, broken chain, bad round-trip)."""
+
+
+def verify_archived(session: Session, session_id: str) -> List[str]:
+    """Re-check an archived session's blob against its stub; returns problems.
+
+    Needs only the stub row, so verifiers can call it whatever ledger
+    backend the process is configured for.
+    """
+    stub = session.get(SessionArchive, session_id)
+    if stub is None:
+        return [f"session {session_id} is not archived"]
+    try:
+        header, events = load_archive(stub.blob_name, stub.sha256, cache=False)
+    except ArchiveCorruptError as exc:
+        return [str(exc)]
+    problems = chain_problems(events)
+    if len(events) != stub.events_count:
+        problems.append(f"archive holds {len(events)} events, stub says {stub.events_count}")
+    if header["last_curr_hash"] != stub.last_curr_hash or (
+        events and events[-1].curr_hash != stub.last_curr_hash
+    ):
+        problems.append("chain tip does not match the stub")
+    return problems
+
+
+class ArchiveService:
+    """Export sealed/closed sessions to storage and drop their hot rows.
+
+    The ``sessions`` row stays (status ``archived``) together with a
+    ``SessionArchive`` stub; ``LedgerService`` reads the events back from
+    the archive when the hot table has none, so timeline and proof
+    endpoints keep working. Signature records are left in place.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.ledger = LedgerService(session)
+        if self.ledger.store is not None or self.ledger.chain_scope != "session":
+            raise ValueError("archiving requires the sql backend with per-session chains")
+
+    def candidates(self, older_than: Optional[datetime] = None, limit: Optional[int] = None) -> List[str]:
+        stmt = (
+            select(SessionRecord.id)
+            .where(SessionRecord.status.in_(ARCHIVABLE_STATUSES))
+            .order_by(SessionRecord.created_at.asc())
+        )
+        if older_than is not None:
+            stmt = stmt.where(SessionRecord.created_at < older_than)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return list(self.session.exec(stmt).all())
+
+    def archive_session(self, session_id: str) -> SessionArchive:
+        """Export, verify the round-trip, then delete the hot events.
+
+        Nothing is deleted unless the blob read back from storage decodes to
+        byte-identical events and a valid chain. The caller commits.
+        """
+        record = self.session.get(SessionRecord, session_id)
+        if record is None:
+            raise ArchiveError(f"session {session_id} not found")
+        if record.status not in ARCHIVABLE_STATUSES:
+            raise ArchiveError(f"session {session_id} is {record.status!r}, not sealed or closed")
+
+        # hold the chain lock so no event lands between export and delete
+        self.ledger.lock_chain(session_id)
+        events = self.ledger.timeline(session_id)
+        if not events:
+            raise ArchiveError(f"session {session_id} has no events")
+        problems = chain_problems(events)
+        if problems:
+            raise ArchiveError(f"session {session_id} chain does not verify: {problems[0]}")
+
+        blob_name = archive_blob_name(session_id)
+        data = encode_archive(record, events)
+        write_blob(blob_name, data)
+        self._check_round_trip(blob_name, blob_digest(data), events)
+
+        stub = SessionArchive(
+            session_id=session_id,
+            blob_name=blob_name,
+            sha256=blob_digest(data),
+            events_count=len(events),
+            last_curr_hash=events[-1].curr_hash,
+            archived_at=datetime.utcnow(),
+        )
+        self.session.add(stub)
+        self.session.execute(
+            delete(UnderstandingEvent).where(UnderstandingEvent.session_id == session_id)
+        )
+        record.status = ARCHIVED_STATUS
+        self.session.add(record)
+        self.session.flush()
+        return stub
+
+    def verify(self, session_id: str) -> List[str]:
+        """Re-check an archived session against its stub; returns problems."""
+        return verify_archived(self.session, session_id)
+
+    def _check_round_trip(self, blob_name: str, sha256: str, events: List[UnderstandingEvent]) -> None:
+        data = read_blob(blob_name)
+        if blob_digest(data) != sha256:
+            raise ArchiveError(f"archive blob {blob_name} changed on write")
+        _, restored = decode_archive(data)
+        if [encode_event(event) for event in restored] != [encode_event(event) for event in events]:
+            raise ArchiveError(f"archive blob {blob_name} does not round-trip")
+        problems = chain_problems(restored)
+        if problems:
+            raise ArchiveError(f"archive blob {blob_name} chain does not verify: {problems[0]}")
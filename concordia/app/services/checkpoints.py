@@ -0,0 +1,77 @@
+"""Signed ledger checkpoints for incremental chain verification."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from ..domain.merkle import canonical_bytes
+from ..domain.models import LedgerCheckpoint
+from ..domain.sign import public_key_from_private, sign_message, verify_signature
+
+
+def checkpoint_message(checkpoint: LedgerCheckpoint) -> bytes:
+    return canonical_bytes(
+        {
+            "session_id": checkpoint.session_id,
+            "seq": checkpoint.seq,
+            "curr_hash": checkpoint.curr_hash,
+            "count": checkpoint.count,
+            "verified_at": checkpoint.verified_at.isoformat(),
+        }
+    )
+
+
+class CheckpointService:
+    """Record and trust-check verified chain positions per session.
+
+    A checkpoint says "events 1..seq of this session were recomputed and
+    matched, ending in curr_hash". The next verification run starts after
+    it instead of from the first event.
+    """
+
+    def __init__(self, session: Session, private_key: bytes) -> None:
+        self.session = session
+        self.private_key = private_key
+        self.public_key_hex = public_key_from_private(private_key).hex()
+
+    def latest(self, session_id: str) -> Optional[LedgerCheckpoint]:
+        stmt = (
+            select(LedgerCheckpoint)
+            .where(LedgerCheckpoint.session_id == session_id)
+            .order_by(LedgerCheckpoint.seq.desc(), LedgerCheckpoint.verified_at.desc())
+            .limit(1)
+        )
+        return self.session.exec(stmt).first()
+
+    def record(self, session_id: str, seq: int, curr_hash: str, count: int) -> LedgerCheckpoint:
+        checkpoint = LedgerCheckpoint(
+            session_id=session_id,
+            seq=seq,
+            curr_hash=curr_hash,
+            count=count,
+            verified_at=datetime.utcnow(),
+            public_key_hex=self.public_key_hex,
+            signature_hex="",
+        )
+        checkpoint.signature_hex = sign_message(
+            self.private_key, checkpoint_message(checkpoint)
+        ).hex()
+        self.session.add(checkpoint)
+        self.session.flush()
+        return checkpoint
+
+    def is_trusted(self, checkpoint: LedgerCheckpoint) -> bool:
+        """Signed by *this* server key and unmodified since."""
+        if checkpoint.public_key_hex != self.public_key_hex:
+            return False
+        try:
+            verify_signature(
+                bytes.fromhex(checkpoint.public_key_hex),
+                checkpoint_message(checkpoint),
+                bytes.fromhex(checkpoint.signature_hex),
+            )
+        except Exception:
+            return False
+        return True
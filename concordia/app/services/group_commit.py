@@ -0,0 +1,177 @@
+"""Group-commit writer that coalesces concurrent ledger appends.
+
+Request threads hand their event to a queue and wait on a future; one writer
+thread drains the queue every ``max_delay`` seconds (or as soon as
+``max_batch`` events are waiting), chains the whole group with
+``LedgerService.append_many`` and commits it in one transaction. Under load
+this turns N commits into one while keeping per-event latency bounded by
+``max_delay`` plus one write.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from typing import Callable, List, Optional, Tuple
+
+from sqlmodel import Session
+
+from ..domain.models import UnderstandingEvent, UnderstandingEventCreate
+from ..infra.db import SessionLocal
+from ..infra.segments import SegmentLedgerStore
+from .ledger import LedgerService
+
+GROUP_COMMIT_ENABLED = os.getenv("CONCORDIA_GROUP_COMMIT", "0").lower() not in ("0", "false", "")
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("CONCORDIA_GROUP_COMMIT_MAX_BATCH", "200"))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("CONCORDIA_GROUP_COMMIT_MAX_DELAY_MS", "5"))
+
+_Pending = Tuple[UnderstandingEventCreate, "Future[UnderstandingEvent]"]
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int = GROUP_COMMIT_MAX_BATCH,
+        max_delay: float = GROUP_COMMIT_MAX_DELAY_MS / 1000,
+        chain_scope: Optional[str] = None,
+        store: Optional[SegmentLedgerStore] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.chain_scope = chain_scope
+        self.store = store
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "GroupCommitWriter":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="concordia-group-commit", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Write what is queued, then fail anything the thread did not reach."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("group-commit writer stopped"))
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)  # still writing past the timeout; let it exit after
+
+    def submit(self, event_in: UnderstandingEventCreate) -> "Future[UnderstandingEvent]":
+        future: "Future[UnderstandingEvent]" = Future()
+        with self._lock:  # never enqueue behind the stop sentinel
+            if self._thread is None:
+                raise RuntimeError("group-commit writer is not running")
+            self._queue.put((event_in, future))
+        return future
+
+    def append(self, event_in: UnderstandingEventCreate, timeout: float = 10.0) -> UnderstandingEvent:
+        """Blocking append: returns once the event's group has committed.
+
+        If no group has picked the event up within ``timeout`` it is
+        withdrawn and ``TimeoutError`` is raised with nothing written. Once
+        its group is being written the call waits for that outcome instead,
+        so a client retrying after an error never duplicates an event.
+        """
+        future = self.submit(event_in)
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch: List[_Pending] = [item]
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: List[_Pending]) -> None:
+        # claim the futures; events whose caller gave up are dropped unwritten
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            events = self._commit([event_in for event_in, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+            else:
+                # isolate the failing event instead of failing the whole group
+                self._write_each(batch)
+            return
+        for (_, future), event in zip(batch, events):
+            future.set_result(event)
+
+    def _write_each(self, batch: List[_Pending]) -> None:
+        for event_in, future in batch:
+            try:
+                future.set_result(self._commit([event_in])[0])
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def _commit(self, events_in: List[UnderstandingEventCreate]) -> List[UnderstandingEvent]:
+        with self.session_factory() as session:
+            ledger = LedgerService(session, chain_scope=self.chain_scope, store=self.store)
+            events = ledger.append_many(events_in)
+            session.commit()
+            return events
+
+
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+
+def group_writer() -> Optional[GroupCommitWriter]:
+    """Process-wide writer when ``CONCORDIA_GROUP_COMMIT`` is on, else ``None``."""
+    global _writer
+    if not GROUP_COMMIT_ENABLED:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = GroupCommitWriter(SessionLocal).start()
+        return _writer
+
+
+def shutdown_group_writer() -> None:
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
@@ -1,7 +1,117 @@
 """Actor key registry helpers."""
+from collections import OrderedDict
+from datetime import datetime
+import os
+from pathlib import Path
+import threading
+import time
+from typing import NamedTuple, Optional
+import weakref
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, select
 
 from ..domain.models import ActorKey
+from ..domain.sign import generate_keypair, load_public_key
+from ..infra.storage import STORAGE_ROOT
+
+SERVER_KEY_HEX = os.getenv("CONCORDIA_SERVER_KEY_HEX")
+SERVER_KEY_PATH = Path(
+    os.getenv("CONCORDIA_SERVER_KEY_PATH", str(STORAGE_ROOT / "server_ed25519.key"))
+)
+# Parsed public keys kept per process; entries older than the TTL are
+# revalidated against actor_keys.updated_at before use. The default 0
+# revalidates on every call (one primary-key lookup, no re-parse); a
+# positive TTL is how long a key revoked by another worker may still verify.
+KEY_CACHE_SIZE = int(os.getenv("CONCORDIA_KEY_CACHE_SIZE", "1024"))
+KEY_CACHE_TTL = float(os.getenv("CONCORDIA_KEY_CACHE_TTL", "0"))
+
+
+def load_server_key(path: Optional[Path] = None) -> bytes:
+    """Raw Ed25519 private key the server signs its own records with.
+
+    ``CONCORDIA_SERVER_KEY_HEX`` wins; otherwise the key file is read, and
+    created on first use so a fresh deployment can start signing.
+    """
+    if SERVER_KEY_HEX and path is None:
+        return bytes.fromhex(SERVER_KEY_HEX)
+    key_path = Path(path) if path else SERVER_KEY_PATH
+    if key_path.exists():
+        return bytes.fromhex(key_path.read_text().strip())
+    private_bytes, _ = generate_keypair()
+    key_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # created 0600 in one step: never readable by others, whatever the umask
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:  # another process created it first
+        return bytes.fromhex(key_path.read_text().strip())
+    with os.fdopen(fd, "w") as handle:
+        handle.write(private_bytes.hex())
+    return private_bytes
+
+
+class _CachedKey(NamedTuple):
+    public_key_hex: str
+    updated_at: Optional[datetime]
+    public_key: Ed25519PublicKey
+    checked_at: float  # time.monotonic() of the last DB confirmation
+
+
+class _PublicKeyCache:
+    """Bounded LRU of parsed public keys per engine.
+
+    ``register`` in this process drops the entry once its transaction
+    commits; a key replaced by another worker is noticed when the entry's
+    TTL runs out and its ``updated_at`` no longer matches the row.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: "weakref.WeakKeyDictionary[Engine, OrderedDict[str, _CachedKey]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, engine: Engine, actor_id: str) -> Optional[_CachedKey]:
+        with self._lock:
+            entries = self._entries.get(engine)
+            if entries is None or actor_id not in entries:
+                return None
+            entries.move_to_end(actor_id)
+            return entries[actor_id]
+
+    def put(self, engine: Engine, actor_id: str, entry: _CachedKey) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(engine, OrderedDict())
+            entries[actor_id] = entry
+            entries.move_to_end(actor_id)
+            while len(entries) > KEY_CACHE_SIZE:
+                entries.popitem(last=False)
+
+    def invalidate(self, engine: Engine, actor_id: str) -> None:
+        with self._lock:
+            self._entries.get(engine, {}).pop(actor_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+KEY_CACHE = _PublicKeyCache()
+_PENDING_INVALIDATIONS_KEY = "concordia.keys.pending_invalidations"
+
+
+def _invalidate_registered_keys(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if pending:
+        for engine, actor_ids in pending.items():
+            for actor_id in actor_ids:
+                KEY_CACHE.invalidate(engine, actor_id)
+
+
+def _discard_registered_keys(session: Session, *_args) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
 
 
 class KeyRegistry:
@@ -12,16 +122,72 @@ class KeyRegistry:
         key = self.session.get(ActorKey, actor_id)
         if key:
             key.public_key_hex = public_key_hex
+            key.updated_at = datetime.utcnow()
         else:
             key = ActorKey(actor_id=actor_id, public_key_hex=public_key_hex)
             self.session.add(key)
         self.session.flush()
         self.session.refresh(key)
+        self._invalidate_on_commit(actor_id)
         return key
 
     def get(self, actor_id: str) -> ActorKey | None:
         return self.session.get(ActorKey, actor_id)
 
+    def public_key(self, actor_id: str) -> Optional[Ed25519PublicKey]:
+        """Parsed public key of ``actor_id``, or None if none is registered.
+
+        Served from the process cache without a query while the entry is
+        younger than ``KEY_CACHE_TTL`` (by default never); otherwise one
+        ``updated_at`` lookup confirms it, and the key is re-parsed only if
+        it changed.
+        Raises ``ValueError`` if the stored key is not a valid Ed25519 key.
+        """
+        engine = self._engine()
+        now = time.monotonic()
+        cached = KEY_CACHE.get(engine, actor_id)
+        if cached is not None:
+            if now - cached.checked_at < KEY_CACHE_TTL:
+                return cached.public_key
+            row = self.session.exec(
+                select(ActorKey.public_key_hex, ActorKey.updated_at).where(
+                    ActorKey.actor_id == actor_id
+                )
+            ).first()
+            if row is not None and tuple(row) == (cached.public_key_hex, cached.updated_at):
+                KEY_CACHE.put(engine, actor_id, cached._replace(checked_at=now))
+                return cached.public_key
+            KEY_CACHE.invalidate(engine, actor_id)
+            if row is None:
+                return None
+            public_key_hex, updated_at = row
+        else:
+            key = self.get(actor_id)
+            if key is None:
+                return None
+            public_key_hex, updated_at = key.public_key_hex, key.updated_at
+        public_key = load_public_key(bytes.fromhex(public_key_hex))
+        KEY_CACHE.put(engine, actor_id, _CachedKey(public_key_hex, updated_at, public_key, now))
+        return public_key
+
+    @staticmethod
+    def clear_cache() -> None:
+        KEY_CACHE.clear()
+
     def list(self) -> list[ActorKey]:
         stmt = select(ActorKey).order_by(ActorKey.actor_id)
         return list(self.session.exec(stmt).all())
+
+    def _invalidate_on_commit(self, actor_id: str) -> None:
+        # dropping the entry before commit would let a concurrent reader
+        # re-cache the old key from the still-committed row
+        info = self.session.info
+        if not info.get("concordia.keys.listening"):
+            sa_event.listen(self.session, "after_commit", _invalidate_registered_keys)
+            sa_event.listen(self.session, "after_rollback", _discard_registered_keys)
+            info["concordia.keys.listening"] = True
+        info.setdefault(_PENDING_INVALIDATIONS_KEY, {}).setdefault(self._engine(), set()).add(actor_id)
+
+    def _engine(self) -> Engine:
+        bind = self.session.get_bind()
+        return getattr(bind, "engine", bind)
@@ -1,27 +1,355 @@
 """Ledger service handles append-only understanding events."""
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from collections import Counter
+import hashlib
+from itertools import chain
+import logging
+import os
+import threading
+import weakref
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
+from sqlalchemy import delete, event as sa_event, func, insert, text, update
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, select
 
-from ..domain.merkle import compute_chain_hash
-from ..domain.models import UnderstandingEvent, UnderstandingEventCreate
+from ..domain.merkle import compute_content_hash, event_envelope, link_content_hash
+from ..domain.models import (
+    ActType,
+    SegmentOutboxRecord,
+    SessionArchive,
+    SessionRecord,
+    UnderstandingEvent,
+    UnderstandingEventCreate,
+)
+from ..infra import partitions
+from ..infra.archive import load_archive
+from ..infra.segments import (
+    SegmentCorruptError,
+    SegmentLedgerStore,
+    SegmentTransaction,
+    decode_event,
+    encode_event,
+    segment_store,
+)
+
+logger = logging.getLogger(__name__)
+
+# "session": every session is an independent chain (prev_hash = session tip).
+# "global": legacy single chain across all sessions, ordered by global_seq
+# (rows from before that column by created_at).
+CHAIN_SCOPE = os.getenv("CONCORDIA_CHAIN_SCOPE", "session").lower()
+CHAIN_SCOPES = ("session", "global")
+GLOBAL_CHAIN_KEY = "__global__"
+
+# "sql": events live in understanding_events (default).
+# "segment": events live in append-only segment files (infra/segments.py);
+# sessions, signatures and metrics stay in SQL. Segment records are written
+# after the SQL transaction commits, so a rollback leaves no orphan events;
+# until they are on disk the events wait in the segment_outbox table, which
+# the next writer of the session replays.
+LEDGER_BACKEND = os.getenv("CONCORDIA_LEDGER_BACKEND", "sql").lower()
+LEDGER_BACKENDS = ("sql", "segment")
+
+# Partitioned reads start this far before a session's first event, so an
+# event stamped by a host whose clock lags a little is never pruned away.
+PARTITION_FLOOR_SLACK = timedelta(days=1)
+
+
+class ChainConflictError(RuntimeError):
+    """The stored chain tip went backwards relative to what this process committed."""
+
+
+class SessionArchivedError(ChainConflictError):
+    """The session's events were moved to the cold archive; its chain is closed."""
+
+
+class _ChainTipCache:
+    """Per-process record of the last committed ``(seq, curr_hash)`` per session.
+
+    The database stays the source of truth: the cache is compared with the
+    tip read under the chain lock so a tip that moved *backwards* (rows
+    deleted or rewritten underneath us) is reported instead of being chained
+    onto. Entries are only updated after a successful commit.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tips: "weakref.WeakKeyDictionary[Engine, Dict[str, Tuple[int, Optional[str]]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, engine: Engine, session_id: str) -> Optional[Tuple[int, Optional[str]]]:
+        with self._lock:
+            return self._tips.get(engine, {}).get(session_id)
+
+    def update(self, engine: Engine, tips: Dict[str, Tuple[int, Optional[str]]]) -> None:
+        with self._lock:
+            cached = self._tips.setdefault(engine, {})
+            for session_id, tip in tips.items():
+                if session_id not in cached or cached[session_id][0] < tip[0]:
+                    cached[session_id] = tip
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tips.clear()
+
+
+TIP_CACHE = _ChainTipCache()
+_PENDING_TIPS_KEY = "concordia.ledger.pending_tips"
+
+
+def _advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for ``pg_advisory_xact_lock``."""
+    digest = hashlib.sha256(f"concordia:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _publish_pending_tips(session: Session) -> None:
+    pending = session.info.pop(_PENDING_TIPS_KEY, None)
+    if pending:
+        for engine, tips in pending.items():
+            TIP_CACHE.update(engine, tips)
+
+
+def _discard_pending_tips(session: Session, *_args) -> None:
+    session.info.pop(_PENDING_TIPS_KEY, None)
+
+
+_SEGMENT_TRANSACTIONS_KEY = "concordia.ledger.segment_transactions"
+
+
+def _journal_segment_writes(session: Session) -> None:
+    """Record the pending segment events in the SQL transaction about to commit."""
+    for transaction in session.info.get(_SEGMENT_TRANSACTIONS_KEY, {}).values():
+        rows = [
+            {
+                "event_id": event.id,
+                "session_id": event.session_id,
+                "seq": event.seq,
+                "record": encode_event(event).decode("utf-8"),
+                "created_at": event.created_at,
+            }
+            for event in transaction.events()
+        ]
+        if rows:
+            session.execute(insert(SegmentOutboxRecord), rows)
+
+
+def _commit_segment_writes(session: Session) -> None:
+    transactions = list(session.info.pop(_SEGMENT_TRANSACTIONS_KEY, {}).values())
+    written: List[str] = []
+    for transaction in transactions:
+        event_ids = [event.id for event in transaction.events()]
+        try:
+            transaction.commit(sync=True)
+        except Exception:
+            # the SQL side has committed, so this must not fail the request:
+            # the events stay journaled and the session's next writer replays them
+            logger.exception(
+                "segment write failed; %d events left in segment_outbox", len(event_ids)
+            )
+        else:
+            written += event_ids
+    if not written:
+        return
+    bind = session.get_bind()
+    try:
+        with getattr(bind, "engine", bind).begin() as connection:
+            for start in range(0, len(written), 500):
+                connection.execute(
+                    delete(SegmentOutboxRecord).where(
+                        SegmentOutboxRecord.event_id.in_(written[start : start + 500])
+                    )
+                )
+    except Exception:
+        # harmless leftovers: replay drops rows whose records are already written
+        logger.exception("could not clear %d written events from segment_outbox", len(written))
+
+
+def _release_segment_writes(session: Session, transaction) -> None:
+    if transaction.parent is None:  # the outermost transaction ended without a commit
+        for segment_transaction in session.info.pop(_SEGMENT_TRANSACTIONS_KEY, {}).values():
+            segment_transaction.release()
 
 
 class LedgerService:
     """Append-only ledger backed by SQLModel and Merkle chaining."""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        chain_scope: Optional[str] = None,
+        store: Optional[SegmentLedgerStore] = None,
+    ) -> None:
         self.session = session
+        self.chain_scope = (chain_scope or CHAIN_SCOPE).lower()
+        if self.chain_scope not in CHAIN_SCOPES:
+            raise ValueError(f"Unknown chain scope: {self.chain_scope}")
+        if LEDGER_BACKEND not in LEDGER_BACKENDS:
+            raise ValueError(f"Unknown ledger backend: {LEDGER_BACKEND}")
+        if store is None and LEDGER_BACKEND == "segment":
+            store = segment_store()
+        if store is not None and self.chain_scope != "session":
+            raise ValueError("the segment ledger backend only supports per-session chains")
+        self.store = store
 
     def append(self, event_in: UnderstandingEventCreate) -> UnderstandingEvent:
-        prev_hash = self._latest_hash()
+        if self.store is not None:
+            return self._segment_transaction().append_many([event_in], self._build_event)[0]
+        self.lock_chain(event_in.session_id)
+        last_seq, prev_hash = self._chain_tip(event_in.session_id)
+        self._check_cached_tip(event_in.session_id, last_seq, prev_hash)
+
+        event = self._build_event(event_in, last_seq + 1, prev_hash, datetime.utcnow())
+        if self.chain_scope == "global":
+            event.global_seq = self._global_tip()[0] + 1
+        self.session.add(event)
+        self.session.flush()
+        self.session.refresh(event)
+        if event.seq == 1:
+            self._record_first_events({event.session_id: event.created_at})
+        self._remember_tip(event.session_id, event.seq, event.curr_hash)
+        return event
+
+    def timeline(
+        self,
+        session_id: str,
+        after_seq: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[UnderstandingEvent]:
+        """Events of one session in chain order, as an index range scan on
+        ``(session_id, seq)``; page with ``after_seq`` = last seq seen."""
+        if self.store is not None:
+            events = self.store.timeline(session_id, after_seq, limit)
+            events += [e for e in self._pending_segment_events(session_id) if e.seq > after_seq]
+            return events[:limit]
+        stmt = (
+            self._session_events(select(UnderstandingEvent), session_id)
+            .where(UnderstandingEvent.seq > after_seq)
+            .order_by(UnderstandingEvent.seq.asc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        events = list(self.session.exec(stmt).all())
+        if not events:
+            archived = self._archived_events(session_id)
+            if archived:
+                events = [event for event in archived if event.seq > after_seq][:limit]
+        return events
+
+    def act_type_counts(self, session_id: str) -> Dict[ActType, int]:
+        """Events per act type in one session (telemetry input).
+
+        One ``GROUP BY act_type`` answered from the ``(session_id, act_type)``
+        index; no rows or payloads are loaded.
+        """
+        if self.store is not None:
+            return dict(Counter(event.act_type for event in self._store_events(session_id)))
+        stmt = self._session_events(
+            select(UnderstandingEvent.act_type, func.count()), session_id
+        ).group_by(UnderstandingEvent.act_type)
+        counts = {act_type: count for act_type, count in self.session.exec(stmt).all()}
+        if not counts:
+            counts = dict(
+                Counter(event.act_type for event in self._archived_events(session_id) or ())
+            )
+        return counts
+
+    def chain_hashes(self, session_id: str) -> List[Tuple[str, str]]:
+        """``(event_id, curr_hash)`` of one session in chain order (Merkle leaves)."""
+        if self.store is not None:
+            return [(event.id, event.curr_hash) for event in self._store_events(session_id)]
+        stmt = (
+            self._session_events(
+                select(UnderstandingEvent.id, UnderstandingEvent.curr_hash), session_id
+            )
+            .where(UnderstandingEvent.curr_hash.is_not(None))
+            .order_by(UnderstandingEvent.seq.asc())
+        )
+        hashes = [tuple(row) for row in self.session.exec(stmt).all()]
+        if not hashes:
+            hashes = [
+                (event.id, event.curr_hash)
+                for event in self._archived_events(session_id) or ()
+                if event.curr_hash is not None
+            ]
+        return hashes
+
+    def recent(self, limit: int) -> List[UnderstandingEvent]:
+        """The newest ``limit`` events across all sessions, newest first."""
+        if self.store is not None:
+            return self.store.recent(limit)
+        stmt = (
+            select(UnderstandingEvent)
+            .order_by(UnderstandingEvent.created_at.desc(), UnderstandingEvent.seq.desc())
+            .limit(limit)
+        )
+        return list(self.session.exec(stmt).all())
+
+    def append_many(
+        self, events_in: Sequence[UnderstandingEventCreate]
+    ) -> List[UnderstandingEvent]:
+        """Append an ordered batch with one tip read per session and one INSERT.
+
+        Hashes are chained in memory in the given order; the rows are written
+        with a single multi-row insert instead of a flush/refresh per event.
+        """
+        if not events_in:
+            return []
+        if self.store is not None:
+            return self._segment_transaction().append_many(events_in, self._build_event)
+        session_ids = sorted({event_in.session_id for event_in in events_in})
+        # fixed lock order so two overlapping batches cannot deadlock
+        for session_id in session_ids if self.chain_scope == "session" else session_ids[:1]:
+            self.lock_chain(session_id)
+
+        tips: Dict[str, Tuple[int, Optional[str]]] = {}
+        for session_id in session_ids:
+            tips[session_id] = self._chain_tip(session_id)
+            self._check_cached_tip(session_id, *tips[session_id])
+        global_seq, global_prev = self._global_tip() if self.chain_scope == "global" else (0, None)
+
+        # one real timestamp for the batch; chain order is seq (per session)
+        # or global_seq, never created_at
         timestamp = datetime.utcnow()
+        events: List[UnderstandingEvent] = []
+        for event_in in events_in:
+            last_seq, prev_hash = tips[event_in.session_id]
+            if self.chain_scope == "global":
+                prev_hash = global_prev
+            event = self._build_event(event_in, last_seq + 1, prev_hash, timestamp)
+            if self.chain_scope == "global":
+                global_seq += 1
+                event.global_seq = global_seq
+            tips[event_in.session_id] = (event.seq, event.curr_hash)
+            global_prev = event.curr_hash
+            events.append(event)
 
+        columns = UnderstandingEvent.__table__.columns.keys()
+        self.session.execute(
+            insert(UnderstandingEvent),
+            [{name: getattr(event, name) for name in columns} for event in events],
+        )
+        self._record_first_events(
+            {event.session_id: event.created_at for event in events if event.seq == 1}
+        )
+        for session_id in session_ids:
+            self._remember_tip(session_id, *tips[session_id])
+        return events
+
+    @staticmethod
+    def _build_event(
+        event_in: UnderstandingEventCreate,
+        seq: int,
+        prev_hash: Optional[str],
+        timestamp: datetime,
+    ) -> UnderstandingEvent:
         event = UnderstandingEvent(
             session_id=event_in.session_id,
+            seq=seq,
             actor_id=event_in.actor_id,
             actor_type=event_in.actor_type,
             act_type=event_in.act_type,
@@ -34,27 +362,233 @@ class LedgerService:
 
         # Chain hash excludes signature to avoid circular dependency
         # and to keep hashing invariant stable across signature formats.
-        event.curr_hash = compute_chain_hash(
-            {
-                "session_id": event.session_id,
-                "actor_id": event.actor_id,
-                "actor_type": event.actor_type,
-                "act_type": event.act_type,
-                "payload": event.payload,
-                "artifact_hash": event.artifact_hash,
-                "created_at": event.created_at.isoformat(),
-            },
-            prev_hash,
+        # The envelope digest is stored so verification can re-link the
+        # chain from digests alone (see docs/INVARIANTS.md).
+        event.content_hash = compute_content_hash(event_envelope(event))
+        event.curr_hash = link_content_hash(event.content_hash, prev_hash)
+        return event
+
+    def lock_chain(self, session_id: str) -> None:
+        """Serialize appends to one chain until the surrounding transaction ends.
+
+        PostgreSQL takes a transaction-scoped advisory lock keyed by session
+        (or by the global chain), so independent sessions never wait on each
+        other. SQLite has a single writer anyway; ``BEGIN IMMEDIATE`` takes
+        the write lock *before* the tip is read so two connections cannot
+        both chain onto the same tip. Services that move a chain (archiving)
+        take the same lock so no append lands in between.
+        """
+        key = session_id if self.chain_scope == "session" else GLOBAL_CHAIN_KEY
+        dialect = self._engine().dialect.name
+        if dialect == "postgresql":
+            self.session.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": _advisory_lock_key(key)},
+            )
+        elif dialect == "sqlite":
+            dbapi_connection = self.session.connection().connection.driver_connection
+            if not dbapi_connection.in_transaction:
+                dbapi_connection.execute("BEGIN IMMEDIATE")
+
+    def _check_cached_tip(self, session_id: str, last_seq: int, prev_hash: Optional[str]) -> None:
+        if self.chain_scope != "session":
+            return
+        cached = TIP_CACHE.get(self._engine(), session_id)
+        if cached is None or cached[0] < last_seq:
+            # first append from this process, or another worker moved the tip
+            return
+        if cached != (last_seq, prev_hash):
+            raise ChainConflictError(
+                f"chain tip for session {session_id} moved backwards: "
+                f"cached seq={cached[0]} hash={cached[1]}, stored seq={last_seq} hash={prev_hash}"
+            )
+
+    def _remember_tip(self, session_id: str, seq: int, curr_hash: Optional[str]) -> None:
+        if self.chain_scope != "session":
+            return
+        info = self.session.info
+        if not info.get("concordia.ledger.listening"):
+            sa_event.listen(self.session, "after_commit", _publish_pending_tips)
+            sa_event.listen(self.session, "after_rollback", _discard_pending_tips)
+            info["concordia.ledger.listening"] = True
+        pending = info.setdefault(_PENDING_TIPS_KEY, {})
+        pending.setdefault(self._engine(), {})[session_id] = (seq, curr_hash)
+
+    def _segment_transaction(self) -> SegmentTransaction:
+        """Segment writes of the current SQL transaction, written once it commits.
+
+        The sessions stay locked until then; a rollback or close drops the
+        events unwritten. They are journaled in ``segment_outbox`` as part
+        of the SQL commit, so a failed write is replayed, not lost.
+        """
+        info = self.session.info
+        if not info.get("concordia.ledger.segment_listening"):
+            sa_event.listen(self.session, "before_commit", _journal_segment_writes)
+            sa_event.listen(self.session, "after_commit", _commit_segment_writes)
+            sa_event.listen(self.session, "after_transaction_end", _release_segment_writes)
+            info["concordia.ledger.segment_listening"] = True
+        transactions = info.setdefault(_SEGMENT_TRANSACTIONS_KEY, {})
+        if self.store not in transactions:
+            self.session.connection()  # begin the SQL transaction whose end releases the shards
+            transactions[self.store] = self.store.transaction(self._replay_segment_outbox)
+        return transactions[self.store]
+
+    def replay_segment_outbox(self) -> int:
+        """Replay every session left in ``segment_outbox`` (e.g. at startup).
+
+        Returns the number of sessions replayed; the caller commits.
+        """
+        session_ids = self.session.exec(
+            select(SegmentOutboxRecord.session_id).distinct()
+        ).all()
+        for session_id in session_ids:
+            shard = self.store.shard_for(session_id)
+            shard.lock_session(session_id)
+            try:
+                self._replay_segment_outbox(session_id)
+            finally:
+                shard.unlock_session(session_id)
+        return len(session_ids)
+
+    def _replay_segment_outbox(self, session_id: str) -> None:
+        """Write the session's committed events whose segment write failed.
+
+        Runs with the session locked, before its tip is read. The replayed
+        rows are deleted in the current transaction.
+        """
+        rows = self.session.exec(
+            select(SegmentOutboxRecord)
+            .where(SegmentOutboxRecord.session_id == session_id)
+            .order_by(SegmentOutboxRecord.seq)
+        ).all()
+        if not rows:
+            return
+        missing = []
+        for row in rows:
+            event = decode_event(row.record.encode("utf-8"))
+            written = self.store.get(session_id, event.seq)
+            if written is None:
+                missing.append(event)
+            elif written.curr_hash != event.curr_hash:
+                raise SegmentCorruptError(
+                    f"session {session_id} seq {event.seq} on disk differs from segment_outbox"
+                )
+        if missing:
+            tip_seq, _ = self.store.tip(session_id)
+            if [event.seq for event in missing] != list(
+                range(tip_seq + 1, tip_seq + 1 + len(missing))
+            ):
+                raise SegmentCorruptError(
+                    f"segment_outbox of session {session_id} does not continue its chain"
+                )
+            with self.store.shard_for(session_id).locked() as shard:
+                shard.append(missing)
+                shard.sync()
+        self.session.execute(
+            delete(SegmentOutboxRecord).where(
+                SegmentOutboxRecord.event_id.in_([row.event_id for row in rows])
+            )
         )
 
-        self.session.add(event)
-        self.session.flush()
-        self.session.refresh(event)
-        return event
+    def _pending_segment_events(self, session_id: str) -> List[UnderstandingEvent]:
+        transaction = self.session.info.get(_SEGMENT_TRANSACTIONS_KEY, {}).get(self.store)
+        return transaction.pending(session_id) if transaction is not None else []
+
+    def _store_events(self, session_id: str) -> Iterator[UnderstandingEvent]:
+        """Written events of one session plus this transaction's pending ones."""
+        return chain(self.store.iter_session(session_id), self._pending_segment_events(session_id))
+
+    def _engine(self) -> Engine:
+        bind = self.session.get_bind()
+        return getattr(bind, "engine", bind)
+
+    def _chain_tip(self, session_id: str) -> Tuple[int, Optional[str]]:
+        """Return ``(last_seq, prev_hash)`` for the next event of ``session_id``.
+
+        The session tip is served by the ``(session_id, seq)`` index, so the
+        lookup cost does not depend on how many other sessions the table holds.
+        """
+        # never floored: a session's events may predate its session row, and
+        # missing one here would fork the chain at seq=1
+        stmt = (
+            select(UnderstandingEvent.seq, UnderstandingEvent.curr_hash)
+            .where(UnderstandingEvent.session_id == session_id)
+            .where(UnderstandingEvent.seq.is_not(None))
+            .order_by(UnderstandingEvent.seq.desc())
+            .limit(1)
+        )
+        row = self.session.exec(stmt).first()
+        if row is None and self._archive_stub(session_id) is not None:
+            raise SessionArchivedError(f"session {session_id} is archived and read-only")
+        last_seq = row[0] if row else 0
+        if self.chain_scope == "global":
+            return last_seq, self._global_tip()[1]
+        return last_seq, row[1] if row else None
+
+    def _session_events(self, stmt, session_id: str):
+        """Restrict ``stmt`` to one session, plus a ``created_at`` floor when the
+        table is partitioned by month so PostgreSQL prunes older partitions."""
+        stmt = stmt.where(UnderstandingEvent.session_id == session_id)
+        floor = self._partition_floor(session_id)
+        if floor is not None:
+            stmt = stmt.where(UnderstandingEvent.created_at >= floor)
+        return stmt
+
+    def _partition_floor(self, session_id: str) -> Optional[datetime]:
+        # Only SessionRecord.first_event_at bounds the session's events: it
+        # is recorded when seq=1 is chained onto an existing session row.
+        # Rows created after their events leave it NULL (no floor).
+        if not partitions.PARTITIONED_EVENTS:
+            return None
+        record = self.session.get(SessionRecord, session_id)
+        if record is None or record.first_event_at is None:
+            return None
+        return record.first_event_at - PARTITION_FLOOR_SLACK
+
+    def _record_first_events(self, first_events: Dict[str, datetime]) -> None:
+        """Store ``first_event_at`` for sessions whose seq=1 was just chained."""
+        if not partitions.PARTITIONED_EVENTS or not first_events:
+            return
+        self.session.flush()  # a session row added in this transaction must exist
+        for session_id, created_at in first_events.items():
+            self.session.execute(
+                update(SessionRecord)
+                .where(SessionRecord.id == session_id)
+                .where(SessionRecord.first_event_at.is_(None))
+                .values(first_event_at=created_at)
+            )
+
+    def _archive_stub(self, session_id: str) -> Optional[SessionArchive]:
+        return self.session.get(SessionArchive, session_id)
+
+    def _archived_events(self, session_id: str) -> Optional[Sequence[UnderstandingEvent]]:
+        """Events of an archived session, read back from cold storage.
+
+        Only consulted when the hot table has nothing for the session, so
+        active sessions never pay for the stub lookup.
+        """
+        stub = self._archive_stub(session_id)
+        if stub is None:
+            return None
+        return load_archive(stub.blob_name, stub.sha256)[1]
+
+    def _global_tip(self) -> Tuple[int, Optional[str]]:
+        """``(global_seq, curr_hash)`` of the global chain tip (legacy ``global`` scope only).
 
-    def _latest_hash(self) -> Optional[str]:
-        stmt = select(UnderstandingEvent.curr_hash).order_by(
-            UnderstandingEvent.created_at.desc()
-        ).limit(1)
-        result = self.session.exec(stmt).first()
-        return result
+        Rows chained before ``global_seq`` existed have none; while no row has
+        one, the newest by ``created_at`` is the tip and numbering starts at 1.
+        """
+        row = self.session.exec(
+            select(UnderstandingEvent.global_seq, UnderstandingEvent.curr_hash)
+            .where(UnderstandingEvent.global_seq.is_not(None))
+            .order_by(UnderstandingEvent.global_seq.desc())
+            .limit(1)
+        ).first()
+        if row is not None:
+            return row[0], row[1]
+        legacy = self.session.exec(
+            select(UnderstandingEvent.curr_hash)
+            .order_by(UnderstandingEvent.created_at.desc(), UnderstandingEvent.seq.desc())
+            .limit(1)
+        ).first()
+        return 0, legacy
@@ -8,7 +8,7 @@ from typing import Optional
 
 from dotenv import load_dotenv
 import google.generativeai as genai
-from sqlmodel import Session, select
+from sqlmodel import Session
 
 from ..domain.models import (
     ComprehensionAssessment,
@@ -17,6 +17,7 @@ from ..domain.models import (
     ActorType,
     ActType,
 )
+from .ledger import LedgerService
 
 # .env ファイルをロード
 load_dotenv()
@@ -35,11 +36,7 @@ class LLMAssessmentService:
 
     def assess_session(self, session_id: str) -> ComprehensionAssessment:
         """Evaluate comprehension quality for a completed session."""
-        events = self.session.exec(
-            select(UnderstandingEvent)
-            .where(UnderstandingEvent.session_id == session_id)
-            .order_by(UnderstandingEvent.created_at)
-        ).all()
+        events = LedgerService(self.session).timeline(session_id)
 
         # 会話履歴を整形
         conversation = self._format_conversation(events)
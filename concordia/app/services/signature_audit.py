@@ -0,0 +1,227 @@
+"""Bulk re-verification of stored event signatures.
+
+Every ``signature_records`` row is checked again against the actor's
+registered key and the canonical message of its event (the same envelope
+``POST /events`` verified at ingestion). Rows are streamed from one joined,
+actor-ordered query and cut into per-actor chunks, so a worker parses each
+key once per chunk and never touches the database; chunks are verified in a
+process pool with a bounded number in flight.
+
+Events of archived sessions are read back from their archive blobs, in
+scans of at most ``AUDIT_MISSING_BATCH`` records (none at all when nothing
+is archived). Records whose event cannot be found are reported as failures
+with reason ``event not found``. The segment-file ledger is not supported: its events
+cannot be looked up by id.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from sqlmodel import Session, select
+
+from ..domain.merkle import canonical_bytes, signature_envelope
+from ..domain.models import ActorKey, SessionArchive, SignatureRecord, UnderstandingEvent
+from ..domain.sign import decode_signature, load_public_key
+from ..infra.archive import ArchiveCorruptError, load_archive
+from .ledger import LEDGER_BACKEND
+
+AUDIT_CHUNK_SIZE = int(os.getenv("CONCORDIA_AUDIT_CHUNK_SIZE", "2000"))
+AUDIT_STREAM_BATCH = 5000  # rows fetched per round trip
+AUDIT_MISSING_BATCH = 50000  # hot-table misses buffered per archive scan
+PENDING_PER_WORKER = 4
+MAX_FAILURES = 10000  # listed in the report; the count is always complete
+
+# (record_id, event_id, signature as stored, signed envelope or None)
+AuditItem = Tuple[str, str, str, Optional[Dict[str, Any]]]
+# (actor_id, public_key_hex or None, items)
+AuditChunk = Tuple[str, Optional[str], List[AuditItem]]
+
+
+def _failure(actor_id: str, record_id: str, event_id: str, reason: str) -> Dict[str, str]:
+    return {"record_id": record_id, "event_id": event_id, "actor_id": actor_id, "reason": reason}
+
+
+def verify_chunk(actor_id: str, public_key_hex: Optional[str], items: List[AuditItem]) -> List[Dict[str, str]]:
+    """Verify one actor's signatures with a single parsed key; returns failures."""
+    if public_key_hex is None:
+        return [_failure(actor_id, rid, eid, "actor key not registered") for rid, eid, _, _ in items]
+    try:
+        public_key = load_public_key(bytes.fromhex(public_key_hex))
+    except ValueError:
+        return [_failure(actor_id, rid, eid, "invalid public key") for rid, eid, _, _ in items]
+    failures = []
+    for record_id, event_id, signature, envelope in items:
+        if envelope is None:
+            failures.append(_failure(actor_id, record_id, event_id, "event not found"))
+            continue
+        if envelope["actor_id"] != actor_id:
+            failures.append(_failure(actor_id, record_id, event_id, "event has a different actor"))
+            continue
+        try:
+            signature_bytes = decode_signature(signature)
+        except ValueError:
+            failures.append(_failure(actor_id, record_id, event_id, "invalid signature encoding"))
+            continue
+        try:
+            public_key.verify(signature_bytes, canonical_bytes(envelope))
+        except InvalidSignature:
+            failures.append(_failure(actor_id, record_id, event_id, "signature mismatch"))
+    return failures
+
+
+def _run_chunk(chunk: AuditChunk) -> Tuple[int, List[Dict[str, str]]]:
+    actor_id, public_key_hex, items = chunk
+    return len(items), verify_chunk(actor_id, public_key_hex, items)
+
+
+class SignatureAuditService:
+    """Re-verify ``signature_records`` in bulk and summarize the failures."""
+
+    def __init__(self, session: Session, chunk_size: int = AUDIT_CHUNK_SIZE) -> None:
+        if LEDGER_BACKEND != "sql":
+            raise ValueError("the signature audit requires the sql ledger backend")
+        self.session = session
+        self.chunk_size = chunk_size
+        self._keys: Dict[str, str] = {}
+
+    def chunks(self, actor_id: Optional[str] = None) -> Iterator[AuditChunk]:
+        """Per-actor chunks of at most ``chunk_size`` records, streamed."""
+        stmt = (
+            select(
+                SignatureRecord.id,
+                SignatureRecord.event_id,
+                SignatureRecord.actor_id.label("record_actor_id"),
+                SignatureRecord.signature_hex,
+                UnderstandingEvent.session_id,
+                UnderstandingEvent.actor_id,
+                UnderstandingEvent.actor_type,
+                UnderstandingEvent.act_type,
+                UnderstandingEvent.payload,
+                UnderstandingEvent.artifact_hash,
+            )
+            .outerjoin(UnderstandingEvent, UnderstandingEvent.id == SignatureRecord.event_id)
+            .order_by(SignatureRecord.actor_id, SignatureRecord.id)
+            .execution_options(yield_per=AUDIT_STREAM_BATCH)
+        )
+        if actor_id is not None:
+            stmt = stmt.where(SignatureRecord.actor_id == actor_id)
+        # read up front: no other query runs while the result is streaming
+        self._keys = dict(self.session.exec(select(ActorKey.actor_id, ActorKey.public_key_hex)).all())
+        archives = list(self.session.exec(select(SessionArchive.blob_name, SessionArchive.sha256)).all())
+
+        current: Optional[str] = None
+        items: List[AuditItem] = []
+        missing: List[Tuple[str, AuditItem]] = []
+        for row in self.session.exec(stmt):
+            record_id, event_id, record_actor, signature = row[:4]
+            if record_actor != current or len(items) >= self.chunk_size:
+                if items:
+                    yield current, self._key(current), items
+                current, items = record_actor, []
+            if row.session_id is None:  # not in the hot table
+                if not archives:
+                    items.append((record_id, event_id, signature, None))
+                    continue
+                missing.append((record_actor, (record_id, event_id, signature, None)))
+                if len(missing) >= AUDIT_MISSING_BATCH:
+                    yield from self._archived_chunks(missing, archives)
+                    missing = []
+                continue
+            items.append((record_id, event_id, signature, signature_envelope(row)))
+        if items:
+            yield current, self._key(current), items
+        yield from self._archived_chunks(missing, archives)
+
+    def run(
+        self,
+        workers: Optional[int] = None,
+        actor_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Audit every record (or one actor's) and return the report dict.
+
+        ``workers=1`` verifies in-process; otherwise a process pool of
+        ``workers`` (default: CPU count) is used.
+        """
+        workers = workers or os.cpu_count() or 1
+        started = time.perf_counter()
+        records = failed = 0
+        actors: Set[str] = set()
+        failures: List[Dict[str, str]] = []
+        for count, chunk_failures in self._verify(self._tracked(self.chunks(actor_id), actors), workers):
+            records += count
+            failed += len(chunk_failures)
+            failures.extend(chunk_failures[: MAX_FAILURES - len(failures)])
+        seconds = time.perf_counter() - started
+        failures.sort(key=lambda failure: (failure["actor_id"], failure["record_id"]))
+        return {
+            "ok": failed == 0,
+            "records": records,
+            "failed": failed,
+            "actors": len(actors),
+            "workers": workers,
+            "seconds": round(seconds, 4),
+            "records_per_second": round(records / seconds, 1) if seconds else None,
+            "failures": failures,
+        }
+
+    @staticmethod
+    def _tracked(chunks: Iterable[AuditChunk], actors: Set[str]) -> Iterator[AuditChunk]:
+        for chunk in chunks:
+            actors.add(chunk[0])
+            yield chunk
+
+    @staticmethod
+    def _verify(
+        chunks: Iterable[AuditChunk], workers: int
+    ) -> Iterator[Tuple[int, List[Dict[str, str]]]]:
+        if workers == 1:
+            for chunk in chunks:
+                yield _run_chunk(chunk)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for chunk in chunks:
+                pending.add(pool.submit(_run_chunk, chunk))
+                if len(pending) >= workers * PENDING_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def _key(self, actor_id: str) -> Optional[str]:
+        return self._keys.get(actor_id)
+
+    def _archived_chunks(
+        self, missing: List[Tuple[str, AuditItem]], archives: List[Tuple[str, str]]
+    ) -> Iterator[AuditChunk]:
+        """Resolve events absent from the hot table through the session archives."""
+        if not missing:
+            return
+        wanted = {item[1] for _, item in missing}
+        envelopes: Dict[str, Dict[str, Any]] = {}
+        for blob_name, sha256 in archives:
+            try:
+                events = load_archive(blob_name, sha256, cache=False)[1]
+            except ArchiveCorruptError:
+                continue  # its records stay "event not found"
+            for event in events:
+                if event.id in wanted:
+                    envelopes[event.id] = signature_envelope(event)
+            if len(envelopes) == len(wanted):
+                break
+
+        by_actor: Dict[str, List[AuditItem]] = {}
+        for record_actor, (record_id, event_id, signature, _) in missing:
+            by_actor.setdefault(record_actor, []).append(
+                (record_id, event_id, signature, envelopes.get(event_id))
+            )
+        for record_actor, items in sorted(by_actor.items()):
+            for start in range(0, len(items), self.chunk_size):
+                yield record_actor, self._key(record_actor), items[start : start + self.chunk_size]
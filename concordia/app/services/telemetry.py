@@ -1,10 +1,8 @@
 """Telemetry aggregation service for Zero Pressure metrics."""
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Iterable
-
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Mapping
 
 from sqlalchemy import case, func
 from sqlmodel import Session, select
@@ -14,8 +12,8 @@ from ..domain.models import (
     ComfortZone,
     MetricsSnapshot,
     SessionRecord,
-    UnderstandingEvent,
 )
+from .ledger import LedgerService
 
 
 class TelemetryService:
@@ -23,16 +21,14 @@ class TelemetryService:
         self.session = session
 
     def snapshot_for_session(self, session_id: str) -> MetricsSnapshot:
-        events = self.session.exec(
-            select(UnderstandingEvent).where(UnderstandingEvent.session_id == session_id)
-        ).all()
-        total_events = max(len(events), 1)
+        counts = LedgerService(self.session).act_type_counts(session_id)
+        total_events = max(sum(counts.values()), 1)
 
-        clarify = self._count(events, {ActType.CLARIFY_REQUEST, ActType.ASK_LATER})
-        re_explain = self._count(events, {ActType.RE_EXPLAIN})
-        post_view = self._count(events, {ActType.RE_VIEW})
-        pending = self._count(events, {ActType.PENDING})
-        revoke = self._count(events, {ActType.REVOKE})
+        clarify = self._count(counts, {ActType.CLARIFY_REQUEST, ActType.ASK_LATER})
+        re_explain = self._count(counts, {ActType.RE_EXPLAIN})
+        post_view = self._count(counts, {ActType.RE_VIEW})
+        pending = self._count(counts, {ActType.PENDING})
+        revoke = self._count(counts, {ActType.REVOKE})
 
         zone = self._zone_from_rates(
             clarify / total_events,
@@ -58,8 +54,8 @@ class TelemetryService:
         return snapshot
 
     @staticmethod
-    def _count(events: Iterable[UnderstandingEvent], targets: set[ActType]) -> int:
-        return sum(1 for event in events if event.act_type in targets)
+    def _count(counts: Mapping[ActType, int], targets: set[ActType]) -> int:
+        return sum(counts.get(act_type, 0) for act_type in targets)
 
     @staticmethod
     def _zone_from_rates(
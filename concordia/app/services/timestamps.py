@@ -0,0 +1,277 @@
+"""Batched TSA timestamping of signature records.
+
+Signed events no longer wait on the timestamp authority. Their
+``SignatureRecord`` is stored ``pending`` with the event's ``curr_hash`` as
+digest; a background ``TimestampBatcher`` wakes every
+``CONCORDIA_TSA_BATCH_INTERVAL`` seconds, builds an RFC 6962 Merkle tree
+over the pending digests, timestamps only the root and stores one
+``TimestampAnchor``. Each record then holds its inclusion path to that
+root, so one TSA token covers the whole interval (the "anchor" of
+INVARIANTS.md §3).
+
+Before calling the TSA a batcher claims its rows with a conditional
+``UPDATE`` committed on its own, so batchers in several workers never
+anchor the same record twice; a claim left by a crashed batcher expires
+after ``CONCORDIA_TSA_CLAIM_TIMEOUT`` seconds. Without a TSA
+(``CONCORDIA_TSA_URL`` unset) records stay ``pending``: an anchor under the
+local, unsigned stub token could never be verified.
+
+With ``CONCORDIA_TSA_BATCH=0`` records are timestamped inline as before,
+waiting at most ``CONCORDIA_TSA_INLINE_WAIT`` seconds; a failing, slow or
+circuit-broken TSA defers the record to ``pending`` instead.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, select
+
+from ..domain.merkle import inclusion_proofs, verify_inclusion
+from ..domain.models import SignatureRecord, TimestampAnchor
+from ..infra.db import SessionLocal
+from ..infra import tsa
+from ..infra.tsa import TSAError, request_timestamp, verify_timestamp_token
+
+TSA_BATCH_ENABLED = os.getenv("CONCORDIA_TSA_BATCH", "1").lower() not in ("0", "false", "")
+TSA_BATCH_INTERVAL = float(os.getenv("CONCORDIA_TSA_BATCH_INTERVAL", "60"))
+TSA_BATCH_MAX = int(os.getenv("CONCORDIA_TSA_BATCH_MAX", "10000"))
+# inline mode: longest a request thread waits on the TSA before deferring
+TSA_INLINE_WAIT = float(os.getenv("CONCORDIA_TSA_INLINE_WAIT", "0.5"))
+# a claim older than this was left by a batcher that died mid-call
+TSA_CLAIM_TIMEOUT = float(os.getenv("CONCORDIA_TSA_CLAIM_TIMEOUT", "300"))
+
+TSA_PENDING = "pending"
+TSA_CLAIMED = "claimed"  # taken by one batcher, TSA call in flight
+TSA_ANCHORED = "anchored"
+TSA_STAMPED = "stamped"  # own token, requested inline
+
+logger = logging.getLogger(__name__)
+
+
+def timestamp_fields(curr_hash: Optional[str]) -> Dict[str, Any]:
+    """``tsa_token``/``tsa_status`` for a new ``SignatureRecord`` of an event."""
+    digest_hex = curr_hash or "00"
+    if TSA_BATCH_ENABLED:
+        return {"tsa_token": {"digest": digest_hex}, "tsa_status": TSA_PENDING}
+    try:
+        token = request_timestamp(bytes.fromhex(digest_hex), wait=TSA_INLINE_WAIT)
+    except TSAError:  # down, slow or circuit open: the batcher anchors it later
+        return {"tsa_token": {"digest": digest_hex}, "tsa_status": TSA_PENDING}
+    return {"tsa_token": token, "tsa_status": TSA_STAMPED}
+
+
+class TimestampBatchService:
+    def __init__(
+        self,
+        session: Session,
+        timestamp: Callable[[bytes], Dict[str, Any]] = request_timestamp,
+    ) -> None:
+        self.session = session
+        self.timestamp = timestamp
+
+    def anchor_pending(self, limit: int = TSA_BATCH_MAX) -> Optional[TimestampAnchor]:
+        """Anchor up to ``limit`` pending records under one TSA token.
+
+        Returns the anchor, or None if nothing was pending or no TSA is
+        configured. The records are claimed (and the claim committed) before
+        the TSA is called; ``TSAError`` releases the claim, propagates and
+        leaves them pending for the next run.
+        """
+        if self.timestamp is request_timestamp and not tsa.TSA_URL:
+            return None  # the stub token would never verify; wait for a real TSA
+        claim = self._claim(limit)
+        if claim is None:
+            return None
+        records = list(
+            self.session.exec(
+                select(SignatureRecord)
+                .where(SignatureRecord.tsa_claim == claim)
+                .order_by(SignatureRecord.created_at, SignatureRecord.id)
+            ).all()
+        )
+        digests = [record.tsa_token["digest"] for record in records]
+        try:
+            root, paths = inclusion_proofs([bytes.fromhex(digest) for digest in digests])
+            token = self.timestamp(root)
+        except BaseException:
+            self._release(claim)
+            raise
+        anchor = TimestampAnchor(root=root.hex(), tree_size=len(records), tsa_token=token)
+        self.session.add(anchor)
+        self.session.flush()
+        for index, (record, digest, path) in enumerate(zip(records, digests, paths)):
+            record.tsa_token = {
+                "digest": digest,
+                "anchor_id": anchor.id,
+                "root": anchor.root,
+                "leaf_index": index,
+                "tree_size": anchor.tree_size,
+                "audit_path": [node.hex() for node in path],
+                "timestamp": token.get("timestamp"),
+            }
+            record.tsa_status = TSA_ANCHORED
+            record.tsa_claim = None
+            self.session.add(record)
+        self.session.flush()
+        return anchor
+
+    def _claim(self, limit: int) -> Optional[str]:
+        """Mark up to ``limit`` claimable records as ours; returns the claim id."""
+        claimable = or_(
+            SignatureRecord.tsa_status == TSA_PENDING,
+            and_(
+                SignatureRecord.tsa_status == TSA_CLAIMED,
+                SignatureRecord.tsa_claimed_at
+                < datetime.utcnow() - timedelta(seconds=TSA_CLAIM_TIMEOUT),
+            ),
+        )
+        candidates = (
+            select(SignatureRecord.id)
+            .where(claimable)
+            .order_by(SignatureRecord.created_at, SignatureRecord.id)
+            .limit(limit)
+        )
+        engine = self._engine()
+        if engine.dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+        claim = str(uuid4())
+        with engine.begin() as conn:
+            ids = list(conn.execute(candidates).scalars())
+            if not ids:
+                return None
+            # re-checked by the UPDATE: a concurrent batcher's rows are skipped
+            claimed = conn.execute(
+                update(SignatureRecord)
+                .where(SignatureRecord.id.in_(ids), claimable)
+                .values(tsa_status=TSA_CLAIMED, tsa_claim=claim, tsa_claimed_at=datetime.utcnow())
+            ).rowcount
+        return claim if claimed else None
+
+    def _release(self, claim: str) -> None:
+        with self._engine().begin() as conn:
+            conn.execute(
+                update(SignatureRecord)
+                .where(
+                    SignatureRecord.tsa_claim == claim, SignatureRecord.tsa_status == TSA_CLAIMED
+                )
+                .values(tsa_status=TSA_PENDING, tsa_claim=None, tsa_claimed_at=None)
+            )
+
+    def _engine(self):
+        bind = self.session.get_bind()
+        return getattr(bind, "engine", bind)
+
+    def verify_record(self, record: SignatureRecord) -> bool:
+        """The record's inclusion path leads to a root its anchor's TSA token covers.
+
+        The anchor token must carry the root as its digest and be signed by
+        the pinned ``CONCORDIA_TSA_PUBLIC_KEY``, so anchors made with the
+        local stub (no TSA configured) never verify.
+        """
+        if record.tsa_status != TSA_ANCHORED:
+            return False
+        proof = record.tsa_token
+        anchor = self.session.get(TimestampAnchor, proof.get("anchor_id"))
+        if anchor is None or anchor.root != proof.get("root"):
+            return False
+        token = anchor.tsa_token or {}
+        if token.get("digest") != anchor.root or not verify_timestamp_token(token):
+            return False
+        try:
+            return verify_inclusion(
+                bytes.fromhex(proof["digest"]),
+                int(proof["leaf_index"]),
+                anchor.tree_size,
+                [bytes.fromhex(node) for node in proof["audit_path"]],
+                bytes.fromhex(anchor.root),
+            )
+        except (KeyError, TypeError, ValueError):
+            return False
+
+
+class TimestampBatcher:
+    """Background thread anchoring pending records every ``interval`` seconds."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = TSA_BATCH_INTERVAL,
+        max_batch: int = TSA_BATCH_MAX,
+        timestamp: Callable[[bytes], Dict[str, Any]] = request_timestamp,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_batch = max_batch
+        self.timestamp = timestamp
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "TimestampBatcher":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="concordia-tsa-batcher", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+
+    def flush(self) -> int:
+        """Anchor everything pending now (in ``max_batch`` trees); returns records anchored."""
+        anchored = 0
+        while True:
+            with self.session_factory() as session:
+                anchor = TimestampBatchService(session, self.timestamp).anchor_pending(self.max_batch)
+                size = anchor.tree_size if anchor else 0
+                session.commit()
+            anchored += size
+            if size < self.max_batch:
+                return anchored
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._flush_logged()
+        self._flush_logged()  # anchor what arrived since the last tick
+
+    def _flush_logged(self) -> None:
+        try:
+            self.flush()
+        except Exception:  # keep the thread alive; records stay pending
+            logger.exception("TSA batch anchoring failed; retrying next interval")
+
+
+_batcher: Optional[TimestampBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def start_timestamp_batcher() -> Optional[TimestampBatcher]:
+    """Start the process-wide batcher when ``CONCORDIA_TSA_BATCH`` is on."""
+    global _batcher
+    if not TSA_BATCH_ENABLED:
+        return None
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = TimestampBatcher(SessionLocal).start()
+        return _batcher
+
+
+def shutdown_timestamp_batcher() -> None:
+    global _batcher
+    with _batcher_lock:
+        batcher, _batcher = _batcher, None
+    if batcher is not None:
+        batcher.stop()
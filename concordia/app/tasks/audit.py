@@ -0,0 +1,28 @@
+"""Celery task for the bulk signature re-audit."""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+from concordia.app.infra.db import get_session
+from concordia.app.infra.storage import write_blob
+from concordia.app.services.signature_audit import SignatureAuditService
+from concordia.app.tasks.metrics import celery_app
+
+# Celery's prefork children cannot start their own process pool, so the
+# task verifies in-process unless a worker runs with --pool=solo/threads.
+AUDIT_TASK_WORKERS = int(os.getenv("CONCORDIA_AUDIT_TASK_WORKERS", "1"))
+
+
+@celery_app.task(name="audit.signatures")
+def audit_signatures(actor_id: str | None = None) -> Dict[str, Any]:
+    """Re-verify stored signatures; the full report is written to storage."""
+    with get_session() as session:
+        report = SignatureAuditService(session).run(workers=AUDIT_TASK_WORKERS, actor_id=actor_id)
+    blob_name = f"audit/signatures-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    write_blob(blob_name, json.dumps(report, ensure_ascii=False, indent=2).encode("utf-8"))
+    summary = {key: value for key, value in report.items() if key != "failures"}
+    summary["report"] = blob_name
+    return summary
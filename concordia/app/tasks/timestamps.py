@@ -0,0 +1,12 @@
+"""Celery task for batched TSA anchoring (alternative to the in-process batcher)."""
+from __future__ import annotations
+
+from concordia.app.infra.db import SessionLocal
+from concordia.app.services.timestamps import TimestampBatcher
+from concordia.app.tasks.metrics import celery_app
+
+
+@celery_app.task(name="tsa.anchor_pending")
+def anchor_pending_signatures() -> int:
+    """Anchor all pending signature records; returns how many were anchored."""
+    return TimestampBatcher(SessionLocal).flush()
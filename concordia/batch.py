@@ -0,0 +1,132 @@
+"""Verify many capsule files in parallel (``concordia verify-many``).
+
+Workers open, parse and verify whole files themselves and send back only a
+small result dict, so the parent never holds capsule data. JSON capsules
+are checked while streaming (``SessionCapsule.iter_load``), binary ones
+through their memory map, so a worker's memory is bounded by one event
+rather than one file. Submissions are windowed to keep the number of
+in-flight files proportional to the worker count.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .capsule import SessionCapsule, _event_problems, _sha256_hex
+from .capsule_binary import MAGIC, BinaryCapsule
+
+CAPSULE_PATTERNS = ("*.json", "*.ccap")
+MAX_PROBLEMS = 10  # per file; the count is always reported in full
+PENDING_PER_WORKER = 4
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def find_capsules(directory: PathLike, patterns: Sequence[str] = CAPSULE_PATTERNS) -> List[Path]:
+    """Capsule files under ``directory`` (recursive), in a stable order."""
+    root = Path(directory)
+    return sorted({path for pattern in patterns for path in root.rglob(pattern) if path.is_file()})
+
+
+def verify_file(path: PathLike) -> Dict[str, Any]:
+    """Verify one capsule file; never raises (errors are reported in the result)."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"path": str(path), "session_id": None, "events": 0}
+    try:
+        with open(path, "rb") as fh:
+            binary = fh.read(len(MAGIC)) == MAGIC
+            if not binary:
+                fh.seek(0)
+                session_id, events, problems = _verify_json(fh)
+        if binary:
+            with BinaryCapsule(path) as capsule:
+                report = capsule.verify()
+                session_id, events, problems = capsule.session_id, len(capsule), report["problems"]
+    except Exception as exc:  # any damaged file (or reader bug) is one failed result
+        result.update(ok=False, error=f"{type(exc).__name__}: {exc}", problems=[], problem_count=0)
+    else:
+        result.update(
+            ok=not problems,
+            session_id=session_id,
+            events=events,
+            problems=problems[:MAX_PROBLEMS],
+            problem_count=len(problems),
+        )
+    result["seconds"] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def _verify_json(fh) -> tuple:
+    """``SessionCapsule.verify`` semantics over a streamed JSON capsule."""
+    reader = SessionCapsule.iter_load(fh, verify=False)
+    problems: List[str] = []
+    prev: Optional[str] = None
+    for idx, event in enumerate(reader):
+        problems.extend(_event_problems(idx, event, prev))
+        prev = event.curr_hash
+    if reader.sealed and reader.root != (prev or _sha256_hex(b"")):
+        problems.append("root mismatch")
+    return reader.session_id, reader.count, problems
+
+
+def verify_many(
+    paths: Iterable[PathLike],
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield one result dict per file, in completion order.
+
+    ``workers=1`` verifies in-process; otherwise a process pool of
+    ``workers`` (default: CPU count) is used.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            yield verify_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(verify_file, str(path)))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def summarize(results: Iterable[Dict[str, Any]], started: float, workers: int) -> Dict[str, Any]:
+    """Consume ``results`` into a report: totals plus failed files only.
+
+    ``started`` is the ``time.perf_counter()`` value the run began at.
+    """
+    total = failed = events = 0
+    failures = []
+    for result in results:
+        total += 1
+        events += result["events"]
+        if not result["ok"]:
+            failed += 1
+            failures.append(result)
+    failures.sort(key=lambda result: result["path"])
+    seconds = time.perf_counter() - started
+    return {
+        "ok": failed == 0,
+        "capsules": total,
+        "failed": failed,
+        "events": events,
+        "workers": workers,
+        "seconds": round(seconds, 4),
+        "capsules_per_second": round(total / seconds, 2) if seconds else None,
+        "failures": failures,
+    }
+
+
+def write_report(report: Dict[str, Any], path: PathLike) -> None:
+    Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -0,0 +1,128 @@
+"""Canonical JSON shared by ledger hashing, signatures and capsules.
+
+Canonical form is ``json.dumps(obj, sort_keys=True, separators=(",", ":"))``
+encoded as UTF-8. The ledger and signature messages use the default
+``ensure_ascii=True``; capsules use ``ensure_ascii=False``. Stored hashes
+depend on these exact bytes, so every fast path here must stay byte-for-byte
+identical to that reference (see ``tests/test_canonical.py``).
+
+Speedups over calling ``json.dumps`` each time:
+
+- one prebuilt C encoder per ``ensure_ascii`` mode instead of constructing a
+  ``JSONEncoder`` and its C scanner on every call. Precomputing key order
+  for the fixed envelopes was measured too and lost to this: sorting six or
+  seven keys inside the C encoder is cheaper than any Python-level assembly;
+- an optional compiled backend (``orjson``), opt-in via
+  ``CONCORDIA_CANONICAL_BACKEND=orjson``. Its output is used only when it
+  equals the reference: objects holding a float (orjson writes ``1e16`` for
+  ``1e+16`` and rejects NaN/Infinity differently) or a non-``str`` key
+  (orjson would sort ``10`` before ``2``) and non-ASCII output in
+  ``ensure_ascii`` mode all go through the stdlib encoder.
+"""
+from __future__ import annotations
+
+import json
+import os
+from json.encoder import c_make_encoder, encode_basestring, encode_basestring_ascii
+from typing import Any, Callable, Optional
+
+try:  # optional compiled backend
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+CANONICAL_BACKEND = os.getenv("CONCORDIA_CANONICAL_BACKEND", "json").lower()
+CANONICAL_BACKENDS = ("json", "orjson")
+
+_SEPARATORS = (",", ":")
+_STRING_ESCAPERS = {True: encode_basestring_ascii, False: encode_basestring}
+
+
+def reference_bytes(obj: Any, *, ensure_ascii: bool = True) -> bytes:
+    """The plain ``json.dumps`` definition every fast path must match."""
+    return json.dumps(
+        obj, ensure_ascii=ensure_ascii, sort_keys=True, separators=_SEPARATORS
+    ).encode("utf-8")
+
+
+def _unserializable(obj: Any) -> Any:
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def _stdlib_encoder(ensure_ascii: bool) -> Callable[[Any], str]:
+    if c_make_encoder is None:  # pragma: no cover - interpreter without _json
+        return json.JSONEncoder(
+            ensure_ascii=ensure_ascii, sort_keys=True, separators=_SEPARATORS
+        ).encode
+    # Same arguments JSONEncoder.iterencode passes for a one-shot encode.
+    # markers=None skips the circular-reference bookkeeping (a shared dict
+    # would not be thread-safe); a cyclic payload raises RecursionError.
+    scanner = c_make_encoder(
+        None,
+        _unserializable,
+        _STRING_ESCAPERS[ensure_ascii],
+        None,
+        _SEPARATORS[1],
+        _SEPARATORS[0],
+        True,
+        False,
+        True,
+    )
+
+    def encode(obj: Any) -> str:
+        if isinstance(obj, str):
+            return _STRING_ESCAPERS[ensure_ascii](obj)
+        return "".join(scanner(obj, 0))
+
+    return encode
+
+
+def _has_float(obj: Any) -> bool:
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def _orjson_encoder(ensure_ascii: bool) -> Callable[[Any], str]:
+    fallback = _stdlib_encoder(ensure_ascii)
+    # no OPT_NON_STR_KEYS: non-str keys raise TypeError and take the fallback
+    options = orjson.OPT_SORT_KEYS
+
+    def encode(obj: Any) -> str:
+        if _has_float(obj):
+            return fallback(obj)
+        try:
+            raw = orjson.dumps(obj, option=options)
+        except TypeError:
+            return fallback(obj)
+        if ensure_ascii and not raw.isascii():
+            # orjson never escapes non-ASCII; the stdlib does in this mode
+            return fallback(obj)
+        return raw.decode("utf-8")
+
+    return encode
+
+
+def _select_encoder(ensure_ascii: bool, backend: Optional[str] = None) -> Callable[[Any], str]:
+    backend = (backend or CANONICAL_BACKEND).lower()
+    if backend not in CANONICAL_BACKENDS:
+        raise ValueError(f"Unknown canonical JSON backend: {backend}")
+    if backend == "orjson" and orjson is not None:
+        return _orjson_encoder(ensure_ascii)
+    return _stdlib_encoder(ensure_ascii)
+
+
+_ENCODE = {mode: _select_encoder(mode) for mode in (True, False)}
+
+
+def canonical_bytes(obj: Any, *, ensure_ascii: bool = True) -> bytes:
+    """Canonical JSON bytes of ``obj`` (sorted keys, compact separators, UTF-8)."""
+    return _ENCODE[ensure_ascii](obj).encode("utf-8")
+
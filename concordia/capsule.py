@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import codecs
 import hashlib
 import json
+import sys
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .canonical import canonical_bytes
 
 
 def _canonical_json(obj: Any) -> bytes:
@@ -13,14 +19,14 @@ def _canonical_json(obj: Any) -> bytes:
     signature fields and precomputed hashes should be excluded by caller
     from the dict they pass here.
     """
-    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return canonical_bytes(obj, ensure_ascii=False)
 
 
 def _sha256_hex(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionEvent:
     """An atomic, ordered fact in a session.
 
@@ -55,12 +61,205 @@ class SessionEvent:
         return self.curr_hash
 
 
+def _event_dict(e: SessionEvent) -> Dict[str, Any]:
+    return {
+        "domain": e.domain,
+        "kind": e.kind,
+        "actor": e.actor,
+        "payload": e.payload,
+        "at": e.at,
+        "prev_hash": e.prev_hash,
+        "curr_hash": e.curr_hash,
+        "signature": e.signature,
+    }
+
+
+def _event_from_dict(raw: Dict[str, Any]) -> SessionEvent:
+    ev = SessionEvent(
+        domain=raw["domain"],
+        kind=raw["kind"],
+        actor=raw["actor"],
+        payload=raw.get("payload", {}),
+        at=raw.get("at"),
+    )
+    ev.prev_hash = raw.get("prev_hash")
+    ev.curr_hash = raw.get("curr_hash")
+    ev.signature = raw.get("signature")
+    return ev
+
+
+def _event_problems(idx: int, ev: SessionEvent, prev: Optional[str]) -> List[str]:
+    problems: List[str] = []
+    if ev.prev_hash != prev:
+        problems.append(f"event[{idx}].prev_hash mismatch")
+    if ev.curr_hash != _sha256_hex(_canonical_json(ev.to_hash_material())):
+        problems.append(f"event[{idx}].curr_hash mismatch")
+    return problems
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_DIGEST_SIZE = 32
+
+
+def _format_at(micros: int) -> str:
+    return (_EPOCH + micros * _MICROSECOND).isoformat().replace("+00:00", "Z")
+
+
+def _parse_at(at: Any) -> Optional[int]:
+    """Microseconds since the epoch if ``at`` is a ``...Z`` timestamp that
+    formats back to exactly the same string, else None."""
+    if not isinstance(at, str) or not at.endswith("Z"):
+        return None
+    try:
+        micros = (datetime.fromisoformat(at) - _EPOCH) // _MICROSECOND
+    except (ValueError, TypeError):
+        return None
+    return micros if _format_at(micros) == at else None
+
+
+def _parse_digest(value: Any) -> Optional[bytes]:
+    """Raw digest if ``value`` is a lowercase 64-char hex string, else None."""
+    if not isinstance(value, str) or len(value) != 2 * _DIGEST_SIZE:
+        return None
+    try:
+        digest = bytes.fromhex(value)
+    except ValueError:
+        return None
+    return digest if digest.hex() == value else None
+
+
+class CompactEvents(Sequence):
+    """Column-wise event store for ``SessionCapsule(compact=True)``.
+
+    Instead of one object per event it keeps interned domain/kind/actor
+    symbols as ``array('I')`` ids, timestamps as microseconds in an
+    ``array('q')`` and ``curr_hash`` values as raw 32-byte digests in one
+    ``bytearray``. ``prev_hash`` is not stored: it is the previous event's
+    ``curr_hash``. Values that do not fit these encodings (odd timestamps,
+    non-hex or mismatching hashes, signatures) go to small side tables, so
+    every event reads back exactly as it was appended.
+
+    Indexing and iteration return fresh ``SessionEvent`` copies; mutating
+    one does not change the store.
+    """
+
+    __slots__ = (
+        "_symbols",
+        "_symbol_ids",
+        "_names",
+        "_payloads",
+        "_at",
+        "_at_raw",
+        "_digests",
+        "_curr_raw",
+        "_prev_raw",
+        "_signatures",
+    )
+
+    def __init__(self, events: Iterable[SessionEvent] = ()) -> None:
+        self._symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self._names = array("I")  # (domain, kind, actor) symbol ids per event
+        self._payloads: List[Dict[str, Any]] = []
+        self._at = array("q")
+        self._at_raw: Dict[int, Any] = {}
+        self._digests = bytearray()
+        self._curr_raw: Dict[int, Optional[str]] = {}
+        self._prev_raw: Dict[int, Optional[str]] = {}
+        self._signatures: Dict[int, str] = {}
+        for event in events:
+            self.append(event)
+
+    def append(self, event: SessionEvent) -> None:
+        index = len(self._payloads)
+        self._names.extend(
+            (self._symbol(event.domain), self._symbol(event.kind), self._symbol(event.actor))
+        )
+        self._payloads.append(event.payload)
+        micros = _parse_at(event.at)
+        if micros is None:
+            self._at.append(0)
+            self._at_raw[index] = event.at
+        else:
+            self._at.append(micros)
+        digest = _parse_digest(event.curr_hash)
+        if digest is None:
+            self._digests += bytes(_DIGEST_SIZE)
+            self._curr_raw[index] = event.curr_hash
+        else:
+            self._digests += digest
+        if event.prev_hash != (self.curr_hash(index - 1) if index else None):
+            self._prev_raw[index] = event.prev_hash
+        if event.signature is not None:
+            self._signatures[index] = event.signature
+
+    def curr_hash(self, index: int) -> Optional[str]:
+        if index in self._curr_raw:
+            return self._curr_raw[index]
+        return self._digests[index * _DIGEST_SIZE : (index + 1) * _DIGEST_SIZE].hex()
+
+    def prev_hash(self, index: int) -> Optional[str]:
+        if index in self._prev_raw:
+            return self._prev_raw[index]
+        return self.curr_hash(index - 1) if index else None
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SessionEvent, List[SessionEvent]]:
+        if isinstance(index, slice):
+            return [self._event(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        return self._event(index)
+
+    def __iter__(self) -> Iterator[SessionEvent]:
+        for index in range(len(self)):
+            yield self._event(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"CompactEvents({len(self)} events)"
+
+    def _symbol(self, value: str) -> int:
+        symbol_id = self._symbol_ids.get(value)
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            self._symbols.append(sys.intern(value) if type(value) is str else value)
+            self._symbol_ids[value] = symbol_id
+        return symbol_id
+
+    def _event(self, index: int) -> SessionEvent:
+        names = self._names
+        symbols = self._symbols
+        return SessionEvent(
+            domain=symbols[names[3 * index]],
+            kind=symbols[names[3 * index + 1]],
+            actor=symbols[names[3 * index + 2]],
+            payload=self._payloads[index],
+            at=self._at_raw[index] if index in self._at_raw else _format_at(self._at[index]),
+            prev_hash=self.prev_hash(index),
+            curr_hash=self.curr_hash(index),
+            signature=self._signatures.get(index),
+        )
+
+
 @dataclass
 class SessionCapsule:
     """Tamper-evident chain of session events with minimal metadata.
 
     This is domain-agnostic. For medical usage, map medical fields into
     event payloads and session metadata via adapters.
+
+    ``compact=True`` stores events column-wise (see ``CompactEvents``) for
+    very large capsules; the API and serialized form are the same.
     """
 
     session_id: str
@@ -69,12 +268,23 @@ class SessionCapsule:
     events: List[SessionEvent] = field(default_factory=list)
     sealed: bool = False
     root: Optional[str] = None  # hash of the last event at seal time
+    compact: bool = False  # keep events in a CompactEvents store (large capsules)
+    # verified prefix for verify_incremental(): event count and its last hash
+    _verified: int = field(default=0, init=False, repr=False, compare=False)
+    _verified_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.compact and not isinstance(self.events, CompactEvents):
+            self.events = CompactEvents(self.events)
+
+    def _last_hash(self) -> Optional[str]:
+        return self._event_hash(len(self.events) - 1) if self.events else None
 
     def append(self, event: SessionEvent) -> None:
         if self.sealed:
             raise RuntimeError("capsule already sealed")
 
-        prev = self.events[-1].curr_hash if self.events else None
+        prev = self._last_hash()
         event.prev_hash = prev
         event.compute_hash()
         self.events.append(event)
@@ -86,81 +296,345 @@ class SessionCapsule:
         """
         if self.sealed:
             return
-        self.root = self.events[-1].curr_hash if self.events else _sha256_hex(b"")
+        self.root = self._last_hash() if self.events else _sha256_hex(b"")
         if attestation:
             # store in context under reserved key
             self.context.setdefault("attestations", []).append(attestation)
         self.sealed = True
 
-    def verify(self) -> Dict[str, Any]:
-        """Recompute all hashes and verify linkage and root integrity.
+    def verify(self, since: Optional[int] = None) -> Dict[str, Any]:
+        """Recompute hashes and verify linkage and root integrity.
+
+        Without ``since`` every event is checked and the result also resets
+        the verified prefix used by ``verify_incremental`` (a full pass is
+        the only way to catch later edits to already-verified events). With
+        ``since=k`` only events ``k..`` are re-hashed and ``events[k-1]``
+        is trusted as the chain anchor.
 
         Returns a dict with `ok: bool` and minimal diagnostics.
         """
+        full = since is None
+        start = 0 if full else since
+        if not 0 <= start <= len(self.events):
+            raise ValueError(f"since={since} outside 0..{len(self.events)}")
+        problems = self._check_events(start)
+        if full:
+            self._mark_verified(len(self.events) if not problems else 0)
+        return {"ok": len(problems) == 0, "problems": problems}
+
+    def verify_incremental(self) -> Dict[str, Any]:
+        """Verify only events appended since the last successful verification.
+
+        The verified prefix is trusted as long as its last hash is unchanged;
+        on success the prefix grows to cover every event.
+        """
+        start = self._verified
+        if start > len(self.events) or (
+            start and self._event_hash(start - 1) != self._verified_hash
+        ):
+            self._mark_verified(0)
+            return {"ok": False, "problems": ["verified prefix changed; run a full verify()"]}
+        problems = self._check_events(start)
+        if not problems:
+            self._mark_verified(len(self.events))
+        return {"ok": len(problems) == 0, "problems": problems}
+
+    def _check_events(self, start: int) -> List[str]:
         problems: List[str] = []
-        prev: Optional[str] = None
-        last: Optional[str] = None
-
-        for idx, ev in enumerate(self.events):
-            if ev.prev_hash != prev:
-                problems.append(f"event[{idx}].prev_hash mismatch")
-            h = _sha256_hex(_canonical_json(ev.to_hash_material()))
-            if ev.curr_hash != h:
-                problems.append(f"event[{idx}].curr_hash mismatch")
+        events = self.events
+        prev: Optional[str] = self._event_hash(start - 1) if start else None
+
+        for idx in range(start, len(events)):
+            ev = events[idx]
+            problems.extend(_event_problems(idx, ev, prev))
             prev = ev.curr_hash
-            last = ev.curr_hash
 
         if self.sealed:
+            last = self._last_hash()
             if self.root != (last or _sha256_hex(b"")):
                 problems.append("root mismatch")
 
-        return {"ok": len(problems) == 0, "problems": problems}
+        return problems
+
+    def _event_hash(self, index: int) -> Optional[str]:
+        if isinstance(self.events, CompactEvents):
+            return self.events.curr_hash(index)
+        return self.events[index].curr_hash
+
+    def _mark_verified(self, count: int) -> None:
+        self._verified = count
+        self._verified_hash = self._event_hash(count - 1) if count else None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
-            "session_id": self.session_id,
-            "subject_id": self.subject_id,
-            "context": self.context,
-            "sealed": self.sealed,
-            "root": self.root,
-            "events": [
-                {
-                    "domain": e.domain,
-                    "kind": e.kind,
-                    "actor": e.actor,
-                    "payload": e.payload,
-                    "at": e.at,
-                    "prev_hash": e.prev_hash,
-                    "curr_hash": e.curr_hash,
-                    "signature": e.signature,
-                }
-                for e in self.events
-            ],
+            **self._header(),
+            "events": [_event_dict(e) for e in self.events],
         }
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
 
+    def dump(self, fp: IO[str]) -> None:
+        """Write the ``to_dict`` document to a text file one event at a time.
+
+        The header comes first and each event is on its own line, so
+        ``iter_load`` can stream it back; ``json.load`` reads it as usual.
+        """
+        header = json.dumps(self._header(), ensure_ascii=False)
+        fp.write(header[:-1] + ', "events": [')
+        separator = "\n"
+        for e in self.events:
+            fp.write(separator)
+            fp.write(json.dumps(_event_dict(e), ensure_ascii=False))
+            separator = ",\n"
+        fp.write("\n]}\n")
+
+    @classmethod
+    def iter_load(cls, fp: IO, verify: bool = True) -> "CapsuleReader":
+        """Stream events from a capsule JSON file in constant memory.
+
+        Each event is checked against the previous one as it is read (and
+        the root at the end when sealed); the first problem raises
+        ``CapsuleIntegrityError``. Header fields are available on the
+        returned reader once iteration has started.
+        """
+        return CapsuleReader(fp, verify=verify)
+
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "SessionCapsule":
+    def load(cls, fp: IO, compact: bool = False, verify: bool = True) -> "SessionCapsule":
+        """Build a capsule from a file via ``iter_load`` (verified while reading)."""
+        reader = cls.iter_load(fp, verify=verify)
+        events = CompactEvents() if compact else []
+        for ev in reader:
+            events.append(ev)
+        cap = cls(
+            session_id=reader.session_id,
+            subject_id=reader.subject_id,
+            context=reader.context,
+            events=events,
+            sealed=reader.sealed,
+            root=reader.root,
+            compact=compact,
+        )
+        if verify:
+            cap._mark_verified(len(events))
+        return cap
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], compact: bool = False) -> "SessionCapsule":
         cap = cls(
             session_id=data["session_id"],
             subject_id=data.get("subject_id"),
             context=data.get("context", {}),
+            compact=compact,
         )
         for raw in data.get("events", []):
-            ev = SessionEvent(
-                domain=raw["domain"],
-                kind=raw["kind"],
-                actor=raw["actor"],
-                payload=raw.get("payload", {}),
-                at=raw.get("at"),
-            )
-            ev.prev_hash = raw.get("prev_hash")
-            ev.curr_hash = raw.get("curr_hash")
-            ev.signature = raw.get("signature")
-            cap.events.append(ev)
+            cap.events.append(_event_from_dict(raw))
         cap.sealed = data.get("sealed", False)
         cap.root = data.get("root")
         return cap
 
+    def _header(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "subject_id": self.subject_id,
+            "context": self.context,
+            "sealed": self.sealed,
+            "root": self.root,
+        }
+
+
+@dataclass
+class CapsuleDiff:
+    """Result of ``diff``: shared prefix length and the diverging tails."""
+
+    common: int  # number of leading events both capsules share
+    a_tail: List[SessionEvent]
+    b_tail: List[SessionEvent]
+    comparisons: int  # curr_hash comparisons made by the bisection
+
+    @property
+    def identical(self) -> bool:
+        return not self.a_tail and not self.b_tail
+
+    @property
+    def divergence(self) -> Optional[int]:
+        """Index of the first differing event (None when identical)."""
+        return None if self.identical else self.common
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "identical": self.identical,
+            "common": self.common,
+            "divergence": self.divergence,
+            "comparisons": self.comparisons,
+            "a_tail": [_event_dict(e) for e in self.a_tail],
+            "b_tail": [_event_dict(e) for e in self.b_tail],
+        }
+
+
+def _chain_view(capsule: Any):
+    """``(length, hash_at, event_at)`` for a SessionCapsule or BinaryCapsule."""
+    if isinstance(capsule, SessionCapsule):
+        return len(capsule.events), capsule._event_hash, capsule.events.__getitem__
+    return len(capsule), capsule.curr_hash, capsule.event
+
+
+def diff(a: Any, b: Any) -> CapsuleDiff:
+    """Locate the first event where two copies of a capsule diverge.
+
+    Each ``curr_hash`` commits to all earlier events, so equal hashes at
+    index k mean equal prefixes through k and the longest common prefix is
+    found by bisection in O(log n) hash comparisons; only the tails after
+    it are materialized. This trusts the stored hashes: ``verify()`` both
+    sides first if either may have been edited in place. Accepts
+    ``SessionCapsule`` and ``capsule_binary.BinaryCapsule``.
+    """
+    a_len, a_hash, a_event = _chain_view(a)
+    b_len, b_hash, b_event = _chain_view(b)
+    low, high = 0, min(a_len, b_len)
+    comparisons = 0
+    while low < high:
+        mid = (low + high + 1) // 2
+        comparisons += 1
+        if a_hash(mid - 1) == b_hash(mid - 1):
+            low = mid
+        else:
+            high = mid - 1
+    return CapsuleDiff(
+        common=low,
+        a_tail=[a_event(i) for i in range(low, a_len)],
+        b_tail=[b_event(i) for i in range(low, b_len)],
+        comparisons=comparisons,
+    )
+
+
+class CapsuleIntegrityError(ValueError):
+    """A streamed capsule failed verification."""
+
+
+class CapsuleReader:
+    """Incremental parser behind ``SessionCapsule.iter_load``.
+
+    Reads the capsule object key by key with ``JSONDecoder.raw_decode`` on a
+    sliding buffer, so only one event is held at a time. Works for any
+    key order, including ``to_json`` output.
+    """
+
+    CHUNK_SIZE = 1 << 16
+    _HEADER_KEYS = ("session_id", "subject_id", "context", "sealed", "root")
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, fp: IO, verify: bool = True) -> None:
+        self._fp = fp
+        self._verify = verify
+        self._decoder = json.JSONDecoder()
+        self._text_decoder: Optional[codecs.IncrementalDecoder] = None
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.session_id: Optional[str] = None
+        self.subject_id: Optional[str] = None
+        self.context: Dict[str, Any] = {}
+        self.sealed = False
+        self.root: Optional[str] = None
+        self.count = 0
+        self.last_hash: Optional[str] = None
+
+    def __iter__(self) -> Iterator[SessionEvent]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "events":
+                    yield from self._events()
+                elif key in self._HEADER_KEYS:
+                    setattr(self, key, self._value())
+                else:
+                    self._value()
+                separator = self._next_char()
+                if separator == "}":
+                    break
+                if separator != ",":
+                    raise ValueError(f"malformed capsule JSON: unexpected {separator!r}")
+        if self.session_id is None:
+            raise ValueError("malformed capsule JSON: missing session_id")
+        if self._verify and self.sealed and self.root != (self.last_hash or _sha256_hex(b"")):
+            raise CapsuleIntegrityError("root mismatch")
+
+    def _events(self) -> Iterator[SessionEvent]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            ev = _event_from_dict(self._value())
+            if self._verify:
+                problems = _event_problems(self.count, ev, self.last_hash)
+                if problems:
+                    raise CapsuleIntegrityError(problems[0])
+            self.count += 1
+            self.last_hash = ev.curr_hash
+            yield ev
+            separator = self._next_char()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"malformed capsule JSON: unexpected {separator!r}")
+
+    def _fill(self) -> None:
+        chunk = self._fp.read(self.CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+        if isinstance(chunk, bytes):
+            if self._text_decoder is None:
+                self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = self._text_decoder.decode(chunk, final=self._eof)
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in self._WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf) or self._eof:
+                return
+            self._fill()
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buf):
+            raise ValueError("malformed capsule JSON: unexpected end of file")
+        return self._buf[self._pos]
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _expect(self, char: str) -> None:
+        found = self._next_char()
+        if found != char:
+            raise ValueError(f"malformed capsule JSON: expected {char!r}, found {found!r}")
+
+    def _value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()
+                continue
+            # a number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buf) and not self._eof:
+                self._fill()
+                continue
+            self._pos = end
+            return value
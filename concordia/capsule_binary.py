@@ -0,0 +1,250 @@
+"""Versioned binary container for ``SessionCapsule`` with random access.
+
+Layout (big-endian)::
+
+    header   magic "CCAP" | u16 version | u16 flags | u64 event count
+             | u32 length | capsule metadata as canonical JSON
+             (session_id, subject_id, context, root)
+    records  per event: u32 length | event as canonical JSON without
+             curr_hash (and without prev_hash when it is the previous
+             event's curr_hash)
+    digests  event count x 32-byte raw curr_hash
+    index    event count x u64 record offset
+    footer   u64 digests offset | u64 index offset | u64 event count | "CCAP"
+
+A reader maps the file and finds the tables through the fixed-size footer,
+so ``digest(i)`` is one slice and ``event(i)`` decodes a single record.
+Event order, hashes and verification rules are those of the JSON form;
+``dict_to_binary``/``binary_to_dict`` convert between the two.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .capsule import (
+    SessionCapsule,
+    SessionEvent,
+    _canonical_json,
+    _event_dict,
+    _event_from_dict,
+    _event_problems,
+    _sha256_hex,
+)
+
+MAGIC = b"CCAP"
+FORMAT_VERSION = 1
+FLAG_SEALED = 0x1
+DIGEST_SIZE = 32
+
+HEADER = struct.Struct(">4sHHQI")
+RECORD_LENGTH = struct.Struct(">I")
+OFFSET = struct.Struct(">Q")
+FOOTER = struct.Struct(">QQQ4s")
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class BinaryCapsuleError(ValueError):
+    """The file is not a readable binary capsule."""
+
+
+def write_binary(capsule: SessionCapsule, path: PathLike) -> None:
+    """Write ``capsule`` in the binary format (events streamed, not buffered)."""
+    metadata = _canonical_json(
+        {
+            "session_id": capsule.session_id,
+            "subject_id": capsule.subject_id,
+            "context": capsule.context,
+            "root": capsule.root,
+        }
+    )
+    count = len(capsule.events)
+    flags = FLAG_SEALED if capsule.sealed else 0
+    digests = bytearray()
+    offsets: List[int] = []
+    with open(path, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, count, len(metadata)))
+        fh.write(metadata)
+        prev: Optional[str] = None
+        for idx, event in enumerate(capsule.events):
+            digests += _digest_bytes(idx, event.curr_hash)
+            record = _event_dict(event)
+            del record["curr_hash"]
+            if record["prev_hash"] == prev:
+                del record["prev_hash"]
+            body = _canonical_json(record)
+            offsets.append(fh.tell())
+            fh.write(RECORD_LENGTH.pack(len(body)))
+            fh.write(body)
+            prev = event.curr_hash
+        digests_offset = fh.tell()
+        fh.write(digests)
+        index_offset = fh.tell()
+        fh.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        fh.write(FOOTER.pack(digests_offset, index_offset, count, MAGIC))
+
+
+def _digest_bytes(idx: int, curr_hash: Optional[str]) -> bytes:
+    try:
+        digest = bytes.fromhex(curr_hash or "")
+    except ValueError:
+        digest = b""
+    if len(digest) != DIGEST_SIZE:
+        raise BinaryCapsuleError(f"event[{idx}].curr_hash is not a SHA-256 hex digest")
+    return digest
+
+
+class BinaryCapsule:
+    """Memory-mapped, read-only view of a binary capsule file."""
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            try:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # empty file
+                raise BinaryCapsuleError(f"{self.path} is empty") from exc
+        try:
+            self._read_layout()
+        except Exception:
+            self._map.close()
+            raise
+
+    def _read_layout(self) -> None:
+        data = self._map
+        if len(data) < HEADER.size + FOOTER.size:
+            raise BinaryCapsuleError(f"{self.path} is too short for a binary capsule")
+        magic, version, flags, count, meta_length = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise BinaryCapsuleError(f"{self.path} is not a binary capsule")
+        if version != FORMAT_VERSION:
+            raise BinaryCapsuleError(f"unsupported binary capsule version {version}")
+        digests_offset, index_offset, footer_count, footer_magic = FOOTER.unpack_from(
+            data, len(data) - FOOTER.size
+        )
+        records_offset = HEADER.size + meta_length
+        if (
+            footer_magic != MAGIC
+            or footer_count != count
+            or digests_offset + count * DIGEST_SIZE != index_offset
+            or index_offset + count * OFFSET.size != len(data) - FOOTER.size
+            or records_offset + count * RECORD_LENGTH.size > digests_offset
+        ):
+            raise BinaryCapsuleError(f"{self.path} has a damaged footer (truncated write?)")
+        try:
+            metadata = json.loads(data[HEADER.size : records_offset])
+            self.session_id: str = metadata["session_id"]
+            self.subject_id: Optional[str] = metadata.get("subject_id")
+            self.context: Dict[str, Any] = metadata.get("context", {})
+            self.root: Optional[str] = metadata.get("root")
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise BinaryCapsuleError(f"{self.path} has damaged metadata: {exc}") from exc
+        self.sealed = bool(flags & FLAG_SEALED)
+        self._count = count
+        self._records_offset = records_offset
+        self._digests_offset = digests_offset
+        self._index_offset = index_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def digest(self, index: int) -> bytes:
+        """Raw ``curr_hash`` of event ``index`` (one slice of the digest table)."""
+        index = self._check_index(index)
+        start = self._digests_offset + index * DIGEST_SIZE
+        return self._map[start : start + DIGEST_SIZE]
+
+    def curr_hash(self, index: int) -> str:
+        return self.digest(index).hex()
+
+    def event(self, index: int) -> SessionEvent:
+        """Decode event ``index`` alone."""
+        index = self._check_index(index)
+        (offset,) = OFFSET.unpack_from(self._map, self._index_offset + index * OFFSET.size)
+        start = offset + RECORD_LENGTH.size
+        if not self._records_offset <= offset <= self._digests_offset - RECORD_LENGTH.size:
+            raise BinaryCapsuleError(f"{self.path}: event[{index}] has a damaged index offset")
+        (length,) = RECORD_LENGTH.unpack_from(self._map, offset)
+        if start + length > self._digests_offset:
+            raise BinaryCapsuleError(f"{self.path}: event[{index}] overruns the record area")
+        try:
+            record = json.loads(self._map[start : start + length])
+            if "prev_hash" not in record:
+                record["prev_hash"] = self.curr_hash(index - 1) if index else None
+            record["curr_hash"] = self.curr_hash(index)
+            return _event_from_dict(record)
+        except (ValueError, KeyError, TypeError) as exc:
+            raise BinaryCapsuleError(f"{self.path}: event[{index}] is damaged: {exc}") from exc
+
+    def __getitem__(self, index: int) -> SessionEvent:
+        return self.event(index)
+
+    def __iter__(self) -> Iterator[SessionEvent]:
+        for index in range(self._count):
+            yield self.event(index)
+
+    def verify(self) -> Dict[str, Any]:
+        """Same checks as ``SessionCapsule.verify``, one record at a time."""
+        problems: List[str] = []
+        prev: Optional[str] = None
+        for idx, event in enumerate(self):
+            problems.extend(_event_problems(idx, event, prev))
+            prev = event.curr_hash
+        if self.sealed and self.root != (prev or _sha256_hex(b"")):
+            problems.append("root mismatch")
+        return {"ok": len(problems) == 0, "problems": problems}
+
+    def to_capsule(self, compact: bool = False) -> SessionCapsule:
+        capsule = SessionCapsule(
+            session_id=self.session_id,
+            subject_id=self.subject_id,
+            context=self.context,
+            compact=compact,
+        )
+        for event in self:
+            capsule.events.append(event)
+        capsule.sealed = self.sealed
+        capsule.root = self.root
+        return capsule
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "subject_id": self.subject_id,
+            "context": self.context,
+            "sealed": self.sealed,
+            "root": self.root,
+            "events": [_event_dict(event) for event in self],
+        }
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "BinaryCapsule":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("event index out of range")
+        return index
+
+
+def dict_to_binary(data: Dict[str, Any], path: PathLike) -> None:
+    """Convert a JSON capsule document (``to_dict`` form) to a binary file."""
+    write_binary(SessionCapsule.from_dict(data, compact=True), path)
+
+
+def binary_to_dict(path: PathLike) -> Dict[str, Any]:
+    """Convert a binary capsule back to the ``to_dict`` form."""
+    with BinaryCapsule(path) as capsule:
+        return capsule.to_dict()
@@ -0,0 +1,127 @@
+"""Command-line tools for capsule files (``concordia`` / ``python -m concordia``).
+
+Capsule files may be JSON (``to_json``/``dump``) or binary
+(``capsule_binary``); the format is detected from the first bytes.
+
+Usage:
+    concordia diff ours.json theirs.ccap [--show 5] [--json]
+    concordia verify-many capsules/ [--workers 8] [--report report.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .batch import CAPSULE_PATTERNS, find_capsules, summarize, verify_many, write_report
+from .capsule import SessionCapsule, _event_dict, diff
+from .capsule_binary import MAGIC, BinaryCapsule
+
+
+def open_capsule(path: Path) -> Union[SessionCapsule, BinaryCapsule]:
+    """Map a binary capsule, or load a JSON one compactly without verifying."""
+    with open(path, "rb") as fh:
+        magic = fh.read(len(MAGIC))
+    if magic == MAGIC:
+        return BinaryCapsule(path)
+    with open(path, "rb") as fh:
+        return SessionCapsule.load(fh, compact=True, verify=False)
+
+
+def _close(capsule: Union[SessionCapsule, BinaryCapsule]) -> None:
+    if isinstance(capsule, BinaryCapsule):
+        capsule.close()
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    a, b = open_capsule(args.a), open_capsule(args.b)
+    try:
+        result = diff(a, b)
+    finally:
+        _close(a)
+        _close(b)
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+        return 0 if result.identical else 1
+
+    print(f"a: {args.a} ({result.common + len(result.a_tail)} events)")
+    print(f"b: {args.b} ({result.common + len(result.b_tail)} events)")
+    if result.identical:
+        print(f"identical ({result.comparisons} hash comparisons)")
+        return 0
+    print(
+        f"common prefix: {result.common} events; diverges at event[{result.divergence}] "
+        f"({result.comparisons} hash comparisons)"
+    )
+    for name, tail in (("a", result.a_tail), ("b", result.b_tail)):
+        print(f"{name} tail: {len(tail)} events")
+        for offset, event in enumerate(tail[: args.show]):
+            record = json.dumps(_event_dict(event), ensure_ascii=False)
+            print(f"  {name}[{result.common + offset}] {record}")
+        if len(tail) > args.show:
+            print(f"  ... {len(tail) - args.show} more")
+    return 1
+
+
+def cmd_verify_many(args: argparse.Namespace) -> int:
+    paths = find_capsules(args.directory, args.pattern or CAPSULE_PATTERNS)
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    def results():
+        for result in verify_many(paths, workers=workers):
+            if not result["ok"]:
+                reason = result.get("error") or (
+                    f"{result['problem_count']} problems, first: {result['problems'][0]}"
+                )
+                print(f"FAILED {result['path']}: {reason}")
+            yield result
+
+    report = summarize(results(), started, workers)
+    print(
+        f"{report['capsules']} capsules ({report['events']} events) verified with {workers} workers "
+        f"in {report['seconds']:.2f}s ({report['capsules_per_second'] or 0:.1f}/s); "
+        f"{report['failed']} failed"
+    )
+    if args.report:
+        write_report(report, args.report)
+    return 0 if report["ok"] else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="concordia", description="Concordia capsule tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    diff_parser = commands.add_parser("diff", help="find where two capsule copies diverge")
+    diff_parser.add_argument("a", type=Path)
+    diff_parser.add_argument("b", type=Path)
+    diff_parser.add_argument("--show", type=int, default=5, help="tail events to print per side")
+    diff_parser.add_argument("--json", action="store_true", help="print the full diff as JSON")
+    diff_parser.set_defaults(func=cmd_diff)
+
+    verify_parser = commands.add_parser("verify-many", help="verify every capsule file in a directory")
+    verify_parser.add_argument("directory", type=Path)
+    verify_parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    verify_parser.add_argument(
+        "--pattern", action="append", help="glob to match (repeatable; default *.json and *.ccap)"
+    )
+    verify_parser.add_argument("--report", type=Path, help="write a JSON summary report here")
+    verify_parser.set_defaults(func=cmd_verify_many)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as exc:
+        print(f"concordia: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
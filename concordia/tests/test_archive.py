@@ -0,0 +1,151 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from concordia.app.deps import db_session
+from concordia.app.domain.merkle import verify_inclusion_proof
+from concordia.app.domain.models import (
+    ActType,
+    ActorType,
+    SessionArchive,
+    SessionRecord,
+    UnderstandingEvent,
+    UnderstandingEventCreate,
+)
+from concordia.app.infra import archive, storage
+from concordia.app.infra.archive import clear_archive_cache, load_archive
+from concordia.app.main import app
+from concordia.app.services.archive import ArchiveError, ArchiveService
+from concordia.app.services.ledger import LedgerService, SessionArchivedError
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_ROOT", tmp_path / "storage")
+    clear_archive_cache()
+    engine = create_engine(f"sqlite:///{tmp_path / 'archive.db'}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    clear_archive_cache()
+
+
+def _session(engine, session_id: str, status: str, events: int) -> list:
+    with Session(engine) as session:
+        session.add(
+            SessionRecord(
+                id=session_id, doctor_id="doc-1", title="t", artifact_hash="0" * 64, status=status
+            )
+        )
+        created = LedgerService(session).append_many(
+            [
+                UnderstandingEventCreate(
+                    session_id=session_id,
+                    actor_id="doc-1",
+                    actor_type=ActorType.DOCTOR,
+                    act_type=ActType.PRESENT,
+                    payload={"i": i, "note": "説明"},
+                )
+                for i in range(events)
+            ]
+        )
+        session.commit()
+        return [(event.id, event.curr_hash) for event in created]
+
+
+def test_archived_session_is_served_from_cold_storage(engine):
+    hashes = _session(engine, "sess-done", "sealed", 5)
+    _session(engine, "sess-live", "active", 2)
+    with Session(engine) as session:
+        service = ArchiveService(session)
+        assert service.candidates() == ["sess-done"]
+        stub = service.archive_session("sess-done")
+        session.commit()
+        assert stub.events_count == 5 and stub.last_curr_hash == hashes[-1][1]
+
+    with Session(engine) as session:
+        remaining = session.exec(
+            select(UnderstandingEvent.session_id, func.count()).group_by(UnderstandingEvent.session_id)
+        ).all()
+        assert remaining == [("sess-live", 2)]
+        assert session.get(SessionRecord, "sess-done").status == "archived"
+        ledger = LedgerService(session)
+        assert [event.seq for event in ledger.timeline("sess-done", after_seq=2, limit=2)] == [3, 4]
+        assert ledger.chain_hashes("sess-done") == hashes
+        assert ArchiveService(session).verify("sess-done") == []
+        with pytest.raises(SessionArchivedError):
+            ledger.append(
+                UnderstandingEventCreate(
+                    session_id="sess-done",
+                    actor_id="doc-1",
+                    actor_type=ActorType.DOCTOR,
+                    act_type=ActType.PRESENT,
+                )
+            )
+
+    def override():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[db_session] = override
+    try:
+        client = TestClient(app)
+        timeline = client.get("/events/", params={"session_id": "sess-done"}).json()
+        assert [event["curr_hash"] for event in timeline] == [h for _, h in hashes]
+        proof = client.get(f"/sessions/sess-done/proof/{hashes[2][0]}").json()
+        assert proof["tree_size"] == 5 and verify_inclusion_proof(proof)
+        appended = client.post(
+            "/events/",
+            json={"session_id": "sess-done", "actor_id": "doc-1", "actor_type": "doctor", "act_type": "present"},
+        )
+        assert appended.status_code == 409
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_active_sessions_are_not_archived(engine):
+    _session(engine, "sess-live", "active", 1)
+    with Session(engine) as session:
+        with pytest.raises(ArchiveError):
+            ArchiveService(session).archive_session("sess-live")
+
+
+def test_tampered_archive_is_reported(engine):
+    _session(engine, "sess-done", "closed", 3)
+    with Session(engine) as session:
+        stub = ArchiveService(session).archive_session("sess-done")
+        session.commit()
+        blob = storage.STORAGE_ROOT / stub.blob_name
+    blob.write_bytes(gzip.compress(gzip.decompress(blob.read_bytes()).replace(b'"i":1', b'"i":9')))
+
+    with Session(engine) as session:
+        problems = ArchiveService(session).verify("sess-done")
+        assert problems and "SHA-256" in problems[0]
+        assert session.get(SessionArchive, "sess-done") is not None
+
+
+def test_archive_cache_is_bounded_by_event_count(engine, monkeypatch):
+    stubs = {}
+    for session_id, events in (("sess-a", 3), ("sess-b", 3), ("sess-big", 6)):
+        _session(engine, session_id, "sealed", events)
+        with Session(engine) as session:
+            stub = ArchiveService(session).archive_session(session_id)
+            session.commit()
+            stubs[session_id] = (stub.blob_name, stub.sha256)
+    monkeypatch.setattr(archive, "_cache", archive._ArchiveCache(max_events=5))
+    reads = []
+    real_read = archive.read_blob
+    monkeypatch.setattr(archive, "read_blob", lambda name: reads.append(name) or real_read(name))
+
+    load_archive(*stubs["sess-a"])
+    load_archive(*stubs["sess-a"])
+    assert len(reads) == 1
+    load_archive(*stubs["sess-b"])  # 6 events > 5: evicts sess-a
+    load_archive(*stubs["sess-a"])
+    assert len(reads) == 3
+    load_archive(*stubs["sess-big"])  # larger than the whole budget: never cached
+    load_archive(*stubs["sess-big"])
+    load_archive(*stubs["sess-b"], cache=False)  # bulk scans always read the blob
+    assert len(reads) == 6
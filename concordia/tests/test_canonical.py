@@ -0,0 +1,77 @@
+import pytest
+
+from concordia import canonical
+from concordia.app.domain.merkle import canonical_bytes
+from concordia.app.domain.models import ActorType, ActType
+from concordia.capsule import SessionCapsule, SessionEvent, _canonical_json
+
+PAYLOADS = [
+    {},
+    {"step": "present", "preset": "details"},
+    {"note": "説明を理解しました", "emoji": "✅", "escape": "tab\t\"quote\" \\   \x00"},
+    {"nested": {"b": [1, 2.5, None, True, False], "a": {"z": -0.0, "y": 10**30}}},
+    {"floats": [0.1, 1e16, 1e-07, 123456789.123, float("inf"), float("-inf")]},
+    {"unicode_key_é": 1, "ascii": "x", "A": [], "a": {}},
+    {"long": "x" * 5000, "list": list(range(200))},
+]
+
+
+def _envelope(payload, **overrides):
+    envelope = {
+        "session_id": "sess-001",
+        "actor_id": "doc-1",
+        "actor_type": ActorType.DOCTOR,
+        "act_type": ActType.PRESENT,
+        "payload": payload,
+        "artifact_hash": None,
+        "created_at": "2026-10-17T04:33:47.047693",
+    }
+    envelope.update(overrides)
+    return envelope
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_canonical_bytes_match_json_dumps(payload, ensure_ascii):
+    for obj in (payload, _envelope(payload), [payload, "é", 1]):
+        assert canonical.canonical_bytes(obj, ensure_ascii=ensure_ascii) == canonical.reference_bytes(
+            obj, ensure_ascii=ensure_ascii
+        )
+
+
+def test_ledger_canonical_bytes_match_json_dumps():
+    for payload in PAYLOADS:
+        envelope = _envelope(payload, artifact_hash="ab" * 32, actor_id="患者-1")
+        assert canonical_bytes(envelope) == canonical.reference_bytes(envelope)
+
+
+def test_unserializable_values_raise_type_error():
+    with pytest.raises(TypeError):
+        canonical.canonical_bytes({"when": object()})
+
+
+def test_capsule_hash_material_is_unchanged():
+    capsule = SessionCapsule(session_id="s-1")
+    for payload in PAYLOADS:
+        capsule.append(SessionEvent(domain="ui", kind="view", actor="患者", payload=payload))
+    for event in capsule.events:
+        material = event.to_hash_material()
+        assert _canonical_json(material) == canonical.reference_bytes(material, ensure_ascii=False)
+    assert capsule.verify()["ok"]
+
+
+def test_orjson_backend_matches_for_every_payload():
+    pytest.importorskip("orjson")
+    payloads = PAYLOADS + [
+        {"int_keys": {10: "a", 2: "b"}},
+        {"deep": [{"x": [1e16]}], "ok": "y"},
+        _envelope({"i": 1}),
+    ]
+    for ensure_ascii in (True, False):
+        encode = canonical._select_encoder(ensure_ascii, backend="orjson")
+        for payload in payloads:
+            assert encode(payload).encode("utf-8") == canonical.reference_bytes(
+                payload, ensure_ascii=ensure_ascii
+            )
+        with pytest.raises(TypeError):  # the stdlib cannot sort mixed keys either
+            encode({1: "a", "b": 2})
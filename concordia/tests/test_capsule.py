@@ -0,0 +1,257 @@
+import io
+import json
+import struct
+from pathlib import Path
+
+import pytest
+
+from concordia import cli, verify_many
+from concordia.batch import find_capsules, verify_file
+from concordia.capsule import (
+    CapsuleIntegrityError,
+    CompactEvents,
+    SessionCapsule,
+    SessionEvent,
+    diff,
+)
+from concordia.capsule_binary import (
+    FOOTER,
+    HEADER,
+    OFFSET,
+    RECORD_LENGTH,
+    BinaryCapsule,
+    BinaryCapsuleError,
+    binary_to_dict,
+    dict_to_binary,
+    write_binary,
+)
+
+
+def _capsule(compact: bool) -> SessionCapsule:
+    capsule = SessionCapsule(session_id="s-1", subject_id="p-1", compact=compact)
+    stamps = ["2026-10-17T04:33:47.047693Z", "2026-10-17T04:33:48Z", "2026-10-17T13:33:49+09:00", None]
+    for i, at in enumerate(stamps):
+        event = SessionEvent(domain="ui", kind="view", actor="患者", payload={"i": i}, at=at)
+        if i == 1:
+            event.signature = "c2ln"
+        capsule.append(event)
+    capsule.seal()
+    return capsule
+
+
+def test_compact_capsule_matches_default_representation():
+    default, compact = _capsule(False), _capsule(True)
+
+    assert isinstance(compact.events, CompactEvents)
+    assert compact.to_dict() == default.to_dict()
+    assert compact.events == default.events
+    assert compact.events[-1].curr_hash == compact.root
+    assert compact.verify() == {"ok": True, "problems": []}
+
+
+def test_compact_capsule_detects_tampering_from_dict():
+    data = _capsule(False).to_dict()
+    data["events"][1]["payload"] = {"i": 99}
+    data["events"][2]["prev_hash"] = "00" * 32
+    data["events"][3]["curr_hash"] = "not-a-hash"
+
+    loaded = SessionCapsule.from_dict(data, compact=True)
+
+    assert loaded.to_dict() == data
+    problems = loaded.verify()["problems"]
+    assert problems == SessionCapsule.from_dict(data).verify()["problems"]
+    assert {
+        "event[1].curr_hash mismatch",
+        "event[2].prev_hash mismatch",
+        "event[3].curr_hash mismatch",
+    } <= set(problems)
+
+
+def test_incremental_verify_checks_only_new_events():
+    capsule = SessionCapsule(session_id="s-1")
+    for i in range(3):
+        capsule.append(SessionEvent(domain="ui", kind="view", actor="a", payload={"i": i}))
+    assert capsule.verify_incremental()["ok"]
+
+    capsule.events[0].payload["i"] = 99  # edit inside the verified prefix
+    for i in range(3, 5):
+        capsule.append(SessionEvent(domain="ui", kind="view", actor="a", payload={"i": i}))
+    assert capsule.verify_incremental()["ok"]
+    assert capsule.verify(since=3)["ok"]
+
+    assert capsule.verify()["problems"] == ["event[0].curr_hash mismatch"]
+    # the full pass revoked the trusted prefix
+    assert capsule.verify_incremental()["problems"] == ["event[0].curr_hash mismatch"]
+
+
+def test_incremental_verify_rejects_a_rewritten_anchor():
+    capsule = SessionCapsule(session_id="s-1", compact=True)
+    capsule.append(SessionEvent(domain="ui", kind="view", actor="a"))
+    assert capsule.verify_incremental()["ok"]
+
+    capsule.events._digests[0] ^= 0xFF
+
+    assert capsule.verify_incremental()["problems"] == ["verified prefix changed; run a full verify()"]
+    assert not capsule.verify()["ok"]
+
+
+def test_dump_and_iter_load_stream_events(tmp_path):
+    capsule = _capsule(False)
+    path = tmp_path / "capsule.json"
+    with open(path, "w", encoding="utf-8") as fp:
+        capsule.dump(fp)
+    assert json.loads(path.read_text(encoding="utf-8")) == capsule.to_dict()
+
+    with open(path, "rb") as fp:
+        reader = SessionCapsule.iter_load(fp)
+        reader.CHUNK_SIZE = 7  # force values to straddle reads
+        events = list(reader)
+    assert events == list(capsule.events)
+    assert (reader.session_id, reader.root, reader.count) == ("s-1", capsule.root, 4)
+
+    loaded = SessionCapsule.load(io.StringIO(capsule.to_json()), compact=True)
+    assert loaded.to_dict() == capsule.to_dict()
+
+
+def test_iter_load_stops_at_the_first_bad_event():
+    data = _capsule(False).to_dict()
+    data["events"][2]["payload"] = {"i": 99}
+    reader = SessionCapsule.iter_load(io.StringIO(json.dumps(data)))
+
+    seen = []
+    with pytest.raises(CapsuleIntegrityError, match=r"event\[2\].curr_hash mismatch"):
+        for event in reader:
+            seen.append(event)
+    assert len(seen) == 2
+
+
+def test_binary_capsule_round_trips_and_reads_single_events(tmp_path):
+    capsule = _capsule(False)
+    data = capsule.to_dict()
+    data["events"][2]["prev_hash"] = "00" * 32  # non-implied prev_hash is kept verbatim
+    path = tmp_path / "capsule.ccap"
+    dict_to_binary(data, path)
+
+    with BinaryCapsule(path) as binary:
+        assert len(binary) == 4
+        assert binary.digest(3) == bytes.fromhex(data["events"][3]["curr_hash"])
+        assert binary.event(1).signature == "c2ln"
+        assert binary.event(-2).prev_hash == "00" * 32
+        assert binary.to_dict() == data
+        assert binary.verify() == SessionCapsule.from_dict(data).verify()
+    assert binary_to_dict(path) == data
+
+
+def test_binary_capsule_rejects_truncated_files(tmp_path):
+    path = tmp_path / "capsule.ccap"
+    write_binary(_capsule(True), path)
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with pytest.raises(BinaryCapsuleError):
+        BinaryCapsule(path)
+
+
+def test_binary_capsule_rejects_damaged_lengths_and_offsets(tmp_path):
+    path = tmp_path / "capsule.ccap"
+    write_binary(_capsule(True), path)
+    clean = path.read_bytes()
+    _, index_offset, _, _ = FOOTER.unpack_from(clean, len(clean) - FOOTER.size)
+    (first_record,) = OFFSET.unpack_from(clean, index_offset)
+
+    def damaged(patch) -> Path:
+        data = bytearray(clean)
+        patch(data)
+        path.write_bytes(data)
+        return path
+
+    with pytest.raises(BinaryCapsuleError):  # metadata length past the records
+        BinaryCapsule(damaged(lambda data: struct.pack_into(">I", data, HEADER.size - 4, 10**9)))
+    for patch in (
+        lambda data: OFFSET.pack_into(data, index_offset + 8, 10**9),
+        lambda data: RECORD_LENGTH.pack_into(data, first_record, 10**9),
+        lambda data: data.__setitem__(first_record + RECORD_LENGTH.size, ord("[")),
+    ):
+        with BinaryCapsule(damaged(patch)) as binary:
+            with pytest.raises(BinaryCapsuleError):
+                binary.verify()
+
+
+def test_verify_file_reports_a_corrupt_index_offset(tmp_path):
+    path = tmp_path / "capsule.ccap"
+    write_binary(_capsule(True), path)
+    data = bytearray(path.read_bytes())
+    _, index_offset, _, _ = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+    OFFSET.pack_into(data, index_offset + 8, 10**9)
+    path.write_bytes(data)
+
+    result = verify_file(path)
+    assert result["ok"] is False
+    assert result["error"].startswith("BinaryCapsuleError")
+
+
+def _forked(common: int, a_extra: int, b_extra: int):
+    a = SessionCapsule(session_id="s-1")
+    b = SessionCapsule(session_id="s-1")
+    for i in range(common):
+        event = SessionEvent(domain="ui", kind="view", actor="a", payload={"i": i}, at=f"t{i}")
+        a.append(event)
+        b.append(SessionEvent(domain="ui", kind="view", actor="a", payload={"i": i}, at=f"t{i}"))
+    for capsule, extra, tag in ((a, a_extra, "a"), (b, b_extra, "b")):
+        for i in range(extra):
+            capsule.append(SessionEvent(domain="ui", kind=tag, actor="a", payload={"i": i}))
+    return a, b
+
+
+def test_diff_finds_the_divergence_by_bisection(tmp_path):
+    a, b = _forked(1000, 3, 1)
+    result = diff(a, b)
+    assert (result.common, result.divergence) == (1000, 1000)
+    assert [e.kind for e in result.a_tail] == ["a"] * 3 and len(result.b_tail) == 1
+    assert result.comparisons <= 11
+
+    prefix, longer = _forked(10, 0, 2)
+    assert diff(prefix, longer).divergence == 10 and not diff(prefix, longer).a_tail
+    assert diff(a, a).identical and diff(a, a).divergence is None
+
+    write_binary(b, tmp_path / "b.ccap")
+    with BinaryCapsule(tmp_path / "b.ccap") as binary:
+        assert diff(a, binary).to_dict() == result.to_dict()
+
+
+def test_cli_diff_reports_divergence(tmp_path, capsys):
+    a, b = _forked(5, 1, 0)
+    with open(tmp_path / "a.json", "w", encoding="utf-8") as fp:
+        a.dump(fp)
+    write_binary(b, tmp_path / "b.ccap")
+
+    assert cli.main(["diff", str(tmp_path / "a.json"), str(tmp_path / "b.ccap")]) == 1
+    out = capsys.readouterr().out
+    assert "common prefix: 5 events; diverges at event[5]" in out
+    assert "a tail: 1 events" in out and "b tail: 0 events" in out
+    assert cli.main(["diff", str(tmp_path / "a.json"), str(tmp_path / "a.json")]) == 0
+
+
+def test_verify_many_reports_only_failures(tmp_path, capsys):
+    good, _ = _forked(20, 0, 0)
+    good.seal()
+    for i in range(3):
+        with open(tmp_path / f"good-{i}.json", "w", encoding="utf-8") as fp:
+            good.dump(fp)
+    write_binary(good, tmp_path / "good.ccap")
+    tampered = good.to_dict()
+    tampered["events"][7]["payload"] = {"i": -1}
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "bad.json").write_text(json.dumps(tampered))
+    (tmp_path / "broken.json").write_text('{"session_id": "s-1", "events": [')
+
+    results = {Path(r["path"]).name: r for r in verify_many(find_capsules(tmp_path), workers=2)}
+    assert len(results) == 6
+    assert results["good.ccap"]["ok"] and results["good-0.json"]["events"] == 20
+    assert results["bad.json"]["problems"] == ["event[7].curr_hash mismatch"]
+    assert "error" in results["broken.json"]
+
+    report_path = tmp_path / "report.json"
+    assert cli.main(["verify-many", str(tmp_path), "--workers", "1", "--report", str(report_path)]) == 1
+    report = json.loads(report_path.read_text())
+    assert (report["capsules"], report["failed"]) == (6, 2)
+    assert [Path(f["path"]).name for f in report["failures"]] == ["broken.json", "bad.json"]
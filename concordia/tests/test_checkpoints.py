@@ -0,0 +1,95 @@
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from concordia.app.domain.models import (
+    ActType,
+    ActorType,
+    LedgerCheckpoint,
+    SessionRecord,
+    UnderstandingEventCreate,
+)
+from concordia.app.infra import storage
+from concordia.app.infra.archive import clear_archive_cache
+from concordia.app.services.archive import ArchiveService
+from concordia.app.services.ledger import LedgerService
+from concordia.tests.test_ledger import load_script
+
+
+def _append(engine, session_id: str, count: int) -> None:
+    with Session(engine) as session:
+        ledger = LedgerService(session)
+        for i in range(count):
+            ledger.append(
+                UnderstandingEventCreate(
+                    session_id=session_id,
+                    actor_id="pat-1",
+                    actor_type=ActorType.PATIENT,
+                    act_type=ActType.RE_VIEW,
+                    payload={"i": i},
+                )
+            )
+        session.commit()
+
+
+def test_since_checkpoint_resumes_and_advances(tmp_path, capsys):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cp.db'}")
+    SQLModel.metadata.create_all(engine)
+    verify_chain = load_script("verify_chain")
+    argv = [
+        "--database-url", str(engine.url),
+        "--since-checkpoint",
+        "--signing-key", str(tmp_path / "server.key"),
+    ]
+
+    _append(engine, "sess-a", 5)
+    assert verify_chain.main(argv) == 0
+    _append(engine, "sess-a", 3)
+    capsys.readouterr()
+    assert verify_chain.main(argv) == 0
+    assert "Verified 3 new events" in capsys.readouterr().out
+
+    with Session(engine) as session:
+        latest = session.exec(
+            select(LedgerCheckpoint).order_by(LedgerCheckpoint.seq.desc())
+        ).first()
+        assert (latest.seq, latest.count) == (8, 8)
+        latest.count = 80  # forged checkpoint no longer matches its signature
+        session.add(latest)
+        session.commit()
+    assert verify_chain.main(argv) == 1
+
+
+def test_since_checkpoint_checks_archived_sessions_against_their_blob(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(storage, "STORAGE_ROOT", tmp_path / "storage")
+    clear_archive_cache()
+    engine = create_engine(f"sqlite:///{tmp_path / 'cp.db'}")
+    SQLModel.metadata.create_all(engine)
+    verify_chain = load_script("verify_chain")
+    argv = [
+        "--database-url", str(engine.url),
+        "--since-checkpoint",
+        "--session-id", "sess-a",
+        "--signing-key", str(tmp_path / "server.key"),
+    ]
+
+    with Session(engine) as session:
+        session.add(SessionRecord(id="sess-a", doctor_id="doc-1", title="t", artifact_hash="0" * 64))
+        session.commit()
+    _append(engine, "sess-a", 4)
+    assert verify_chain.main(argv) == 0
+    with Session(engine) as session:
+        record = session.get(SessionRecord, "sess-a")
+        record.status = "sealed"
+        session.add(record)
+        stub = ArchiveService(session).archive_session("sess-a")
+        session.commit()
+        blob = storage.STORAGE_ROOT / stub.blob_name
+
+    capsys.readouterr()
+    assert verify_chain.main(argv) == 0
+    assert verify_chain.main(argv) == 0  # no new checkpoint, nothing to re-anchor
+
+    blob.write_bytes(blob.read_bytes()[:-1])
+    clear_archive_cache()
+    assert verify_chain.main(argv) == 1
+    assert "archived session sess-a" in capsys.readouterr().err
+    clear_archive_cache()
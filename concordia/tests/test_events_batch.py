@@ -0,0 +1,85 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from concordia.app.deps import db_session
+from concordia.app.domain.models import UnderstandingEvent
+from concordia.app.infra.segments import SegmentLockError
+from concordia.app.main import app
+from concordia.app.services.ledger import LedgerService
+
+
+def _client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    def override():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[db_session] = override
+    return TestClient(app), engine
+
+
+def test_batch_append_chains_events_in_order(tmp_path):
+    client, engine = _client(tmp_path)
+    try:
+        body = {
+            "events": [
+                {
+                    "session_id": "sess-batch",
+                    "actor_id": "pat-1",
+                    "actor_type": "patient",
+                    "act_type": act,
+                    "payload": {"i": i},
+                }
+                for i, act in enumerate(["signal_ack", "re_view", "clarify_request"])
+            ]
+        }
+        resp = client.post("/events/batch", json=body)
+        assert resp.status_code == 201
+        created = resp.json()
+        assert [event["payload"]["i"] for event in created] == [0, 1, 2]
+        assert created[0]["prev_hash"] is None
+        assert created[1]["prev_hash"] == created[0]["curr_hash"]
+        assert created[2]["prev_hash"] == created[1]["curr_hash"]
+
+        with Session(engine) as session:
+            stored = session.exec(
+                select(UnderstandingEvent.curr_hash).order_by(UnderstandingEvent.seq)
+            ).all()
+        assert list(stored) == [event["curr_hash"] for event in created]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_batch_rejects_unsigned_agree(tmp_path):
+    client, engine = _client(tmp_path)
+    try:
+        body = {
+            "events": [
+                {"session_id": "s", "actor_id": "pat-1", "actor_type": "patient", "act_type": "re_view"},
+                {"session_id": "s", "actor_id": "pat-1", "actor_type": "patient", "act_type": "agree"},
+            ]
+        }
+        assert client.post("/events/batch", json=body).status_code == 400
+        with Session(engine) as session:
+            assert session.exec(select(UnderstandingEvent)).all() == []
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_batch_on_a_busy_session_asks_to_retry(tmp_path, monkeypatch):
+    client, _ = _client(tmp_path)
+
+    def busy(self, events_in):
+        raise SegmentLockError("session s is busy; retry the transaction")
+
+    monkeypatch.setattr(LedgerService, "append_many", busy)
+    try:
+        event = {"session_id": "s", "actor_id": "pat-1", "actor_type": "patient", "act_type": "re_view"}
+        resp = client.post("/events/batch", json={"events": [event]})
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "1"
+    finally:
+        app.dependency_overrides.clear()
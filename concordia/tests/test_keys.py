@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+import os
+import stat
+
+from sqlalchemy import event, update
+from sqlmodel import Session, SQLModel, create_engine
+
+from concordia.app.domain.models import ActorKey
+from concordia.app.domain.sign import (
+    generate_keypair,
+    load_public_key,
+    sign_message,
+    verify_signature,
+)
+from concordia.app.services import keys
+from concordia.app.services.keys import KeyRegistry
+
+
+def setup_engine():
+    KeyRegistry.clear_cache()
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def count_selects(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    return statements
+
+
+def test_public_key_is_parsed_once_and_invalidated_by_register(monkeypatch):
+    engine = setup_engine()
+    private, public = generate_keypair()
+    with Session(engine) as session:
+        KeyRegistry(session).register("doc-1", public.hex())
+        session.commit()
+
+    parsed = []
+    monkeypatch.setattr(keys, "load_public_key", lambda raw: parsed.append(raw) or load_public_key(raw))
+    selects = count_selects(engine)
+    with Session(engine) as session:
+        registry = KeyRegistry(session)
+        first = registry.public_key("doc-1")
+        for _ in range(5):
+            assert registry.public_key("doc-1") is first
+    assert len(parsed) == 1
+    assert len(selects) == 6  # row once, then one updated_at lookup per call
+
+    monkeypatch.setattr(keys, "KEY_CACHE_TTL", 30)
+    selects.clear()
+    with Session(engine) as session:
+        for _ in range(5):
+            assert KeyRegistry(session).public_key("doc-1") is first
+    assert selects == []  # confirmed just now: trusted for the TTL
+    verify_signature(first, b"msg", sign_message(private, b"msg"))
+
+    _, rotated = generate_keypair()
+    with Session(engine) as session:
+        KeyRegistry(session).register("doc-1", rotated.hex())
+        session.commit()
+        assert KeyRegistry(session).public_key("doc-1").public_bytes_raw() == rotated
+    assert KeyRegistry(Session(engine)).public_key("missing") is None
+
+
+def test_public_key_revalidates_change_from_another_worker(monkeypatch):
+    engine = setup_engine()
+    _, public = generate_keypair()
+    _, rotated = generate_keypair()
+    with Session(engine) as session:
+        KeyRegistry(session).register("pat-1", public.hex())
+        session.commit()
+        assert KeyRegistry(session).public_key("pat-1").public_bytes_raw() == public
+
+    # another process rotates the key: this process's cache is not told
+    with engine.begin() as conn:
+        conn.execute(
+            update(ActorKey)
+            .where(ActorKey.actor_id == "pat-1")
+            .values(public_key_hex=rotated.hex(), updated_at=datetime.utcnow() + timedelta(seconds=1))
+        )
+    with Session(engine) as session:
+        monkeypatch.setattr(keys, "KEY_CACHE_TTL", 30)
+        assert KeyRegistry(session).public_key("pat-1").public_bytes_raw() == public
+        monkeypatch.setattr(keys, "KEY_CACHE_TTL", 0)
+        assert KeyRegistry(session).public_key("pat-1").public_bytes_raw() == rotated
+
+
+def test_register_invalidates_only_once_committed(tmp_path, monkeypatch):
+    KeyRegistry.clear_cache()
+    engine = create_engine(f"sqlite:///{tmp_path / 'keys.db'}")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(keys, "KEY_CACHE_TTL", 30)
+    _, public = generate_keypair()
+    _, rotated = generate_keypair()
+    with Session(engine) as session:
+        KeyRegistry(session).register("pat-1", public.hex())
+        session.commit()
+
+    with Session(engine) as writer:
+        KeyRegistry(writer).register("pat-1", rotated.hex())
+        # a reader on another connection still sees (and caches) the old key
+        with Session(engine) as reader:
+            assert KeyRegistry(reader).public_key("pat-1").public_bytes_raw() == public
+        writer.commit()
+    with Session(engine) as reader:
+        assert KeyRegistry(reader).public_key("pat-1").public_bytes_raw() == rotated
+
+    with Session(engine) as writer:
+        KeyRegistry(writer).register("pat-1", public.hex())
+        writer.rollback()
+    with Session(engine) as reader:
+        assert KeyRegistry(reader).public_key("pat-1").public_bytes_raw() == rotated
+
+
+def test_public_key_cache_is_bounded(monkeypatch):
+    engine = setup_engine()
+    monkeypatch.setattr(keys, "KEY_CACHE_SIZE", 2)
+    with Session(engine) as session:
+        registry = KeyRegistry(session)
+        for actor_id in ("a", "b", "c"):
+            registry.register(actor_id, generate_keypair()[1].hex())
+        session.commit()
+        for actor_id in ("a", "b", "c"):
+            registry.public_key(actor_id)
+    assert keys.KEY_CACHE.get(engine, "a") is None
+    assert keys.KEY_CACHE.get(engine, "c") is not None
+
+
+
+def test_server_key_file_is_created_private(tmp_path):
+    path = tmp_path / "keys" / "server.key"
+    previous = os.umask(0)
+    try:
+        key = keys.load_server_key(path)
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert keys.load_server_key(path) == key
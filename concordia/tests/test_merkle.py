@@ -0,0 +1,48 @@
+import hashlib
+
+from concordia.app.domain.merkle import (
+    inclusion_proof,
+    leaf_hash,
+    merkle_root,
+    node_hash,
+    verify_inclusion,
+)
+
+
+def _reference_root(leaves):
+    """RFC 6962 MTH, written recursively straight from the definition."""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    if len(leaves) == 1:
+        return leaf_hash(leaves[0])
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return node_hash(_reference_root(leaves[:k]), _reference_root(leaves[k:]))
+
+
+def _leaves(n):
+    return [hashlib.sha256(str(i).encode()).digest() for i in range(n)]
+
+
+def test_root_matches_rfc6962_definition():
+    for n in range(0, 20):
+        assert merkle_root(_leaves(n)) == _reference_root(_leaves(n))
+
+
+def test_every_leaf_has_a_valid_logarithmic_proof():
+    for n in range(1, 20):
+        leaves = _leaves(n)
+        for index in range(n):
+            root, path = inclusion_proof(leaves, index)
+            assert len(path) <= max(1, (n - 1).bit_length())
+            assert verify_inclusion(leaves[index], index, n, path, root)
+
+
+def test_proof_rejects_wrong_leaf_index_or_root():
+    leaves = _leaves(11)
+    root, path = inclusion_proof(leaves, 6)
+    assert not verify_inclusion(leaves[5], 6, 11, path, root)
+    assert not verify_inclusion(leaves[6], 7, 11, path, root)
+    assert not verify_inclusion(leaves[6], 6, 6, path, root)
+    assert not verify_inclusion(leaves[6], 6, 11, path, merkle_root(leaves[:10]))
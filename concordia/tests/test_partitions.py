@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import Session, SQLModel, create_engine
+
+from concordia.app.domain.models import ActType, ActorType, SessionRecord, UnderstandingEventCreate
+from concordia.app.infra import partitions
+from concordia.app.services.ledger import LedgerService
+
+
+def _event(session_id: str) -> UnderstandingEventCreate:
+    return UnderstandingEventCreate(
+        session_id=session_id,
+        actor_id="doc-1",
+        actor_type=ActorType.DOCTOR,
+        act_type=ActType.PRESENT,
+        payload={},
+    )
+
+
+def test_month_helpers():
+    assert partitions.add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partitions.month_start(datetime(2026, 10, 17, 4, 33)) == date(2026, 10, 1)
+    assert partitions.partition_name(date(2026, 3, 1)) == "understanding_events_p2026_03"
+
+
+def test_partitioned_table_ddl_includes_partition_key():
+    table = partitions.partitioned_events_table()
+    dialect = postgresql.dialect()
+    ddl = str(CreateTable(table).compile(dialect=dialect))
+
+    assert "PARTITION BY RANGE (created_at)" in ddl
+    assert "PRIMARY KEY (id, created_at)" in ddl
+    seq_index = next(index for index in table.indexes if index.name == "ix_understanding_events_session_seq")
+    assert [column.name for column in seq_index.columns] == ["session_id", "seq", "created_at"]
+    assert "UNIQUE" in str(CreateIndex(seq_index).compile(dialect=dialect))
+
+
+def test_partition_helpers_are_noops_outside_postgresql(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "PARTITIONED_EVENTS", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    assert partitions.create_partitioned_events_table(engine) is False
+    SQLModel.metadata.create_all(engine)
+    assert partitions.ensure_event_partitions(engine) == []
+
+
+def test_partition_floor_keeps_session_reads_complete(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "PARTITIONED_EVENTS", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            SessionRecord(id="sess-a", doctor_id="doc-1", title="t", artifact_hash="0" * 64)
+        )
+        ledger = LedgerService(session)
+        first = ledger.append(_event("sess-a"))
+        second = ledger.append(_event("sess-a"))
+        session.commit()
+
+        assert session.get(SessionRecord, "sess-a").first_event_at == first.created_at
+        assert ledger._partition_floor("sess-a") < first.created_at
+        assert [event.seq for event in ledger.timeline("sess-a")] == [1, 2]
+        assert second.prev_hash == first.curr_hash
+
+
+def test_session_row_created_after_its_events_sets_no_floor(tmp_path, monkeypatch):
+    monkeypatch.setattr(partitions, "PARTITIONED_EVENTS", True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        ledger = LedgerService(session)
+        first = ledger.append_many([_event("sess-b")])[0]
+        session.commit()
+        session.add(
+            SessionRecord(
+                id="sess-b",
+                doctor_id="doc-1",
+                title="t",
+                artifact_hash="0" * 64,
+                created_at=datetime.utcnow() + timedelta(days=40),
+            )
+        )
+        session.commit()
+
+        assert ledger._partition_floor("sess-b") is None
+        second = ledger.append(_event("sess-b"))
+        session.commit()
+        assert (second.seq, second.prev_hash) == (2, first.curr_hash)
+        assert [event.seq for event in ledger.timeline("sess-b")] == [1, 2]
@@ -0,0 +1,174 @@
+import threading
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from concordia.app.domain.models import (
+    ActType,
+    ActorType,
+    SegmentOutboxRecord,
+    UnderstandingEventCreate,
+)
+from concordia.app.infra import segments
+from concordia.app.infra.segments import (
+    INDEX_ENTRY,
+    SegmentCorruptError,
+    SegmentLedgerStore,
+    SegmentLockError,
+)
+from concordia.app.services.ledger import LedgerService
+
+
+def _event(session_id: str, i: int = 0) -> UnderstandingEventCreate:
+    return UnderstandingEventCreate(
+        session_id=session_id,
+        actor_id="pat-1",
+        actor_type=ActorType.PATIENT,
+        act_type=ActType.SIGNAL_ACK,
+        payload={"i": i, "note": "説明"},
+    )
+
+
+def _append(store, session_id: str, count: int) -> list:
+    return store.append_many([_event(session_id, i) for i in range(count)], LedgerService._build_event)
+
+
+def test_events_roll_over_segments_and_read_back_by_seq(tmp_path):
+    store = SegmentLedgerStore(tmp_path, shards=1, max_segment_bytes=2048, fsync_every=10)
+    written = _append(store, "sess-a", 40)
+    _append(store, "sess-b", 5)
+
+    shard_dir = store.shard_for("sess-a").directory
+    assert len(list(shard_dir.glob("*.seg"))) > 1
+    assert store.get("sess-a", 27).curr_hash == written[26].curr_hash
+    assert store.get("sess-a", 41) is None
+    assert [event.seq for event in store.timeline("sess-a", after_seq=35)] == [36, 37, 38, 39, 40]
+    assert store.tip("sess-b")[0] == 5
+    assert store.session_ids() == ["sess-a", "sess-b"]
+    store.close()
+
+
+def test_second_store_sees_appends_and_continues_the_chain(tmp_path):
+    first = SegmentLedgerStore(tmp_path, shards=2)
+    second = SegmentLedgerStore(tmp_path, shards=8)  # shard count pinned by the first
+    _append(first, "sess-a", 3)
+    appended = _append(second, "sess-a", 1)[0]
+
+    assert second.shard_count == 2
+    assert appended.seq == 4
+    assert appended.prev_hash == first.get("sess-a", 3).curr_hash
+    assert first.tip("sess-a") == (4, appended.curr_hash)
+    first.close()
+    second.close()
+
+
+def test_corrupt_record_is_detected(tmp_path):
+    store = SegmentLedgerStore(tmp_path, shards=1)
+    _append(store, "sess-a", 3)
+    store.close()
+
+    segment = next(tmp_path.glob("shard-*/*.seg"))
+    data = bytearray(segment.read_bytes())
+    data[-5] ^= 0xFF
+    segment.write_bytes(bytes(data))
+
+    reopened = SegmentLedgerStore(tmp_path, shards=1)
+    with pytest.raises(SegmentCorruptError):
+        reopened.get("sess-a", 3)
+    reopened.close()
+
+
+def test_torn_index_entry_is_ignored_and_overwritten(tmp_path):
+    store = SegmentLedgerStore(tmp_path, shards=1)
+    _append(store, "sess-a", 2)
+    store.close()
+    index = next(tmp_path.glob("shard-*/*.idx"))
+    with open(index, "ab") as fh:
+        fh.write(b"\x00" * (INDEX_ENTRY.size // 2))  # crash mid-entry
+
+    reopened = SegmentLedgerStore(tmp_path, shards=1)
+    assert reopened.tip("sess-a")[0] == 2
+    assert _append(reopened, "sess-a", 1)[0].seq == 3
+    assert index.stat().st_size == 3 * INDEX_ENTRY.size
+    assert [event.seq for event in reopened.timeline("sess-a")] == [1, 2, 3]
+    reopened.close()
+
+
+def test_segment_records_are_written_only_when_the_sql_transaction_commits(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    SQLModel.metadata.create_all(engine)
+    store = SegmentLedgerStore(tmp_path / "segments", shards=2)
+
+    with Session(engine) as session:
+        ledger = LedgerService(session, store=store)
+        ledger.append(_event("sess-a"))
+        # visible to its own transaction, not yet on disk
+        assert ledger.act_type_counts("sess-a") == {ActType.SIGNAL_ACK: 1}
+        assert store.tip("sess-a") == (0, None)
+        session.rollback()
+    with Session(engine) as session:
+        LedgerService(session, store=store).append(_event("sess-a"))  # closed uncommitted
+    assert store.session_ids() == []
+
+    with Session(engine) as session:
+        ledger = LedgerService(session, store=store)
+        first, second = ledger.append_many([_event("sess-a", 1), _event("sess-b", 2)])
+        third = ledger.append(_event("sess-a", 3))
+        assert [event.seq for event in ledger.timeline("sess-a")] == [1, 2]
+        session.commit()
+    assert store.tip("sess-a") == (2, third.curr_hash)
+    assert third.prev_hash == first.curr_hash
+    assert [event.id for event in store.recent(2)] == [third.id, second.id]
+    store.close()
+
+
+def test_failed_segment_write_is_replayed_from_the_outbox(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    SQLModel.metadata.create_all(engine)
+    store = SegmentLedgerStore(tmp_path / "segments", shards=2)
+    real_append = segments._Shard.append
+    failures = []
+
+    def append_once_failing(shard, events):
+        if not failures:
+            failures.append(events)
+            raise OSError("disk full")
+        real_append(shard, events)
+
+    monkeypatch.setattr(segments._Shard, "append", append_once_failing)
+    with Session(engine) as session:
+        first = LedgerService(session, store=store).append(_event("sess-a", 1))
+        session.commit()  # the SQL commit stands; the write is left journaled
+    assert failures and store.tip("sess-a") == (0, None)
+    with Session(engine) as session:
+        assert session.exec(select(SegmentOutboxRecord.event_id)).all() == [first.id]
+
+    with Session(engine) as session:
+        second = LedgerService(session, store=store).append(_event("sess-a", 2))
+        session.commit()
+    assert second.prev_hash == first.curr_hash
+    assert [event.id for event in store.timeline("sess-a")] == [first.id, second.id]
+    with Session(engine) as session:
+        assert session.exec(select(SegmentOutboxRecord)).all() == []
+    store.close()
+
+
+def test_sessions_of_one_shard_do_not_wait_for_each_other(tmp_path):
+    store = SegmentLedgerStore(tmp_path / "segments", shards=1)
+    held = store.transaction()
+    held.append_many([_event("sess-b")], LedgerService._build_event)
+    other = store.transaction()
+    try:
+        writer = threading.Thread(target=_append, args=(store, "sess-c", 2))
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive() and store.tip("sess-c")[0] == 2
+
+        other.append_many([_event("sess-a")], LedgerService._build_event)
+        # sess-a sorts before the held sess-b, so it is only tried
+        with pytest.raises(SegmentLockError):
+            held.append_many([_event("sess-a")], LedgerService._build_event)
+    finally:
+        other.release()
+        held.release()
+    store.close()
@@ -0,0 +1,128 @@
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from concordia.app.deps import db_session
+from concordia.app.domain.merkle import canonical_bytes
+from concordia.app.domain.models import SessionRecord, SignatureRecord, UnderstandingEvent
+from concordia.app.domain.sign import generate_keypair, sign_message
+from concordia.app.infra import storage
+from concordia.app.infra.archive import clear_archive_cache
+from concordia.app.main import app
+from concordia.app.services import signature_audit
+from concordia.app.services.archive import ArchiveService
+from concordia.app.services.keys import KeyRegistry
+from concordia.app.services.signature_audit import SignatureAuditService
+
+
+def _signed_events(tmp_path, actors=("pat-1", "pat-2"), per_actor=3, wrap=False):
+    KeyRegistry.clear_cache()
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    def override():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[db_session] = override
+    client = TestClient(app)
+    try:
+        for actor_id in actors:
+            private, public = generate_keypair()
+            with Session(engine) as session:
+                KeyRegistry(session).register(actor_id, public.hex())
+                session.commit()
+            for i in range(per_actor):
+                body = {
+                    "session_id": f"sess-{actor_id}",
+                    "actor_id": actor_id,
+                    "actor_type": "patient",
+                    "act_type": "agree",
+                    "payload": {"i": i},
+                    "artifact_hash": None,
+                }
+                encode = base64.encodebytes if wrap else base64.b64encode
+                body["signature"] = encode(sign_message(private, canonical_bytes(body))).decode()
+                assert client.post("/events", json=body).status_code == 201
+    finally:
+        app.dependency_overrides.clear()
+    return engine
+
+
+def test_audit_passes_for_signatures_accepted_at_ingestion(tmp_path):
+    engine = _signed_events(tmp_path)
+    with Session(engine) as session:
+        report = SignatureAuditService(session, chunk_size=2).run(workers=1)
+    assert report["ok"] is True
+    assert report["records"] == 6
+    assert report["actors"] == 2
+    assert report["failures"] == []
+
+
+def test_audit_reports_tampered_and_unverifiable_records(tmp_path):
+    engine = _signed_events(tmp_path)
+    with Session(engine) as session:
+        event = session.exec(
+            select(UnderstandingEvent).where(UnderstandingEvent.actor_id == "pat-1")
+        ).first()
+        event.payload = {"i": 99}
+        session.add(event)
+        session.add(SignatureRecord(event_id="gone", actor_id="pat-2", signature_hex="AAAA"))
+        session.add(SignatureRecord(event_id=event.id, actor_id="nobody", signature_hex="AAAA"))
+        session.commit()
+        tampered_id = event.id
+
+    with Session(engine) as session:
+        inline = SignatureAuditService(session).run(workers=1)
+    with Session(engine) as session:
+        pooled = SignatureAuditService(session, chunk_size=1).run(workers=2)
+
+    assert inline["failed"] == 3
+    reasons = {(f["event_id"], f["actor_id"]): f["reason"] for f in inline["failures"]}
+    assert reasons == {
+        (tampered_id, "pat-1"): "signature mismatch",
+        ("gone", "pat-2"): "event not found",
+        (tampered_id, "nobody"): "actor key not registered",
+    }
+    assert pooled["failures"] == inline["failures"]
+    assert pooled["records"] == inline["records"] == 8
+
+
+def test_audit_decodes_signatures_like_ingestion(tmp_path):
+    engine = _signed_events(tmp_path, actors=("pat-1",), wrap=True)  # MIME line breaks
+    with Session(engine) as session:
+        assert all("\n" in s for s in session.exec(select(SignatureRecord.signature_hex)))
+        report = SignatureAuditService(session).run(workers=1)
+    assert report["ok"] is True and report["records"] == 3
+
+
+@pytest.fixture
+def archive_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_ROOT", tmp_path / "storage")
+    clear_archive_cache()
+    yield
+    clear_archive_cache()
+
+
+def test_archived_events_are_resolved_in_bounded_scans(tmp_path, monkeypatch, archive_storage):
+    engine = _signed_events(tmp_path)
+    with Session(engine) as session:
+        for session_id in ("sess-pat-1", "sess-pat-2"):
+            session.add(
+                SessionRecord(
+                    id=session_id, doctor_id="doc-1", title="t", artifact_hash="0" * 64, status="sealed"
+                )
+            )
+        session.commit()
+        ArchiveService(session).archive_session("sess-pat-1")
+        session.add(SignatureRecord(event_id="gone", actor_id="pat-1", signature_hex="AAAA"))
+        session.commit()
+
+    monkeypatch.setattr(signature_audit, "AUDIT_MISSING_BATCH", 2)
+    with Session(engine) as session:
+        report = SignatureAuditService(session).run(workers=1)
+    assert report["records"] == 7
+    assert [(f["event_id"], f["reason"]) for f in report["failures"]] == [("gone", "event not found")]
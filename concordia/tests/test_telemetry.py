@@ -1,3 +1,4 @@
+from sqlalchemy import event, inspect, text
 from sqlmodel import Session, SQLModel, create_engine
 
 from concordia.app.domain.models import (
@@ -5,6 +6,8 @@ from concordia.app.domain.models import (
     ComfortZone,
     UnderstandingEvent,
 )
+from concordia.app.infra.db import ensure_ledger_schema
+from concordia.app.services.ledger import LedgerService
 from concordia.app.services.telemetry import TelemetryService
 
 
@@ -50,3 +53,43 @@ def test_snapshot_assigns_focus_zone_when_pending_dominates():
 
         snapshot = TelemetryService(session).snapshot_for_session("sess-focus")
         assert snapshot.comfort_zone == ComfortZone.FOCUS
+
+
+def test_act_type_counts_use_one_grouped_index_query():
+    session = _session_factory()
+    engine = session.get_bind()
+    with session:
+        for act_type in (ActType.PRESENT, ActType.RE_VIEW, ActType.RE_VIEW, ActType.AGREE):
+            _add_event(session, "sess-count", act_type)
+        _add_event(session, "sess-other", ActType.RE_VIEW)
+        session.commit()
+
+        statements = []
+        event.listen(
+            engine, "before_cursor_execute", lambda conn, cur, stmt, *a: statements.append(stmt)
+        )
+        counts = LedgerService(session).act_type_counts("sess-count")
+        assert counts == {ActType.PRESENT: 1, ActType.RE_VIEW: 2, ActType.AGREE: 1}
+        assert len(statements) == 1
+        assert "GROUP BY" in statements[0] and "payload" not in statements[0]
+
+        plan = " ".join(
+            str(row)
+            for row in session.connection().exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statements[0], ("sess-count",)
+            )
+        )
+        assert "COVERING INDEX ix_understanding_events_session_act_type" in plan
+
+        snapshot = TelemetryService(session).snapshot_for_session("sess-count")
+        assert snapshot.post_view_rate == 0.5
+
+
+def test_ensure_ledger_schema_adds_act_type_index():
+    engine = create_engine("sqlite://", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_understanding_events_session_act_type"))
+    ensure_ledger_schema(engine)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("understanding_events")}
+    assert "ix_understanding_events_session_act_type" in indexes
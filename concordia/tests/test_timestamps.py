@@ -0,0 +1,173 @@
+import hashlib
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from concordia.app.domain.models import SignatureRecord, TimestampAnchor
+from concordia.app.domain.sign import generate_keypair, public_key_from_private, sign_message
+from concordia.app.infra import tsa
+from concordia.app.infra.tsa import (
+    TSA_RETRIES,
+    TSAError,
+    check_token,
+    request_timestamp,
+    shutdown_tsa_clients,
+    verify_timestamp_token,
+)
+from concordia.app.infra.tsa_server import LocalTSAServer
+from concordia.app.services.timestamps import (
+    TSA_ANCHORED,
+    TSA_PENDING,
+    TimestampBatchService,
+    TimestampBatcher,
+    timestamp_fields,
+)
+
+
+@pytest.fixture(autouse=True)
+def _close_tsa_clients():
+    yield
+    shutdown_tsa_clients()
+
+
+def _pending_records(tmp_path, count):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tsa.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(count):
+            curr_hash = hashlib.sha256(f"event-{i}".encode()).hexdigest()
+            session.add(
+                SignatureRecord(
+                    event_id=f"ev-{i}",
+                    actor_id="pat-1",
+                    signature_hex="sig",
+                    **timestamp_fields(curr_hash),
+                )
+            )
+        session.commit()
+    return engine, sessionmaker(bind=engine, class_=Session)
+
+
+def _remote(server, monkeypatch):
+    monkeypatch.setattr(tsa, "TSA_PUBLIC_KEY", server.public_key_hex)
+    return lambda digest: request_timestamp(digest, url=server.url)
+
+
+def _forged(token):
+    """``token`` re-signed by someone else, carrying their own public key."""
+    private, _ = generate_keypair()
+    forged = {**token, "public_key": public_key_from_private(private).hex()}
+    forged["signature"] = sign_message(private, tsa.token_message(forged)).hex()
+    return forged
+
+
+def test_local_tsa_token_is_signed_and_bound_to_digest(monkeypatch):
+    with LocalTSAServer() as server:
+        token = _remote(server, monkeypatch)(b"\x01" * 32)
+    assert token["digest"] == "01" * 32
+    assert verify_timestamp_token(token)
+    assert not verify_timestamp_token({**token, "timestamp": "2000-01-01T00:00:00"})
+
+
+def test_tokens_are_only_trusted_against_the_pinned_key(monkeypatch):
+    with LocalTSAServer() as server:
+        token = server.stamp("01" * 32)
+        forged = _forged({**token, "timestamp": "2000-01-01T00:00:00"})
+        assert verify_timestamp_token(forged, forged["public_key"])  # self-consistent...
+        monkeypatch.setattr(tsa, "TSA_PUBLIC_KEY", None)
+        assert not verify_timestamp_token(token)  # ...but nothing is trusted unpinned
+        with pytest.raises(TSAError, match="CONCORDIA_TSA_PUBLIC_KEY"):
+            request_timestamp(b"\x01" * 32, url=server.url)
+        assert server.digests == ["01" * 32]  # no request was sent
+
+        monkeypatch.setattr(tsa, "TSA_PUBLIC_KEY", server.public_key_hex)
+        assert check_token(token, b"\x01" * 32) is token
+        with pytest.raises(TSAError, match="signature"):
+            check_token(forged, b"\x01" * 32)
+
+
+def test_batch_timestamps_only_the_root_and_stores_inclusion_paths(tmp_path, monkeypatch):
+    engine, factory = _pending_records(tmp_path, 7)
+    with LocalTSAServer() as server:
+        remote = _remote(server, monkeypatch)
+        assert TimestampBatcher(factory, max_batch=4, timestamp=remote).flush() == 7
+
+    with Session(engine) as session:
+        anchors = session.exec(select(TimestampAnchor).order_by(TimestampAnchor.tree_size)).all()
+        assert [anchor.tree_size for anchor in anchors] == [3, 4]
+        assert sorted(server.digests) == sorted(anchor.root for anchor in anchors)
+        assert all(verify_timestamp_token(a.tsa_token, server.public_key_hex) for a in anchors)
+
+        records = session.exec(select(SignatureRecord)).all()
+        service = TimestampBatchService(session)
+        assert {record.tsa_status for record in records} == {TSA_ANCHORED}
+        assert all(service.verify_record(record) for record in records)
+
+        tampered = records[0]
+        tampered.tsa_token = {**tampered.tsa_token, "digest": "00" * 32}
+        assert not service.verify_record(tampered)
+
+        anchor = session.get(TimestampAnchor, records[1].tsa_token["anchor_id"])
+        original = anchor.tsa_token
+        anchor.tsa_token = _forged(original)
+        assert not service.verify_record(records[1])
+        anchor.tsa_token = {**original, "digest": "00" * 32}  # a token for another root
+        assert not service.verify_record(records[1])
+
+
+def test_tsa_failure_leaves_records_pending_for_the_next_run(tmp_path, monkeypatch):
+    engine, factory = _pending_records(tmp_path, 3)
+    with LocalTSAServer() as server:
+        server.fail_next = TSA_RETRIES + 1  # every attempt of one call
+        batcher = TimestampBatcher(factory, timestamp=_remote(server, monkeypatch))
+        with pytest.raises(TSAError):
+            batcher.flush()
+        with Session(engine) as session:
+            statuses = session.exec(select(SignatureRecord.tsa_status)).all()
+            assert set(statuses) == {TSA_PENDING}
+            assert session.exec(select(TimestampAnchor)).first() is None
+        assert batcher.flush() == 3
+
+
+def test_concurrent_batchers_never_anchor_a_record_twice(tmp_path, monkeypatch):
+    engine, factory = _pending_records(tmp_path, 3)
+    with LocalTSAServer() as server:
+        remote = _remote(server, monkeypatch)
+        other = TimestampBatcher(factory, timestamp=remote)
+        during_call = []
+
+        def slow_tsa(digest):
+            during_call.append(other.flush())  # runs while our rows are claimed
+            return remote(digest)
+
+        assert TimestampBatcher(factory, timestamp=slow_tsa).flush() == 3
+    assert during_call == [0]
+    with Session(engine) as session:
+        assert len(session.exec(select(TimestampAnchor)).all()) == 1
+        assert set(session.exec(select(SignatureRecord.tsa_status)).all()) == {TSA_ANCHORED}
+
+
+def test_records_stay_pending_without_a_tsa(tmp_path, monkeypatch):
+    engine, factory = _pending_records(tmp_path, 2)
+    monkeypatch.setattr(tsa, "TSA_URL", None)
+    assert TimestampBatcher(factory).flush() == 0
+    with Session(engine) as session:
+        assert set(session.exec(select(SignatureRecord.tsa_status)).all()) == {TSA_PENDING}
+        assert session.exec(select(TimestampAnchor)).first() is None
+
+
+def test_background_batcher_anchors_without_blocking(tmp_path, monkeypatch):
+    engine, factory = _pending_records(tmp_path, 2)
+    with LocalTSAServer() as server:
+        remote = _remote(server, monkeypatch)
+        batcher = TimestampBatcher(factory, interval=0.05, timestamp=remote).start()
+        try:
+            deadline = time.monotonic() + 5
+            while not server.digests and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            batcher.stop()
+    with Session(engine) as session:
+        assert set(session.exec(select(SignatureRecord.tsa_status)).all()) == {TSA_ANCHORED}
@@ -0,0 +1,188 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from concordia.app.deps import db_session
+from concordia.app.domain.models import SignatureRecord
+from concordia.app.infra import tsa
+from concordia.app.infra.tsa import (
+    AsyncTSAClient,
+    CircuitBreaker,
+    TSAError,
+    TSAUnavailable,
+    request_timestamp,
+    shutdown_tsa_clients,
+    tsa_client,
+    verify_timestamp_token,
+)
+from concordia.app.infra.tsa_server import LocalTSAServer
+from concordia.app.main import app
+from concordia.app.services import timestamps
+from concordia.app.services.timestamps import TSA_PENDING, TSA_STAMPED, timestamp_fields
+
+DIGEST = bytes(range(32))
+
+
+@pytest.fixture(autouse=True)
+def _close_tsa_clients():
+    yield
+    shutdown_tsa_clients()
+
+
+def _client(server, **kwargs):
+    return AsyncTSAClient(server.url, public_key_hex=server.public_key_hex, **kwargs)
+
+
+def _eventually(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_retries_transient_failures():
+    with LocalTSAServer() as server:
+        server.fail_next = 2
+        client = _client(server, retries=2, backoff=0.01)
+
+        async def run():
+            try:
+                return await client.timestamp(DIGEST)
+            finally:
+                await client.aclose()
+
+        token = asyncio.run(run())
+    assert verify_timestamp_token(token, server.public_key_hex)
+    snapshot = client.snapshot()
+    assert (snapshot["attempts"], snapshot["retries"], snapshot["ok"]) == (3, 2, 1)
+    assert snapshot["latency_ms"]["samples"] == 3
+
+
+def test_circuit_breaker_opens_and_recovers():
+    with LocalTSAServer() as server:
+        server.fail_next = 100
+        breaker = CircuitBreaker(threshold=2, reset_after=0.1)
+        client = _client(server, retries=0, breaker=breaker)
+
+        async def run():
+            try:
+                for _ in range(2):
+                    with pytest.raises(TSAError):
+                        await client.timestamp(DIGEST)
+                assert breaker.state == "open"
+                remaining = server.fail_next
+                with pytest.raises(TSAUnavailable):
+                    await client.timestamp(DIGEST)
+                assert server.fail_next == remaining  # rejected without a request
+
+                server.fail_next = 0
+                await asyncio.sleep(0.15)
+                assert breaker.state == "half-open"
+                return await client.timestamp(DIGEST)
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run())["digest"] == DIGEST.hex()
+    assert breaker.state == "closed"
+    assert client.snapshot()["rejected"] == 1
+
+
+def test_cancelled_half_open_trial_reopens_the_breaker():
+    with LocalTSAServer() as server:
+        server.fail_next = 1
+        breaker = CircuitBreaker(threshold=1, reset_after=0.05)
+        client = _client(server, retries=0, breaker=breaker)
+
+        async def run():
+            try:
+                with pytest.raises(TSAError):
+                    await client.timestamp(DIGEST)
+                await asyncio.sleep(0.1)
+                server.delay = 1.0
+                trial = asyncio.ensure_future(client.timestamp_many([DIGEST]))
+                await asyncio.sleep(0.2)  # the trial request is in flight
+                assert not breaker.allow()
+                trial.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await trial
+                assert breaker.state == "open"  # failed, not stuck half-open
+
+                server.delay = 0
+                await asyncio.sleep(0.1)
+                return await client.timestamp(DIGEST)
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run())["digest"] == DIGEST.hex()
+    assert breaker.snapshot() == {"state": "closed", "consecutive_failures": 0}
+
+
+def test_concurrent_requests_share_the_pool():
+    with LocalTSAServer(delay=0.2) as server:
+        client = _client(server, max_connections=10)
+        digests = [bytes([i]) * 32 for i in range(20)]
+
+        async def run():
+            try:
+                return await client.timestamp_many(digests)
+            finally:
+                await client.aclose()
+
+        started = time.perf_counter()
+        tokens = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+    assert [token["digest"] for token in tokens] == [digest.hex() for digest in digests]
+    assert elapsed < 20 * 0.2 * 0.75  # overlapped, not one after another
+
+
+def test_slow_tsa_defers_inline_timestamp(monkeypatch):
+    monkeypatch.setattr(timestamps, "TSA_BATCH_ENABLED", False)
+    monkeypatch.setattr(timestamps, "TSA_INLINE_WAIT", 0.05)
+    with LocalTSAServer(delay=0.5) as server:
+        monkeypatch.setattr(tsa, "TSA_URL", server.url)
+        monkeypatch.setattr(tsa, "TSA_PUBLIC_KEY", server.public_key_hex)
+        started = time.perf_counter()
+        fields = timestamp_fields(DIGEST.hex())
+        assert time.perf_counter() - started < 0.4
+        assert fields == {"tsa_token": {"digest": DIGEST.hex()}, "tsa_status": TSA_PENDING}
+        breaker = tsa_client(server.url).client.breaker
+        assert _eventually(lambda: breaker.snapshot()["consecutive_failures"] == 1)
+
+        server.delay = 0
+        monkeypatch.setattr(timestamps, "TSA_INLINE_WAIT", 5)
+        fields = timestamp_fields(DIGEST.hex())
+    assert fields["tsa_status"] == TSA_STAMPED
+    assert verify_timestamp_token(fields["tsa_token"])
+
+
+def test_debug_tsa_reports_latency_and_backlog(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tsa.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            SignatureRecord(
+                event_id="ev", actor_id="pat-1", signature_hex="s", **timestamp_fields("ab" * 32)
+            )
+        )
+        session.commit()
+
+    def override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[db_session] = override
+    try:
+        with LocalTSAServer() as server:
+            monkeypatch.setattr(tsa, "TSA_PUBLIC_KEY", server.public_key_hex)
+            request_timestamp(DIGEST, url=server.url)
+            body = TestClient(app).get("/debug/tsa").json()
+    finally:
+        app.dependency_overrides.clear()
+    assert body["pending_records"] == 1
+    assert body["last_anchor"] is None
+    (client,) = [c for c in body["clients"] if c["url"] == server.url]
+    assert client["ok"] == 1 and client["breaker"]["state"] == "closed"
+    assert client["latency_ms"]["p50"] is not None
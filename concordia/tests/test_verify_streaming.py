@@ -0,0 +1,54 @@
+import tracemalloc
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from concordia.app.domain.models import ActType, ActorType, UnderstandingEventCreate
+from concordia.app.services.ledger import LedgerService
+from concordia.tests.test_ledger import load_script
+
+
+def _seed(engine, session_id: str, count: int) -> None:
+    with Session(engine) as session:
+        LedgerService(session).append_many(
+            [
+                UnderstandingEventCreate(
+                    session_id=session_id,
+                    actor_id="pat-1",
+                    actor_type=ActorType.PATIENT,
+                    act_type=ActType.RE_VIEW,
+                    payload={"i": i, "note": "x" * 512},
+                )
+                for i in range(count)
+            ]
+        )
+        session.commit()
+
+
+def _peak_bytes(verify_chain, engine, session_id: str) -> int:
+    with Session(engine) as db:
+        tracemalloc.start()
+        try:
+            result = verify_chain.check_chain(
+                verify_chain.load_events(db, session_id, batch_size=100)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert result.ok
+    return peak
+
+
+def test_streaming_verification_memory_stays_flat(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stream.db'}")
+    SQLModel.metadata.create_all(engine)
+    _seed(engine, "small", 300)
+    _seed(engine, "large", 3000)
+    verify_chain = load_script("verify_chain")
+
+    _peak_bytes(verify_chain, engine, "small")  # warm statement caches
+    small = _peak_bytes(verify_chain, engine, "small")
+    large = _peak_bytes(verify_chain, engine, "large")
+
+    # 10x the events (~1.5 MB of payload) must not grow the peak with it
+    assert large < 2 * small
+    assert large < 1_000_000
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark canonical JSON encoding on realistic ledger/capsule payloads.
+
+Compares the plain ``json.dumps`` reference with ``concordia.canonical``
+(prebuilt C encoder and, if installed, the orjson backend) and checks every
+variant produces identical bytes before timing it.
+
+Usage:
+    python scripts/bench_canonical.py --iterations 50000
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from concordia import canonical
+from concordia.app.domain.merkle import canonical_bytes
+from concordia.capsule import _canonical_json
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark canonical JSON encoding.")
+    parser.add_argument("--iterations", type=int, default=50000)
+    return parser.parse_args()
+
+
+def ledger_envelope() -> dict:
+    return {
+        "session_id": "sess-2f6c1a",
+        "actor_id": "pat-001",
+        "actor_type": "patient",
+        "act_type": "clarify_request",
+        "payload": {
+            "preset": "details",
+            "question": "手術後どのくらいで歩けますか？",
+            "section": "recovery",
+            "viewed_ms": 18250,
+            "tags": ["risk", "recovery"],
+        },
+        "artifact_hash": "9f" * 32,
+        "created_at": "2026-10-17T04:33:47.047693",
+    }
+
+
+def capsule_material() -> dict:
+    return {
+        "domain": "ui",
+        "kind": "view",
+        "actor": "patient:001",
+        "payload": {"page": "risks", "scroll": [0, 480, 960], "lang": "ja"},
+        "at": "2026-10-17T04:33:47.047693Z",
+        "prev_hash": "4e" * 32,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    envelope, material = ledger_envelope(), capsule_material()
+    cases = [
+        ("ledger json.dumps", lambda: canonical.reference_bytes(envelope)),
+        ("ledger canonical_bytes", lambda: canonical_bytes(envelope)),
+        ("capsule json.dumps", lambda: canonical.reference_bytes(material, ensure_ascii=False)),
+        ("capsule _canonical_json", lambda: _canonical_json(material)),
+    ]
+    if canonical.orjson is not None:
+        orjson_encode = canonical._select_encoder(False, backend="orjson")
+        cases.append(("capsule orjson", lambda: orjson_encode(material).encode("utf-8")))
+
+    baselines = {}
+    for name, func in cases:
+        kind = name.split()[0]
+        reference = canonical.reference_bytes(
+            envelope if kind == "ledger" else material, ensure_ascii=kind == "ledger"
+        )
+        assert func() == reference, f"{name} output differs from json.dumps"
+        seconds = timeit.timeit(func, number=args.iterations)
+        per_call = seconds / args.iterations * 1e6
+        baseline = baselines.setdefault(kind, per_call)
+        print(f"{name:>24}: {per_call:6.2f} us/op  ({baseline / per_call:4.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compare JSON and binary capsule files: size, full load, random access.
+
+Writes the same sealed capsule as ``to_json()`` text, as streamed
+``dump()`` JSON and in the binary format (``concordia.capsule_binary``),
+then times loading and verifying each, plus fetching single events and
+hashes from the binary file by index.
+
+Usage:
+    python scripts/bench_capsule_binary.py --events 100000 --dir /tmp/capsules
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from bench_capsule_memory import build
+
+from concordia.capsule import SessionCapsule
+from concordia.capsule_binary import BinaryCapsule, write_binary
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark binary vs JSON capsules.")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--dir", type=Path, default=None, help="output directory (default: temp)")
+    return parser.parse_args()
+
+
+def timed(label: str, func) -> None:
+    started = time.perf_counter()
+    func()
+    print(f"{label:>28}: {time.perf_counter() - started:7.3f} s")
+
+
+def main() -> int:
+    args = parse_args()
+    directory = args.dir or Path(tempfile.mkdtemp(prefix="capsules-"))
+    directory.mkdir(parents=True, exist_ok=True)
+    capsule = build(args.events, compact=True)
+    capsule.seal()
+
+    json_path, dump_path, binary_path = (
+        directory / "capsule.json",
+        directory / "capsule.dump.json",
+        directory / "capsule.ccap",
+    )
+    json_path.write_text(capsule.to_json(), encoding="utf-8")
+    with open(dump_path, "w", encoding="utf-8") as fp:
+        capsule.dump(fp)
+    write_binary(capsule, binary_path)
+    for path in (json_path, dump_path, binary_path):
+        size = path.stat().st_size
+        print(f"{path.name:>28}: {size / 1e6:7.2f} MB  ({size / args.events:6.1f} B/event)")
+
+    timed("json.load + from_dict", lambda: SessionCapsule.from_dict(json.loads(json_path.read_text())))
+    timed("iter_load (verifying)", lambda: sum(1 for _ in SessionCapsule.iter_load(open(dump_path))))
+    timed("binary open", lambda: BinaryCapsule(binary_path).close())
+    timed("binary verify", lambda: BinaryCapsule(binary_path).verify())
+
+    indexes = [random.randrange(args.events) for _ in range(args.lookups)]
+    with BinaryCapsule(binary_path) as binary:
+        timed(f"binary {args.lookups} digest(i)", lambda: [binary.digest(i) for i in indexes])
+        timed(f"binary {args.lookups} event(i)", lambda: [binary.event(i) for i in indexes])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure SessionCapsule memory per event, default vs ``compact=True``.
+
+Builds the same capsule in both modes under ``tracemalloc`` and reports
+bytes per event plus append and verify time. Events share a few domains,
+kinds and actors and carry a small payload, like UI/consent logs.
+
+Usage:
+    python scripts/bench_capsule_memory.py --events 200000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from concordia.capsule import SessionCapsule, SessionEvent
+
+KINDS = ("view", "scroll", "clarify", "agree")
+ACTORS = ("patient:001", "doctor:007", "family:002")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark capsule memory per event.")
+    parser.add_argument("--events", type=int, default=200000)
+    return parser.parse_args()
+
+
+def build(count: int, compact: bool) -> SessionCapsule:
+    capsule = SessionCapsule(session_id="bench", compact=compact)
+    for i in range(count):
+        capsule.append(
+            SessionEvent(
+                domain="ui",
+                kind=KINDS[i % len(KINDS)],
+                actor=ACTORS[i % len(ACTORS)],
+                payload={"page": i % 12},
+                # built strings, as when read from a file: not shared between events
+                at="2026-10-17T04:%02d:%02d.%06dZ" % (i // 60 % 60, i % 60, i),
+            )
+        )
+    return capsule
+
+
+def measure(count: int, compact: bool) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    capsule = build(count, compact)
+    built = time.perf_counter()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    verify_started = time.perf_counter()
+    assert capsule.verify()["ok"]
+    verified = time.perf_counter()
+    label = "compact" if compact else "default"
+    print(
+        f"{label:>8}: {current / count:7.1f} B/event  "
+        f"append {(built - started) / count * 1e6:5.2f} us/event  "
+        f"verify {(verified - verify_started) / count * 1e6:5.2f} us/event"
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    # payload dicts are kept as-is in both modes and dominate what remains
+    print(f"{args.events} events")
+    for compact in (False, True):
+        measure(args.events, compact)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark ledger write paths.
+
+Modes:
+- single: one transaction + one append per event (what POST /events does)
+- batch:  LedgerService.append_many per --batch-size events (POST /events/batch)
+- group:  concurrent appends coalesced by GroupCommitWriter
+- read:   random single-event reads by (session_id, seq) after a batch load
+
+single and group run --concurrency client threads so the per-event latency
+(p50/p99) reflects contention on the same session chain.
+
+``--backend segment`` runs the same modes against the append-only segment
+store (infra/segments.py) instead of the understanding_events table.
+
+Usage:
+    python scripts/bench_ledger.py --events 2000 --concurrency 16
+    python scripts/bench_ledger.py --mode batch --batch-size 200 --database-url postgresql+psycopg://...
+    python scripts/bench_ledger.py --backend segment --segment-root /tmp/bench-segments
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel
+
+from concordia.app.domain.models import ActType, ActorType, UnderstandingEventCreate
+from concordia.app.infra.segments import SegmentLedgerStore
+from concordia.app.services.group_commit import GroupCommitWriter
+from concordia.app.services.ledger import LedgerService
+
+MODES = ("single", "batch", "group", "read")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ledger write paths.")
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--group-delay-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--database-url",
+        help="Database URL (defaults to a throwaway SQLite file)",
+    )
+    parser.add_argument("--backend", choices=("sql", "segment"), default="sql")
+    parser.add_argument(
+        "--segment-root",
+        help="segment store directory (defaults to a throwaway directory)",
+    )
+    parser.add_argument(
+        "--fsync-every",
+        type=int,
+        default=64,
+        help="segment backend: fsync after this many records",
+    )
+    return parser.parse_args()
+
+
+def _event(session_id: str, index: int) -> UnderstandingEventCreate:
+    return UnderstandingEventCreate(
+        session_id=session_id,
+        actor_id="pat-bench",
+        actor_type=ActorType.PATIENT,
+        act_type=ActType.SIGNAL_ACK,
+        payload={"signal": "ack", "i": index},
+    )
+
+
+def _concurrently(append, session_id: str, count: int, concurrency: int) -> list[float]:
+    def timed(index: int) -> float:
+        started = time.perf_counter()
+        append(_event(session_id, index))
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, range(count)))
+
+
+def run_single(SessionLocal, session_id: str, args: argparse.Namespace) -> list[float]:
+    def append(event_in: UnderstandingEventCreate) -> None:
+        with SessionLocal() as db:
+            LedgerService(db, store=args.store).append(event_in)
+            db.commit()
+
+    return _concurrently(append, session_id, args.events, args.concurrency)
+
+
+def run_batch(SessionLocal, session_id: str, args: argparse.Namespace) -> list[float]:
+    latencies = []
+    for start in range(0, args.events, args.batch_size):
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            LedgerService(db, store=args.store).append_many(
+                [
+                    _event(session_id, index)
+                    for index in range(start, min(start + args.batch_size, args.events))
+                ]
+            )
+            db.commit()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_group(SessionLocal, session_id: str, args: argparse.Namespace) -> list[float]:
+    writer = GroupCommitWriter(
+        SessionLocal,
+        max_batch=args.batch_size,
+        max_delay=args.group_delay_ms / 1000,
+        store=args.store,
+    ).start()
+    try:
+        return _concurrently(writer.append, session_id, args.events, args.concurrency)
+    finally:
+        writer.stop()
+
+
+def run_read(SessionLocal, session_id: str, args: argparse.Namespace) -> list[float]:
+    run_batch(SessionLocal, session_id, args)
+    latencies = []
+    with SessionLocal() as db:
+        ledger = LedgerService(db, store=args.store)
+        for _ in range(args.events):
+            seq = random.randint(1, args.events)
+            started = time.perf_counter()
+            (event,) = ledger.timeline(session_id, after_seq=seq - 1, limit=1)
+            latencies.append(time.perf_counter() - started)
+            assert event.seq == seq
+    return latencies
+
+
+RUNNERS = {"single": run_single, "batch": run_batch, "group": run_group, "read": run_read}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def main() -> int:
+    args = parse_args()
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    connect_args = {"timeout": 60} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, future=True, connect_args=connect_args)
+    SQLModel.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False)
+    args.store = None
+    if args.backend == "segment":
+        args.store = SegmentLedgerStore(
+            args.segment_root or tempfile.mkdtemp(), fsync_every=args.fsync_every
+        )
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    for mode in modes:
+        session_id = f"bench-{mode}-{os.getpid()}-{time.time_ns()}"
+        started = time.perf_counter()
+        latencies = RUNNERS[mode](SessionLocal, session_id, args)
+        elapsed = time.perf_counter() - started
+        unit = "batch" if mode == "batch" else "event"
+        print(
+            f"{args.backend}/{mode:>6}: {args.events} events in {elapsed:.2f}s -> "
+            f"{args.events / elapsed:,.0f} events/s | "
+            f"{unit} latency p50={_percentile(latencies, 50) * 1000:.1f}ms "
+            f"p99={_percentile(latencies, 99) * 1000:.1f}ms"
+        )
+    if args.store is not None:
+        args.store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
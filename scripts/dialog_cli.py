@@ -9,10 +9,15 @@ import random
 import google.generativeai as genai
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import Session, select
+from sqlmodel import Session
 
-from concordia.app.domain.models import ActType, ActorType, UnderstandingEvent
+from concordia.app.domain.models import (
+    ActType,
+    ActorType,
+    UnderstandingEventCreate,
+)
 from concordia.app.infra.db import ensure_acttype_enum_values
+from concordia.app.services.ledger import LedgerService
 from concordia.app.services.telemetry import TelemetryService
 
 # ANSI color codes
@@ -209,17 +214,15 @@ def parse_args() -> argparse.Namespace:
 
 def record_event(db: Session, session_id: str, actor_id: str, actor_type: ActorType,
                  act_type: ActType, payload: dict):
-    event = UnderstandingEvent(
-        session_id=session_id,
-        actor_id=actor_id,
-        actor_type=actor_type,
-        act_type=act_type,
-        payload=payload,
+    return LedgerService(db).append(
+        UnderstandingEventCreate(
+            session_id=session_id,
+            actor_id=actor_id,
+            actor_type=actor_type,
+            act_type=act_type,
+            payload=payload,
+        )
     )
-    db.add(event)
-    db.flush()
-    db.refresh(event)
-    return event
 
 
 def phase_comment(summary: dict) -> str:
@@ -272,13 +275,9 @@ def print_summary(session_id: str, db: Session) -> None:
     print(f"{BOLD}{BLUE}📊 会話の状況:{RESET} {format_comfort_zone(str(snapshot.comfort_zone))}\n")
     
     # Count agreement events
-    events = db.exec(
-        select(UnderstandingEvent)
-        .where(UnderstandingEvent.session_id == session_id)
-        .where(UnderstandingEvent.act_type == ActType.AGREE)
-    ).all()
+    counts = LedgerService(db).act_type_counts(session_id)
     
-    if events:
+    if counts.get(ActType.AGREE):
         print(f"{BOLD}{GREEN}🎉 素晴らしい！合意に到達しました！{RESET}\n")
         print(f"{GREEN}{'='*50}{RESET}")
         print(f"{GREEN}　双方が納得できる内容で合意できました{RESET}")
@@ -289,11 +288,7 @@ def print_summary(session_id: str, db: Session) -> None:
         print(f"{CYAN}お互いの考えを尊重しながら、もう一度時間をかけて話し合う機会を持てると良いですね{RESET}\n")
         
         # Count total exchanges
-        all_events = db.exec(
-            select(UnderstandingEvent)
-            .where(UnderstandingEvent.session_id == session_id)
-        ).all()
-        exchange_count = len(all_events) // 2
+        exchange_count = sum(counts.values()) // 2
         print(f"{CYAN}📈 会話数: {exchange_count} 往復{RESET}\n")
 
 
@@ -41,7 +41,6 @@ def ensure_session(db: Session, session_id: str, doctor_id: str, artifact_hash:
 
 def create_demo_events(db: Session, session_id: str, patient_id: str, doctor_id: str):
     ledger = LedgerService(db)
-    base_time = datetime.utcnow() - timedelta(hours=2)
     events = [
         (doctor_id, ActorType.DOCTOR, ActType.PRESENT, {"step": "intro"}),
         (patient_id, ActorType.PATIENT, ActType.CLARIFY_REQUEST, {"preset": "details"}),
@@ -49,17 +48,18 @@ def create_demo_events(db: Session, session_id: str, patient_id: str, doctor_id:
         (patient_id, ActorType.PATIENT, ActType.RE_VIEW, {}),
         (patient_id, ActorType.PATIENT, ActType.AGREE, {}),
     ]
-    for offset, (actor_id, actor_type, act_type, payload) in enumerate(events):
-        event = UnderstandingEventCreate(
-            session_id=session_id,
-            actor_id=actor_id,
-            actor_type=actor_type,
-            act_type=act_type,
-            payload=payload,
+    # created_at is part of the hashed envelope, so it is never rewritten
+    # after append; seq gives the order.
+    for actor_id, actor_type, act_type, payload in events:
+        ledger.append(
+            UnderstandingEventCreate(
+                session_id=session_id,
+                actor_id=actor_id,
+                actor_type=actor_type,
+                act_type=act_type,
+                payload=payload,
+            )
         )
-        inserted = ledger.append(event)
-        inserted.created_at = base_time + timedelta(minutes=offset * 10)
-        db.add(inserted)
 
 
 def main() -> int:
@@ -2,24 +2,70 @@
 """
 Verify Concordia understanding event hashes for tamper detection.
 
+Each session is an independent chain (ordered by ``seq``); without
+``--session-id`` every session in the database is verified. Ledgers written
+before per-session chaining can be checked with ``--chain-scope global``.
+
+With ``--since-checkpoint`` each session resumes after its last signed
+checkpoint (``ledger_checkpoints``) and a new checkpoint is written when the
+new events check out, so routine runs cost O(new events). The checkpoint
+trusts everything before it: run a full pass periodically to re-check
+history.
+
+Events carry a stored ``content_hash`` (digest of the canonical envelope),
+so the default pass re-links the chain from digests and never serializes
+payloads. ``--deep`` additionally re-hashes every payload against its
+``content_hash``; ``--sample 0.05`` re-hashes a random 5%. Rows written
+before ``content_hash`` existed are always re-hashed (legacy link).
+
+``--workers N`` verifies sessions in a process pool (each worker streams
+one session at a time) and merges the results into one per-session report.
+
+``--ledger-backend segment`` reads events from the segment-file store
+(``--segment-root``) instead of the database (full passes only).
+
 Usage:
     python scripts/verify_chain.py --session-id sess-1
+    python scripts/verify_chain.py --since-checkpoint
+    python scripts/verify_chain.py --deep --workers 8 --report verify-report.json
+    python scripts/verify_chain.py --deep --sample 0.05
+    python scripts/verify_chain.py --chain-scope global
 """
 from __future__ import annotations
 
 import argparse
+import json
 import os
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Iterator
 
-from sqlalchemy import create_engine
+from sqlalchemy import case, create_engine, null
+from sqlalchemy.engine import Engine, Row
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, select
 
-from concordia.app.domain.merkle import canonical_bytes, compute_chain_hash
-from concordia.app.domain.models import UnderstandingEvent
+from concordia.app.domain.merkle import (
+    compute_chain_hash,
+    compute_content_hash,
+    event_envelope,
+    link_content_hash,
+)
+from concordia.app.domain.models import LedgerCheckpoint, SessionArchive, UnderstandingEvent
+from concordia.app.infra.archive import load_archive
+from concordia.app.infra.segments import SEGMENT_ROOT, SegmentLedgerStore
+from concordia.app.services.archive import verify_archived
+from concordia.app.services.checkpoints import CheckpointService
+from concordia.app.services.keys import load_server_key
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Verify Merkle chain integrity.")
     parser.add_argument(
         "--session-id",
@@ -33,72 +79,415 @@ def parse_args() -> argparse.Namespace:
         ),
         help="Database URL (SQLAlchemy compatible)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--chain-scope",
+        choices=("session", "global"),
+        default=os.getenv("CONCORDIA_CHAIN_SCOPE", "session"),
+        help="session: one chain per session (default); global: legacy single chain",
+    )
+    parser.add_argument(
+        "--since-checkpoint",
+        action="store_true",
+        help="resume from each session's last signed checkpoint and write a new one",
+    )
+    parser.add_argument(
+        "--signing-key",
+        type=Path,
+        help="server Ed25519 key file for checkpoints (default: CONCORDIA_SERVER_KEY_*)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="verify sessions in N worker processes (per-session chains only)",
+    )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="also re-hash payloads against their stored content_hash",
+    )
+    parser.add_argument(
+        "--sample",
+        type=float,
+        default=1.0,
+        help="with --deep, fraction of events to re-hash (0 < rate <= 1)",
+    )
+    parser.add_argument(
+        "--ledger-backend",
+        choices=("sql", "segment"),
+        default=os.getenv("CONCORDIA_LEDGER_BACKEND", "sql"),
+        help="where events are stored (default: CONCORDIA_LEDGER_BACKEND or sql)",
+    )
+    parser.add_argument(
+        "--segment-root",
+        type=Path,
+        default=SEGMENT_ROOT,
+        help="segment store directory for --ledger-backend segment",
+    )
+    parser.add_argument("--report", type=Path, help="write the per-session JSON report here")
+    return parser.parse_args(argv)
+
+
+EVENT_TABLE = UnderstandingEvent.__table__
+CHAIN_COLUMNS = (
+    EVENT_TABLE.c.id,
+    EVENT_TABLE.c.session_id,
+    EVENT_TABLE.c.seq,
+    EVENT_TABLE.c.actor_id,
+    EVENT_TABLE.c.actor_type,
+    EVENT_TABLE.c.act_type,
+    EVENT_TABLE.c.payload,
+    EVENT_TABLE.c.artifact_hash,
+    EVENT_TABLE.c.prev_hash,
+    EVENT_TABLE.c.curr_hash,
+    EVENT_TABLE.c.content_hash,
+    EVENT_TABLE.c.created_at,
+)
+# Digest-only pass: payloads are only fetched for legacy rows, which have no
+# content_hash and must be re-serialized to check their link.
+DIGEST_COLUMNS = tuple(
+    case((EVENT_TABLE.c.content_hash.is_(None), column), else_=null()).label("payload")
+    if column.key == "payload"
+    else column
+    for column in CHAIN_COLUMNS
+)
+STREAM_BATCH = 1000
 
 
-def load_events(db: Session, session_id: str | None) -> list[UnderstandingEvent]:
-    stmt = select(UnderstandingEvent).order_by(UnderstandingEvent.created_at.asc())
+def load_events(
+    db: Session,
+    session_id: str | None,
+    chain_scope: str = "session",
+    after_seq: int = 0,
+    batch_size: int = STREAM_BATCH,
+    with_payload: bool = True,
+) -> Iterator[Row]:
+    """Stream the columns needed for hashing as plain rows, in chain order.
+
+    A server-side cursor (``stream_results``) with ``yield_per`` keeps at
+    most ``batch_size`` rows in memory regardless of ledger size; no ORM
+    objects are built. ``with_payload=False`` skips payloads that the
+    digest-only pass does not need.
+    """
+    stmt = select(*(CHAIN_COLUMNS if with_payload else DIGEST_COLUMNS))
+    if after_seq:
+        stmt = stmt.where(EVENT_TABLE.c.seq > after_seq)
+    if chain_scope == "global":
+        # legacy rows (no global_seq) by created_at first, then chain position
+        stmt = stmt.order_by(
+            EVENT_TABLE.c.global_seq.is_not(None),
+            EVENT_TABLE.c.global_seq.asc(),
+            EVENT_TABLE.c.created_at.asc(),
+            EVENT_TABLE.c.seq.asc(),
+        )
+    else:
+        stmt = stmt.order_by(EVENT_TABLE.c.session_id, EVENT_TABLE.c.seq.asc())
     if session_id:
-        stmt = stmt.where(UnderstandingEvent.session_id == session_id)
-    return list(db.exec(stmt))
+        stmt = stmt.where(EVENT_TABLE.c.session_id == session_id)
+    stmt = stmt.execution_options(stream_results=True, yield_per=batch_size)
+    yield from db.execute(stmt)
 
 
-def verify(events: list[UnderstandingEvent]) -> bool:
-    ok = True
+def load_segment_events(store: SegmentLedgerStore, session_id: str | None) -> Iterator[UnderstandingEvent]:
+    """Events from the segment store, session by session in ``seq`` order."""
+    for sid in [session_id] if session_id else store.session_ids():
+        yield from store.iter_session(sid)
+
+
+@dataclass
+class ChainResult:
+    events: int = 0
+    sessions: int = 0
+    rehashed: int = 0
+    last: Row | None = None
+    problems: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def check_chain(
+    events: Iterable[Row],
+    chain_scope: str = "session",
+    start: dict[str, tuple[str | None, datetime | None, int]] | None = None,
+    deep: bool = False,
+    sample: float = 1.0,
+    rng: random.Random | None = None,
+) -> ChainResult:
+    """Re-link the chain in one streaming pass.
+
+    ``start`` maps session_id -> (prev_hash, last created_at, last seq) for
+    chains that resume from a checkpoint instead of their first event.
+    With ``deep`` the envelope of each event (or a ``sample`` fraction of
+    them) is re-hashed and compared with its stored ``content_hash``.
+    """
+    result = ChainResult()
+    rng = rng or random.Random()
     prev_hash = None
     last_ts = None
+    last_seq = 0
+    current_session = None
+    start = start or {}
     for event in events:
-        payload = {
-            "session_id": event.session_id,
-            "actor_id": event.actor_id,
-            "actor_type": event.actor_type.value,
-            "act_type": event.act_type.value,
-            "payload": event.payload,
-            "artifact_hash": event.artifact_hash,
-            "created_at": event.created_at.isoformat(),
-        }
-        expected_hash = compute_chain_hash(payload, prev_hash)
+        if chain_scope == "session" and event.session_id != current_session:
+            # each session starts a fresh chain
+            current_session = event.session_id
+            prev_hash, last_ts, last_seq = start.get(current_session, (None, None, 0))
+            result.sessions += 1
+        if event.content_hash is None:
+            # legacy link: SHA256(canonical(envelope) || prev)
+            expected_hash = compute_chain_hash(event_envelope(event), prev_hash)
+            result.rehashed += 1
+        else:
+            try:
+                expected_hash = link_content_hash(event.content_hash, prev_hash)
+            except ValueError:
+                expected_hash = None
+            if deep and (sample >= 1 or rng.random() < sample):
+                result.rehashed += 1
+                if compute_content_hash(event_envelope(event)) != event.content_hash:
+                    result.problems.append(
+                        f"content_hash mismatch at event {event.id}: payload or envelope changed"
+                    )
         if event.prev_hash != prev_hash:
-            print(
-                f"[WARN] prev_hash mismatch at event {event.id}: "
-                f"stored={event.prev_hash} expected={prev_hash}",
-                file=sys.stderr,
+            result.problems.append(
+                f"prev_hash mismatch at event {event.id}: "
+                f"stored={event.prev_hash} expected={prev_hash}"
             )
-            ok = False
         if event.curr_hash != expected_hash:
-            print(
-                f"[WARN] curr_hash mismatch at event {event.id}: "
-                f"stored={event.curr_hash} expected={expected_hash}",
-                file=sys.stderr,
+            result.problems.append(
+                f"curr_hash mismatch at event {event.id}: "
+                f"stored={event.curr_hash} expected={expected_hash}"
+            )
+        if chain_scope == "session" and event.seq != last_seq + 1:
+            result.problems.append(
+                f"seq gap at event {event.id}: seq={event.seq} expected={last_seq + 1}"
             )
-            ok = False
         if last_ts and event.created_at < last_ts:
-            print(
-                f"[WARN] created_at monotonicity break at event {event.id}: "
-                f"{event.created_at.isoformat()} < {last_ts.isoformat()}",
-                file=sys.stderr,
+            result.problems.append(
+                f"created_at monotonicity break at event {event.id}: "
+                f"{event.created_at.isoformat()} < {last_ts.isoformat()}"
             )
-            ok = False
         last_ts = event.created_at
+        last_seq = event.seq or 0
         prev_hash = event.curr_hash
+        result.events += 1
+        result.last = event
+    if chain_scope == "global" and result.events:
+        result.sessions = 1
+    return result
+
+
+def verify(
+    events: Iterable[Row],
+    chain_scope: str = "session",
+    start: dict[str, tuple[str | None, datetime | None, int]] | None = None,
+    report: bool = True,
+    deep: bool = False,
+    sample: float = 1.0,
+) -> ChainResult:
+    result = check_chain(events, chain_scope, start, deep=deep, sample=sample)
+    for problem in result.problems:
+        print(f"[WARN] {problem}", file=sys.stderr)
+    if result.ok and report and result.events:
+        print(
+            f"Verified {result.events} events; chain intact"
+            + (f" for session {result.last.session_id}" if result.sessions == 1 else "")
+            + (f" across {result.sessions} sessions" if result.sessions > 1 else "")
+            + f" ({result.rehashed} envelopes re-hashed)"
+        )
+    return result
+
+
+_worker_engines: dict[str, Engine] = {}
+
+
+def verify_session_worker(
+    database_url: str, session_id: str, deep: bool = False, sample: float = 1.0
+) -> dict:
+    """Verify one session's chain in a worker process; returns a compact result."""
+    engine = _worker_engines.get(database_url)
+    if engine is None:
+        engine = _worker_engines[database_url] = create_engine(database_url, future=True)
+    started = time.perf_counter()
+    with Session(engine) as db:
+        result = check_chain(
+            load_events(db, session_id, with_payload=deep), deep=deep, sample=sample
+        )
+    return {
+        "session_id": session_id,
+        "ok": result.ok,
+        "events": result.events,
+        "rehashed": result.rehashed,
+        "seconds": round(time.perf_counter() - started, 4),
+        "problems": result.problems,
+    }
+
+
+def verify_parallel(db: Session, args: argparse.Namespace) -> bool:
+    if args.session_id:
+        session_ids = [args.session_id]
+    else:
+        session_ids = list(
+            db.exec(select(UnderstandingEvent.session_id).distinct().order_by(UnderstandingEvent.session_id))
+        )
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(
+            pool.map(
+                verify_session_worker,
+                repeat(args.database_url),
+                session_ids,
+                repeat(args.deep),
+                repeat(args.sample),
+                chunksize=max(1, len(session_ids) // (args.workers * 4)),
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        status = "OK" if result["ok"] else "FAILED"
+        print(f"{result['session_id']}: {status} {result['events']} events in {result['seconds']:.3f}s")
+        for problem in result["problems"]:
+            print(f"[WARN] {problem}", file=sys.stderr)
+    ok = all(result["ok"] for result in results)
+    total = sum(result["events"] for result in results)
+    print(
+        f"Verified {total} events across {len(results)} sessions with {args.workers} workers "
+        f"in {elapsed:.2f}s; " + ("chain intact" if ok else "problems found")
+    )
+    if args.report:
+        args.report.write_text(
+            json.dumps(
+                {"ok": ok, "events": total, "seconds": round(elapsed, 4), "sessions": results},
+                indent=2,
+            )
+        )
+    return ok
+
+
+def verify_archived_session(
+    db: Session, stub: SessionArchive, checkpoint: LedgerCheckpoint | None
+) -> bool:
+    """Archived sessions have no hot rows: check the blob and the old checkpoint against it."""
+    problems = verify_archived(db, stub.session_id)
+    if not problems and checkpoint is not None:
+        _, events = load_archive(stub.blob_name, stub.sha256, cache=False)
+        if not any(e.seq == checkpoint.seq and e.curr_hash == checkpoint.curr_hash for e in events):
+            problems.append(f"checkpointed event seq={checkpoint.seq} is not in the archive")
+    for problem in problems:
+        print(f"[WARN] archived session {stub.session_id}: {problem}", file=sys.stderr)
+    return not problems
+
+
+def verify_since_checkpoint(db: Session, args: argparse.Namespace) -> bool:
+    checkpoints = CheckpointService(db, load_server_key(args.signing_key))
+    if args.session_id:
+        session_ids = [args.session_id]
+    else:
+        session_ids = list(
+            db.exec(select(UnderstandingEvent.session_id).distinct().order_by(UnderstandingEvent.session_id))
+        )
+
+    ok = True
+    verified = 0
+    for session_id in session_ids:
+        checkpoint = checkpoints.latest(session_id)
+        after_seq, prev_hash, last_ts, count = 0, None, None, 0
+        if checkpoint and not checkpoints.is_trusted(checkpoint):
+            print(f"[WARN] untrusted checkpoint {checkpoint.id} for session {session_id}", file=sys.stderr)
+            ok = False
+            continue
+        stub = db.get(SessionArchive, session_id)
+        if stub is not None:
+            # closed for appends; nothing new to checkpoint
+            ok = verify_archived_session(db, stub, checkpoint) and ok
+            continue
+        if checkpoint:
+            anchor = db.exec(
+                select(UnderstandingEvent.curr_hash, UnderstandingEvent.created_at)
+                .where(UnderstandingEvent.session_id == session_id)
+                .where(UnderstandingEvent.seq == checkpoint.seq)
+            ).first()
+            if not anchor or anchor[0] != checkpoint.curr_hash:
+                print(
+                    f"[WARN] checkpointed event seq={checkpoint.seq} of session {session_id} "
+                    "no longer matches its checkpoint",
+                    file=sys.stderr,
+                )
+                ok = False
+                continue
+            after_seq, prev_hash, last_ts, count = checkpoint.seq, anchor[0], anchor[1], checkpoint.count
+
+        result = verify(
+            load_events(db, session_id, after_seq=after_seq, with_payload=args.deep),
+            start={session_id: (prev_hash, last_ts, after_seq)},
+            report=False,
+            deep=args.deep,
+            sample=args.sample,
+        )
+        if not result.ok:
+            ok = False
+            continue
+        verified += result.events
+        if result.last is not None:
+            checkpoints.record(
+                session_id, result.last.seq, result.last.curr_hash, count + result.events
+            )
+    db.commit()
     if ok:
         print(
-            f"Verified {len(events)} events; chain intact"
-            + (f" for session {events[0].session_id}" if events else "")
+            f"Verified {verified} new events across {len(session_ids)} sessions since last checkpoint"
         )
     return ok
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if not 0 < args.sample <= 1:
+        print("--sample must be in (0, 1]", file=sys.stderr)
+        return 2
+    if args.ledger_backend == "segment":
+        if args.workers > 1 or args.since_checkpoint or args.chain_scope != "session":
+            print("--ledger-backend segment supports full per-session passes only", file=sys.stderr)
+            return 2
+        store = SegmentLedgerStore(args.segment_root)
+        try:
+            result = verify(
+                load_segment_events(store, args.session_id), deep=args.deep, sample=args.sample
+            )
+        finally:
+            store.close()
+        if not result.events:
+            print("No events found for verification.")
+            return 0
+        return 0 if result.ok else 1
     engine = create_engine(args.database_url, future=True)
     SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False)
+    if args.workers > 1:
+        if args.chain_scope != "session" or args.since_checkpoint:
+            print("--workers needs per-session chains and a full pass", file=sys.stderr)
+            return 2
+        with SessionLocal() as db:
+            return 0 if verify_parallel(db, args) else 1
+    if args.since_checkpoint:
+        if args.chain_scope != "session":
+            print("--since-checkpoint needs per-session chains (--chain-scope session)", file=sys.stderr)
+            return 2
+        with SessionLocal() as db:
+            return 0 if verify_since_checkpoint(db, args) else 1
     with SessionLocal() as db:
-        events = load_events(db, args.session_id)
-    if not events:
+        result = verify(
+            load_events(db, args.session_id, args.chain_scope, with_payload=args.deep),
+            args.chain_scope,
+            deep=args.deep,
+            sample=args.sample,
+        )
+    if not result.events:
         print("No events found for verification.")
         return 0
-    return 0 if verify(events) else 1
+    return 0 if result.ok else 1
 
 
 if __name__ == "__main__":